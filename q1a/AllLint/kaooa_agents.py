@@ -0,0 +1,65 @@
+"""
+Computer players for the Kaooa game, behind a common choose_move interface.
+"""
+
+import random
+from kaooa_engine import legal_moves, apply_move
+from kaooa_search import AlphaBetaAgent, evaluate
+from kaooa_mcts import MCTSAgent
+
+class RandomAgent: # pylint: disable=too-few-public-methods
+    """
+    Player choosing uniformly among the legal moves.
+    """
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def choose_move(self, state):
+        """
+        Returns a random legal move of state, or None if there is none.
+        """
+        moves = legal_moves(state)
+        return self.rng.choice(moves) if moves else None
+
+class GreedyAgent: # pylint: disable=too-few-public-methods
+    """
+    Player choosing the move with the best static score one ply ahead,
+    and taking any move that wins at once.
+    """
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def choose_move(self, state):
+        """
+        Returns the greedy move of state, or None if there is none.
+        Ties are broken at random.
+        """
+        best = []
+        best_score = None
+        for move in legal_moves(state):
+            child = apply_move(state, move)
+            if child.winner == state.turn:
+                return move
+            score = -evaluate(child)
+            if best_score is None or score > best_score:
+                best, best_score = [move], score
+            elif score == best_score:
+                best.append(move)
+        return self.rng.choice(best) if best else None
+
+AGENTS = ('random', 'greedy', 'alphabeta', 'mcts')
+
+def make_agent(name, seed=None, think=0.05):
+    """
+    Returns a new agent by name, one of AGENTS.
+    think is the seconds of search per move, for the search based agents.
+    """
+    if name == 'random':
+        return RandomAgent(seed)
+    if name == 'greedy':
+        return GreedyAgent(seed)
+    if name == 'alphabeta':
+        return AlphaBetaAgent(time_limit=think)
+    if name == 'mcts':
+        return MCTSAgent(playouts=10 ** 9, time_limit=think, seed=seed)
+    raise ValueError(f'Unknown agent {name}, expected one of {", ".join(AGENTS)}.')
@@ -0,0 +1,289 @@
+"""
+Batched Kaooa environment for training agents, vectorised with NumPy.
+
+A BatchEnv steps many games in lockstep. The state of every game is held in
+NumPy arrays, one entry per game, and the legal moves of all games are a
+boolean mask over a fixed set of actions, so an agent picks one action per
+game and the rules are applied to the whole batch at once. The rules are those
+of kaooa_engine: the vulture must capture when it can, a crow cannot slide
+until every crow is dropped, and a game ends on the captures to win, on the
+vulture being blocked, or on the side to move being stuck.
+
+An action encodes a move as (source + 1) * spot_count + target, so source -1,
+a drop, takes the first spot_count actions. A capture needs no action of its
+own, as the jumped crow follows from the source and target.
+
+Usage: python kaooa_batch.py [--games N] [--steps N] [--seed N]
+"""
+
+import sys
+import time
+import argparse
+import numpy as np
+from kaooa_engine import PlayerClass, GameState, STANDARD_RULES
+
+MAX_PLIES = 200
+NO_WINNER = -1
+VULTURE = PlayerClass.VULTURE.value
+CROW = PlayerClass.CROW.value
+
+def sample_actions(legal, rng):
+    """
+    Returns a uniformly random legal action of each game, given the legal mask
+    of the games, or 0 for a game with no legal action.
+    """
+    return np.argmax(rng.random(legal.shape, dtype=np.float32) * legal, axis=1)
+
+class BatchEnv: # pylint: disable=too-many-instance-attributes
+    """
+    count games of rules, stepped together. The arrays crows, vulture, turn,
+    moves, crows_in_hand, crows_captured and winner hold the fields of the
+    GameState of each game, with turn and winner as PlayerClass values, and
+    winner NO_WINNER while a game runs. legal is the legal mask of the games,
+    and done flags the games that have ended, or reached max_plies plies.
+    """
+    def __init__(self, count, rules=STANDARD_RULES, max_plies=MAX_PLIES, auto_reset=True):
+        """
+        Starts count games from the initial state. With auto_reset,
+        a game that ends is restarted by the step that ends it.
+        """
+        board = rules.board
+        spots = board.spot_count
+        self.rules = rules
+        self.count = count
+        self.max_plies = max_plies
+        self.auto_reset = auto_reset
+        self.action_count = (spots + 1) * spots
+        self.spot_bits = np.int64(1) << np.arange(spots, dtype=np.int64)
+        self.neighbours = np.array(board.neighbours, dtype=np.int64)
+        self.jumped = np.full((spots, spots), -1, dtype=np.int64)
+        for source in range(spots):
+            for crow_idx, jump_idx in board.captures[source]:
+                self.jumped[source, jump_idx] = crow_idx
+        # The k-th capture from each spot, as the spots of its crow and landing.
+        # Spots with fewer captures are padded with a crow landing on itself,
+        # which is never open.
+        widest = max(len(captures) for captures in board.captures)
+        padded = [
+            captures + ((0, 0),) * (widest - len(captures)) for captures in board.captures
+        ]
+        self.capture_crow = np.array(
+            [[crow_idx for crow_idx, _ in captures] for captures in padded], dtype=np.int64
+        )
+        self.capture_landing = np.array(
+            [[jump_idx for _, jump_idx in captures] for captures in padded], dtype=np.int64
+        )
+        self.crows = np.zeros(count, dtype=np.int64)
+        self.vulture = np.zeros(count, dtype=np.int64)
+        self.turn = np.zeros(count, dtype=np.int8)
+        self.moves = np.zeros(count, dtype=np.int32)
+        self.crows_in_hand = np.zeros(count, dtype=np.int32)
+        self.crows_captured = np.zeros(count, dtype=np.int32)
+        self.winner = np.zeros(count, dtype=np.int8)
+        self.plies = np.zeros(count, dtype=np.int32)
+        self.done = np.zeros(count, dtype=bool)
+        self.legal = np.zeros((count, self.action_count), dtype=bool)
+        self.reset()
+
+    def reset(self, rows=None):
+        """
+        Restarts the games at rows, an index array, or every game if None.
+        """
+        rows = np.arange(self.count) if rows is None else rows
+        self.crows[rows] = 0
+        self.vulture[rows] = -1
+        self.turn[rows] = CROW
+        self.moves[rows] = 1
+        self.crows_in_hand[rows] = self.rules.crow_count
+        self.crows_captured[rows] = 0
+        self.winner[rows] = NO_WINNER
+        self.plies[rows] = 0
+        self.done[rows] = False
+        self.legal[rows] = self.legal_mask(rows)
+
+    def bits(self, masks):
+        """
+        Returns the spots of each mask in masks, as a boolean array of shape
+        (len(masks), spot_count).
+        """
+        return (masks[:, None] & self.spot_bits) != 0
+
+    def vulture_targets(self, vulture, crows):
+        """
+        Returns the mask of spots the vulture can move to from vulture, for each
+        game with the crows crows. Only captures are returned where one exists,
+        as the vulture must take it. vulture must be on the board.
+        """
+        landings = np.zeros_like(crows)
+        captures = zip(self.capture_crow[vulture].T, self.capture_landing[vulture].T)
+        for crow_idx, jump_idx in captures:
+            landings |= ((crows >> crow_idx) & ~(crows >> jump_idx) & 1) << jump_idx
+        return np.where(landings != 0, landings, self.neighbours[vulture] & ~crows)
+
+    def legal_mask(self, rows):
+        """
+        Returns the legal mask of the games at rows, of shape (len(rows), action_count).
+        The targets of each source are gathered as a mask of spots, and expanded
+        into actions at the end.
+        """
+        spots = self.rules.board.spot_count
+        crows = self.crows[rows]
+        vulture = self.vulture[rows]
+        running = self.winner[rows] == NO_WINNER
+        vulture_turn = running & (self.turn[rows] == VULTURE)
+        crow_turn = running & (self.turn[rows] == CROW)
+        hand = self.crows_in_hand[rows]
+        placed = vulture >= 0
+        vacant = ~(crows | np.where(placed, np.int64(1) << np.maximum(vulture, 0), 0))
+
+        targets = np.zeros((len(crows), spots + 1), dtype=np.int64)
+        dropping = (vulture_turn & ~placed) | (crow_turn & (hand > 0))
+        targets[:, 0] = np.where(dropping, vacant, 0)
+        moving = np.flatnonzero(vulture_turn & placed)
+        targets[moving, vulture[moving] + 1] = self.vulture_targets(vulture[moving], crows[moving])
+        sliding = crow_turn & (hand == 0) & (self.moves[rows] >= self.rules.drop_phase_moves)
+        targets[:, 1:] |= np.where(
+            self.bits(crows) & sliding[:, None], self.neighbours & vacant[:, None], 0
+        )
+        return ((targets[:, :, None] & self.spot_bits) != 0).reshape(len(crows), self.action_count)
+
+    def step(self, actions): # pylint: disable=too-many-locals
+        """
+        Plays actions, one per game, in the games still running, and completes
+        their turns. Actions of ended games are ignored.
+        Returns the reward of the side that moved, 1 for a win, -1 for a loss
+        and 0 otherwise, and the games the step ended.
+        Raises ValueError, if the action of a running game is out of range or illegal.
+        """
+        spots = self.rules.board.spot_count
+        rows = np.flatnonzero(~self.done)
+        actions = np.asarray(actions, dtype=np.int64)[rows]
+        if not ((actions >= 0) & (actions < self.action_count)).all():
+            raise ValueError('Action is out of range.')
+        if not self.legal[rows, actions].all():
+            raise ValueError('Action is not legal in its game.')
+        source = actions // spots - 1
+        target = actions % spots
+        crows = self.crows[rows]
+        mover = self.turn[rows]
+        vulture_turn = mover == VULTURE
+        crow_turn = ~vulture_turn
+
+        captured = np.where(
+            vulture_turn & (source >= 0), self.jumped[np.maximum(source, 0), target], -1
+        )
+        took = captured >= 0
+        crows = np.where(took, crows & ~(np.int64(1) << np.maximum(captured, 0)), crows)
+        crows_captured = self.crows_captured[rows] + took
+        vulture = np.where(vulture_turn, target, self.vulture[rows])
+        slid = crow_turn & (source >= 0)
+        crows = np.where(slid, crows & ~(np.int64(1) << np.maximum(source, 0)), crows)
+        crows = np.where(crow_turn, crows | np.int64(1) << target, crows)
+
+        blocked = np.zeros(len(rows), dtype=bool)
+        placed = np.flatnonzero(vulture >= 0)
+        blocked[placed] = self.vulture_targets(vulture[placed], crows[placed]) == 0
+        winner = np.where(
+            crows_captured == self.rules.captures_to_win, VULTURE,
+            np.where(blocked, CROW, NO_WINNER)
+        )
+
+        self.crows[rows] = crows
+        self.vulture[rows] = vulture
+        self.turn[rows] = np.where(vulture_turn, CROW, VULTURE)
+        self.moves[rows] += winner == NO_WINNER
+        self.crows_in_hand[rows] -= crow_turn & (source < 0)
+        self.crows_captured[rows] = crows_captured
+        self.winner[rows] = winner
+        self.plies[rows] += 1
+        self.legal[rows] = self.legal_mask(rows)
+
+        rewards = np.zeros(self.count, dtype=np.float32)
+        rewards[rows] = np.where(winner == mover, 1.0, np.where(winner == NO_WINNER, 0.0, -1.0))
+        ended = np.zeros(self.count, dtype=bool)
+        ended[rows] = (
+            (winner != NO_WINNER) | ~self.legal[rows].any(axis=1)
+            | (self.plies[rows] >= self.max_plies)
+        )
+        self.done |= ended
+        if self.auto_reset and ended.any():
+            self.reset(np.flatnonzero(ended))
+        return rewards, ended
+
+    def observe(self):
+        """
+        Returns the features of every game, of shape (count, 2 * spot_count + 4):
+        the crows, the spot of the vulture, the side to move, the crows in hand
+        and captured, as fractions of the crows and captures to win, and whether
+        the drop phase is over.
+        """
+        spots = self.rules.board.spot_count
+        return np.concatenate((
+            self.bits(self.crows),
+            self.vulture[:, None] == np.arange(spots),
+            (self.turn == CROW)[:, None],
+            (self.crows_in_hand / self.rules.crow_count)[:, None],
+            (self.crows_captured / self.rules.captures_to_win)[:, None],
+            (self.moves >= self.rules.drop_phase_moves)[:, None]
+        ), axis=1, dtype=np.float32)
+
+    def action_of(self, move):
+        """
+        Returns the action of move.
+        """
+        return (move.source + 1) * self.rules.board.spot_count + move.target
+
+    def move_of(self, game, action):
+        """
+        Returns the Move of action in game, with the captured crow filled in.
+        """
+        source, target = divmod(int(action), self.rules.board.spot_count)
+        return self.rules.make_move(self.state(game), source - 1, target)
+
+    def state(self, game):
+        """
+        Returns the GameState of game.
+        """
+        winner = int(self.winner[game])
+        return GameState(
+            int(self.crows[game]), int(self.vulture[game]), PlayerClass(int(self.turn[game])),
+            int(self.moves[game]), int(self.crows_in_hand[game]), int(self.crows_captured[game]),
+            None if winner == NO_WINNER else PlayerClass(winner)
+        )
+
+def run(args):
+    """
+    Steps a batch of games with random legal moves.
+    Returns the plies played, the games ended and those won by the vulture,
+    and the seconds taken.
+    """
+    rng = np.random.default_rng(args.seed)
+    env = BatchEnv(args.games)
+    ended = 0
+    vulture_wins = 0
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        mover = env.turn.copy()
+        rewards, dones = env.step(sample_actions(env.legal, rng))
+        ended += int(dones.sum())
+        vulture_wins += int(((rewards == 1) & (mover == VULTURE)).sum())
+    return args.games * args.steps, ended, vulture_wins, time.perf_counter() - start
+
+def parse_args(argv):
+    """
+    Parses the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description='Kaooa batched random play benchmark.')
+    parser.add_argument('--games', type=int, default=4096, help='games stepped together')
+    parser.add_argument('--steps', type=int, default=500, help='steps of the batch')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the random moves')
+    args = parser.parse_args(argv)
+    if args.games < 1 or args.steps < 1:
+        parser.error('--games and --steps should be positive.')
+    return args
+
+if __name__ == '__main__':
+    ARGS = parse_args(sys.argv[1:])
+    PLIES, ENDED, VULTURE_WINS, ELAPSED = run(ARGS)
+    print(f'{PLIES / ELAPSED:,.0f} plies/s over {ARGS.games} games, {ENDED} games ended, '
+          f'{VULTURE_WINS / max(ENDED, 1):.1%} won by the vulture')
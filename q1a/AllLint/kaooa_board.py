@@ -0,0 +1,200 @@
+"""
+Bitboard geometry of the Kaooa board.
+
+The board is a star of n points, drawn as {n/2}: each line joins an outer point
+to the second next one, crossing two other lines on the way. Its 2n spots are
+numbered around the star, so even spots are the outer points and odd spots are
+the inner intersections, and each line runs through spots i, i+1, i+3 and i+4.
+Spot idx is bit (1 << idx) of a mask. The adjacency and capture tables are
+computed once per board, so rule checks reduce to bitwise operations.
+
+The module constants are those of the standard pentagram, which also has
+SPOTS_OF, a table of the spots in every mask, and tables of the moves each side
+has for every mask of crows, so mobility and blocking are single lookups. They
+are too large to build for bigger boards, whose masks are walked bit by bit
+instead.
+"""
+
+import math
+import functools
+from typing import NamedTuple
+
+STANDARD_POINTS = 5
+MIN_POINTS = 5
+
+def _neighbours(idx, spot_count):
+    """
+    Returns the mask of spots one link away from idx.
+    Outer points are linked to the two adjacent intersections,
+    and intersections are additionally linked to the two nearest intersections.
+    """
+    offsets = (1, 2) if idx % 2 == 1 else (1,)
+    mask = 0
+    for offset in offsets:
+        mask |= 1 << ((idx + offset) % spot_count)
+        mask |= 1 << ((idx - offset) % spot_count)
+    return mask
+
+def _captures(idx, spot_count):
+    """
+    Returns the (crow, landing) spot pairs for a vulture jumping from idx.
+    """
+    over = 1 if idx % 2 == 0 else 2
+    return (
+        ((idx + over) % spot_count, (idx + 3) % spot_count),
+        ((idx - over) % spot_count, (idx - 3) % spot_count)
+    )
+
+def spots_in(mask):
+    """
+    Returns the spots of mask, in increasing order, for a board of any size.
+    """
+    spots = []
+    while mask:
+        low = mask & -mask
+        spots.append(low.bit_length() - 1)
+        mask ^= low
+    return spots
+
+class Board(NamedTuple):
+    """
+    Geometry of a star board of points points.
+    lines are the (first, last) spots of each line of the star.
+    """
+    points: int
+    spot_count: int
+    full_mask: int
+    neighbours: tuple
+    captures: tuple
+    lines: tuple
+
+    def capture_options(self, crows, vulture):
+        """
+        Returns the list of (crow, landing) spot pairs the vulture can capture with.
+        """
+        if vulture < 0:
+            return []
+        return [
+            (crow_idx, jump_idx) for crow_idx, jump_idx in self.captures[vulture]
+            if crows >> crow_idx & 1 and not crows >> jump_idx & 1
+        ]
+
+    def vulture_blocked(self, crows, vulture):
+        """
+        Checks if the vulture has no possible move. The standard board has
+        vulture_blocked, which looks it up in the move count tables.
+        """
+        if vulture < 0:
+            return False
+        if self.neighbours[vulture] & ~crows:
+            return False
+        return not self.capture_options(crows, vulture)
+
+    def layout(self, center, radius):
+        """
+        Returns the screen coordinates of every spot, for a star of the given
+        center and outer radius, with its first point at the top.
+        """
+        outer = [
+            (center[0] + radius * math.sin(2 * math.pi * idx / self.points),
+             center[1] - radius * math.cos(2 * math.pi * idx / self.points))
+            for idx in range(self.points)
+        ]
+        coords = []
+        for idx in range(self.points):
+            coords.append(outer[idx])
+            coords.append(_intersection(
+                outer[idx], outer[(idx + 2) % self.points],
+                outer[(idx + 1) % self.points], outer[(idx - 1) % self.points]
+            ))
+        return tuple((round(x_coord), round(y_coord)) for x_coord, y_coord in coords)
+
+def _intersection(start1, end1, start2, end2):
+    """
+    Returns the point where the line through start1 and end1
+    crosses the line through start2 and end2.
+    """
+    dx1, dy1 = end1[0] - start1[0], end1[1] - start1[1]
+    dx2, dy2 = end2[0] - start2[0], end2[1] - start2[1]
+    cross = dx1 * dy2 - dy1 * dx2
+    ratio = ((start2[0] - start1[0]) * dy2 - (start2[1] - start1[1]) * dx2) / cross
+    return start1[0] + ratio * dx1, start1[1] + ratio * dy1
+
+@functools.lru_cache(maxsize=None)
+def make_board(points=STANDARD_POINTS):
+    """
+    Returns the Board of a star of points points, built once per size.
+    Raises ValueError, for a star of fewer than MIN_POINTS points.
+    """
+    if points < MIN_POINTS:
+        raise ValueError(f'A star board needs at least {MIN_POINTS} points.')
+    spot_count = 2 * points
+    return Board(
+        points, spot_count, (1 << spot_count) - 1,
+        tuple(_neighbours(idx, spot_count) for idx in range(spot_count)),
+        tuple(_captures(idx, spot_count) for idx in range(spot_count)),
+        tuple((idx, (idx + 4) % spot_count) for idx in range(0, spot_count, 2))
+    )
+
+STANDARD_BOARD = make_board()
+SPOT_COUNT = STANDARD_BOARD.spot_count
+FULL_MASK = STANDARD_BOARD.full_mask
+NEIGHBOURS = STANDARD_BOARD.neighbours
+CAPTURES = STANDARD_BOARD.captures
+SPOTS_OF = tuple(tuple(spots_in(mask)) for mask in range(FULL_MASK + 1))
+
+def _capture_row(vulture):
+    """
+    Returns the number of captures open to the vulture on spot vulture,
+    for every mask of crows.
+    """
+    row = [0] * (FULL_MASK + 1)
+    for crow_idx, jump_idx in CAPTURES[vulture]:
+        both = 1 << crow_idx | 1 << jump_idx
+        for crows in range(FULL_MASK + 1):
+            if crows & both == 1 << crow_idx:
+                row[crows] += 1
+    return tuple(row)
+
+def _crow_slide_row(vulture):
+    """
+    Returns the number of slides open to the crows, for every mask of crows,
+    with the vulture on spot vulture, or off the board for -1. Each mask is
+    counted from the mask without its lowest crow: that crow adds its own
+    slides, and takes one from each neighbouring crow.
+    """
+    open_spots = FULL_MASK & ~(1 << vulture) if vulture >= 0 else FULL_MASK
+    row = [0]
+    for crows in range(1, FULL_MASK + 1):
+        rest = crows & (crows - 1)
+        links = NEIGHBOURS[(crows & -crows).bit_length() - 1]
+        row.append(
+            row[rest] - (links & rest).bit_count() + (links & open_spots & ~crows).bit_count()
+        )
+    return tuple(row)
+
+# Indexed [vulture][crows]. CROW_SLIDE_COUNT has a last row for the vulture
+# off the board, so that a vulture of -1 indexes it directly.
+VULTURE_SLIDE_COUNT = tuple(
+    tuple((NEIGHBOURS[vulture] & ~crows).bit_count() for crows in range(FULL_MASK + 1))
+    for vulture in range(SPOT_COUNT)
+)
+CAPTURE_COUNT = tuple(_capture_row(vulture) for vulture in range(SPOT_COUNT))
+CROW_SLIDE_COUNT = tuple(_crow_slide_row(vulture) for vulture in (*range(SPOT_COUNT), -1))
+
+def capture_options(crows, vulture):
+    """
+    Returns the list of (crow, landing) spot pairs the vulture can capture with,
+    on the standard board.
+    """
+    return STANDARD_BOARD.capture_options(crows, vulture)
+
+def vulture_blocked(crows, vulture):
+    """
+    Checks if the vulture has a possible move.
+    Returns True, if their exists no such move.
+    Returns False, otherwise (including when the vulture is not on the board).
+    """
+    if vulture < 0:
+        return False
+    return not (VULTURE_SLIDE_COUNT[vulture][crows] or CAPTURE_COUNT[vulture][crows])
@@ -0,0 +1,178 @@
+"""
+Delta compressed broadcast of live Kaooa games to spectators.
+
+Each watched game has a Channel, which encodes every move once into a small
+binary delta frame, and writes the same bytes to all its spectators. A channel
+keeps a snapshot frame of the state every KEYFRAME_INTERVAL moves, and the
+deltas since, so a late joiner is sent the snapshot and the deltas to catch up,
+all of them frames already encoded for the other spectators.
+
+Frames, in little-endian order:
+
+    S <seq: u32> <crows: u16> <vulture: i8> <status: u8> <moves: u16> <in hand: u8> <captured: u8>
+    D <seq: u32> <source: i8> <target: i8> <captured: i8> <status: u8> <moves: u16>
+    X <seq: u32>
+
+where status packs the side to move and the winner, and X ends the stream.
+"""
+
+import struct
+from kaooa_engine import GameState, Move, PlayerClass, apply_move
+
+SNAPSHOT = struct.Struct('<cIHbBHBB')
+DELTA = struct.Struct('<cIbbbBH')
+END = struct.Struct('<cI')
+FRAME_SIZES = {b'S': SNAPSHOT.size, b'D': DELTA.size, b'X': END.size}
+KEYFRAME_INTERVAL = 32
+MAX_BACKLOG = 1 << 16
+
+def encode_status(state):
+    """
+    Packs the side to move and the winner of state into a byte.
+    """
+    winner = 0 if state.winner is None else state.winner.value + 1
+    return winner << 1 | state.turn.value
+
+def decode_status(status):
+    """
+    Unpacks a status byte into the side to move and the winner.
+    """
+    winner = status >> 1
+    return PlayerClass(status & 1), None if winner == 0 else PlayerClass(winner - 1)
+
+def encode_snapshot(seq, state):
+    """
+    Returns the snapshot frame of state.
+    """
+    return SNAPSHOT.pack(
+        b'S', seq, state.crows, state.vulture, encode_status(state),
+        state.moves, state.crows_in_hand, state.crows_captured
+    )
+
+def encode_delta(seq, move, state):
+    """
+    Returns the delta frame of move, which led to state.
+    """
+    return DELTA.pack(
+        b'D', seq, move.source, move.target, move.captured, encode_status(state), state.moves
+    )
+
+def apply_frame(state, frame):
+    """
+    Returns the sequence number of a frame, and the state after it.
+    A delta is played on state through the rules engine, and checked against
+    the side to move and move counter it carries. Raises ValueError, if the
+    delta does not follow from state.
+    """
+    kind = frame[:1]
+    if kind == b'S':
+        _, seq, crows, vulture, status, moves, in_hand, captured = SNAPSHOT.unpack(frame)
+        turn, winner = decode_status(status)
+        return seq, GameState(crows, vulture, turn, moves, in_hand, captured, winner)
+    if kind == b'D':
+        _, seq, source, target, captured, status, moves = DELTA.unpack(frame)
+        if state is None:
+            raise ValueError('Delta before the first snapshot.')
+        state = apply_move(state, Move(source, target, captured))
+        if (state.turn, state.winner) != decode_status(status) or state.moves != moves:
+            raise ValueError(f'Delta {seq} does not follow from the state.')
+        return seq, state
+    if kind == b'X':
+        return END.unpack(frame)[1], state
+    raise ValueError(f'Unknown frame {kind}.')
+
+class Channel:
+    """
+    Spectators of one game, with the frames a late joiner needs.
+    """
+    __slots__ = ('seq', 'keyframe', 'deltas', 'subscribers')
+
+    def __init__(self, state):
+        """
+        Starts the channel at state.
+        """
+        self.seq = 0
+        self.keyframe = encode_snapshot(0, state)
+        self.deltas = []
+        self.subscribers = set()
+
+    def catch_up(self, since=None):
+        """
+        Returns the frames bringing a spectator up to date: the last snapshot and
+        the deltas after it, or only the deltas after since, if the spectator
+        already has the frames up to since and the channel still holds the rest.
+        """
+        keyframe_seq = self.seq - len(self.deltas)
+        if since is not None and keyframe_seq <= since <= self.seq:
+            return self.deltas[since - keyframe_seq:]
+        return [self.keyframe] + self.deltas
+
+    def subscribe(self, writer, since=None):
+        """
+        Sends the catch up frames to a spectator, and adds it to the channel.
+        """
+        writer.write(b''.join(self.catch_up(since)))
+        self.subscribers.add(writer)
+
+    def unsubscribe(self, writer):
+        """
+        Removes a spectator from the channel.
+        """
+        self.subscribers.discard(writer)
+
+    def publish(self, move, state):
+        """
+        Sends the delta of move to every spectator, encoded once.
+        """
+        self.seq += 1
+        frame = encode_delta(self.seq, move, state)
+        self.broadcast(frame)
+        if len(self.deltas) + 1 >= KEYFRAME_INTERVAL:
+            self.keyframe = encode_snapshot(self.seq, state)
+            self.deltas = []
+        else:
+            self.deltas.append(frame)
+
+    def reset(self, state):
+        """
+        Sends a snapshot of state to every spectator, after a move was taken back.
+        """
+        self.seq += 1
+        self.keyframe = encode_snapshot(self.seq, state)
+        self.deltas = []
+        self.broadcast(self.keyframe)
+
+    def close(self):
+        """
+        Ends the stream of every spectator.
+        """
+        self.seq += 1
+        self.broadcast(END.pack(b'X', self.seq))
+        for writer in self.subscribers:
+            writer.close()
+        self.subscribers = set()
+
+    def broadcast(self, frame):
+        """
+        Writes frame to every spectator. Spectators too slow to read their
+        frames are dropped, rather than buffering for them without bound.
+        """
+        for writer in list(self.subscribers):
+            if writer.transport.get_write_buffer_size() > MAX_BACKLOG:
+                self.subscribers.discard(writer)
+                writer.close()
+            else:
+                writer.write(frame)
+
+async def read_frame(reader):
+    """
+    Reads the next frame of a spectator stream.
+    Returns None at the end of the stream.
+    """
+    kind = await reader.read(1)
+    if not kind:
+        return None
+    if kind not in FRAME_SIZES:
+        line = kind + await reader.readline()
+        raise ValueError(line.decode('ascii', 'replace').strip())
+    return kind + await reader.readexactly(FRAME_SIZES[kind] - 1)
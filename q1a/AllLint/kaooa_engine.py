@@ -0,0 +1,447 @@
+"""
+Headless rules engine for the Kaooa game, independent of Pygame.
+
+A position is an immutable GameState, and moves are applied by returning a
+new state, so the engine can be used for simulation, search and validation
+without a display. The board is held as a bitboard, see kaooa_board.
+
+Rules plays the game on a star of any size, with any number of crows and
+captures to win, and make_rules returns the rules of a variant. The module
+functions play the standard game: move generation, moves and mobility from
+tables indexed by whole masks, and the other rules through the methods of
+STANDARD_RULES. It is a StandardRules, whose methods are those table driven
+functions, so code written against Rules plays the standard game at full speed.
+"""
+
+import functools
+from enum import Enum
+from typing import NamedTuple, Optional
+from kaooa_board import (
+    STANDARD_POINTS, SPOT_COUNT, FULL_MASK, NEIGHBOURS, CAPTURES, SPOTS_OF,
+    VULTURE_SLIDE_COUNT, CAPTURE_COUNT, CROW_SLIDE_COUNT,
+    vulture_blocked, make_board, spots_in
+)
+
+CROW_COUNT = 7
+CAPTURES_TO_WIN = 4
+DROP_PHASE_MOVES = 14
+
+class PlayerClass(Enum):
+    """
+    Different types of players in the game.
+    """
+    VULTURE = 0
+    CROW = 1
+
+class Move(NamedTuple):
+    """
+    A single move of the game.
+    source is -1 for a drop from hand, and captured is -1 if no crow is captured.
+    """
+    source: int
+    target: int
+    captured: int = -1
+
+class GameState(NamedTuple):
+    """
+    Immutable snapshot of a game.
+    crows is the bitmask of spots holding a crow,
+    and vulture is the spot of the vulture, or -1 if it is yet to be dropped.
+    """
+    crows: int = 0
+    vulture: int = -1
+    turn: PlayerClass = PlayerClass.CROW
+    moves: int = 1
+    crows_in_hand: int = CROW_COUNT
+    crows_captured: int = 0
+    winner: Optional[PlayerClass] = None
+
+    @property
+    def occupied(self):
+        """
+        Returns the bitmask of occupied spots.
+        """
+        if self.vulture < 0:
+            return self.crows
+        return self.crows | 1 << self.vulture
+
+    @property
+    def spots(self):
+        """
+        Returns the PlayerClass occupying each spot of the standard board, or None
+        if vacant. Rules.spots does the same on the board of any variant.
+        """
+        spots = [None] * SPOT_COUNT
+        for crow_idx in SPOTS_OF[self.crows]:
+            spots[crow_idx] = PlayerClass.CROW
+        if self.vulture >= 0:
+            spots[self.vulture] = PlayerClass.VULTURE
+        return tuple(spots)
+
+def _slide_row(source):
+    """
+    Returns the slides from source for every mask of vacant spots.
+    Masks with the same vacant neighbours share one tuple, so the row
+    is built from at most 16 tuples of moves.
+    """
+    shared = {}
+    row = []
+    for vacant in range(FULL_MASK + 1):
+        targets = NEIGHBOURS[source] & vacant
+        if targets not in shared:
+            shared[targets] = tuple(Move(source, target) for target in SPOTS_OF[targets])
+        row.append(shared[targets])
+    return tuple(row)
+
+DROP_MOVES = tuple(Move(-1, target) for target in range(SPOT_COUNT))
+DROPS = tuple(
+    tuple(DROP_MOVES[target] for target in SPOTS_OF[vacant])
+    for vacant in range(FULL_MASK + 1)
+)
+SLIDES = tuple(_slide_row(source) for source in range(SPOT_COUNT))
+JUMPS = tuple(
+    tuple(Move(source, jump_idx, crow_idx) for crow_idx, jump_idx in CAPTURES[source])
+    for source in range(SPOT_COUNT)
+)
+
+def initial_state():
+    """
+    Returns the state at the start of the game.
+    """
+    return GameState()
+
+def vulture_position(state):
+    """
+    Returns the spot of the vulture, or -1 if it is yet to be dropped.
+    """
+    return state.vulture
+
+def is_adjacent(source, target):
+    """
+    Checks if target is one link away from source.
+    """
+    return bool(NEIGHBOURS[source] >> target & 1)
+
+def illegal_reason(state, plclass, source, target):
+    """
+    Explains why moving a piece of plclass from source to target is illegal,
+    in the standard game. Returns None, if the move is legal.
+    """
+    return STANDARD_RULES.illegal_reason(state, plclass, source, target)
+
+def make_move(state, source, target):
+    """
+    Builds the Move from source to target in the standard game,
+    filling in the captured crow if any.
+    """
+    return STANDARD_RULES.make_move(state, source, target)
+
+def legal_moves(state): # pylint: disable=too-many-return-statements
+    """
+    Returns the list of every legal move for the side to move.
+    The moves are read from the DROPS, SLIDES and JUMPS tables, and a capture
+    is returned alone whenever one is possible, as the vulture must take it.
+    """
+    if state.winner is not None:
+        return []
+    crows = state.crows
+    vulture = state.vulture
+    if state.turn == PlayerClass.VULTURE:
+        if vulture == -1:
+            return list(DROPS[FULL_MASK & ~crows])
+        captures = [
+            move for move in JUMPS[vulture]
+            if crows >> move.captured & 1 and not crows >> move.target & 1
+        ]
+        if captures:
+            return captures
+        return list(SLIDES[vulture][FULL_MASK & ~crows])
+    vacant = FULL_MASK & ~state.occupied
+    if state.crows_in_hand > 0:
+        return list(DROPS[vacant])
+    if state.moves < DROP_PHASE_MOVES:
+        return []
+    moves = []
+    for source in SPOTS_OF[crows]:
+        moves.extend(SLIDES[source][vacant])
+    return moves
+
+def _play(state, move, captures_to_win, blocked):
+    """
+    Returns the state after playing move, and completing the turn, when the
+    vulture wins on captures_to_win captures. blocked(crows, vulture) checks
+    if the vulture is left without a move.
+    """
+    crows = state.crows
+    vulture = state.vulture
+    crows_in_hand = state.crows_in_hand
+    crows_captured = state.crows_captured
+    if state.turn == PlayerClass.VULTURE:
+        vulture = move.target
+        turn = PlayerClass.CROW
+        if move.captured != -1:
+            crows &= ~(1 << move.captured)
+            crows_captured += 1
+    else:
+        if move.source == -1:
+            crows_in_hand -= 1
+        else:
+            crows &= ~(1 << move.source)
+        crows |= 1 << move.target
+        turn = PlayerClass.VULTURE
+
+    moves = state.moves
+    winner = None
+    if crows_captured == captures_to_win:
+        winner = PlayerClass.VULTURE
+    elif blocked(crows, vulture):
+        winner = PlayerClass.CROW
+    else:
+        moves += 1
+    return GameState(crows, vulture, turn, moves, crows_in_hand, crows_captured, winner)
+
+def apply_move(state, move):
+    """
+    Returns the state after playing move, and completing the turn.
+    The move is assumed to be legal; use validate_move to check untrusted input.
+    Blocking is looked up in the move count tables of kaooa_board.
+    """
+    return _play(state, move, CAPTURES_TO_WIN, vulture_blocked)
+
+def validate_move(state, move):
+    """
+    Raises ValueError, if move is not legal in state of the standard game.
+    """
+    STANDARD_RULES.validate_move(state, move)
+
+def mobility(state):
+    """
+    Returns the number of legal moves of the side to move, looked up in the
+    move count tables of kaooa_board rather than by listing the moves.
+    """
+    if state.winner is not None:
+        return 0
+    crows = state.crows
+    vulture = state.vulture
+    if state.turn == PlayerClass.VULTURE:
+        if vulture == -1:
+            return len(SPOTS_OF[FULL_MASK & ~crows])
+        return CAPTURE_COUNT[vulture][crows] or VULTURE_SLIDE_COUNT[vulture][crows]
+    if state.crows_in_hand > 0:
+        return len(SPOTS_OF[FULL_MASK & ~state.occupied])
+    if state.moves < DROP_PHASE_MOVES:
+        return 0
+    return CROW_SLIDE_COUNT[vulture][crows]
+
+def is_terminal(state):
+    """
+    Checks if the game has ended, either by a win or by the side to move being stuck.
+    """
+    return STANDARD_RULES.is_terminal(state)
+
+class Rules:
+    """
+    Rules of a variant: a star board, the crows, and the captures to win.
+    The drop phase lasts until every crow has been dropped.
+    """
+    __slots__ = (
+        'board', 'crow_count', 'captures_to_win', 'drop_phase_moves', 'drops', 'slides', 'jumps'
+    )
+
+    def __init__(self, board, crow_count, captures_to_win):
+        """
+        Builds the move tables of the variant.
+        Raises ValueError, if the variant cannot be played.
+        """
+        if not 1 <= captures_to_win <= crow_count < board.spot_count - 1:
+            raise ValueError('Captures to win should be at most the crows, '
+                             'and the crows fewer than the spots less one.')
+        self.board = board
+        self.crow_count = crow_count
+        self.captures_to_win = captures_to_win
+        self.drop_phase_moves = 2 * crow_count
+        self.drops = tuple(Move(-1, target) for target in range(board.spot_count))
+        self.slides = tuple(
+            tuple((1 << target, Move(source, target))
+                  for target in spots_in(board.neighbours[source]))
+            for source in range(board.spot_count)
+        )
+        self.jumps = tuple(
+            tuple(Move(source, jump_idx, crow_idx) for crow_idx, jump_idx in board.captures[source])
+            for source in range(board.spot_count)
+        )
+
+    def initial_state(self):
+        """
+        Returns the state at the start of the game.
+        """
+        return GameState(crows_in_hand=self.crow_count)
+
+    def spots(self, state):
+        """
+        Returns the PlayerClass occupying each spot of state, or None if vacant.
+        """
+        spots = [None] * self.board.spot_count
+        for crow_idx in spots_in(state.crows):
+            spots[crow_idx] = PlayerClass.CROW
+        if state.vulture >= 0:
+            spots[state.vulture] = PlayerClass.VULTURE
+        return tuple(spots)
+
+    def illegal_reason(self, state, plclass, source, target): # pylint: disable=too-many-return-statements,too-many-branches
+        """
+        Explains why moving a piece of plclass from source to target is illegal.
+        Returns None, if the move is legal.
+        """
+        spot_count = self.board.spot_count
+        if not -1 <= source < spot_count or not 0 <= target < spot_count:
+            return 'Spot is not on the board.'
+        if state.winner is not None:
+            return 'The game has already finished.'
+        if plclass != state.turn:
+            return 'Movement should be in the player\'s turn.'
+        if plclass == PlayerClass.CROW and state.moves < self.drop_phase_moves and source != -1:
+            return 'Position of crows cannot be altered, till all crows are on board.'
+        if source == -1:
+            if plclass == PlayerClass.CROW and state.crows_in_hand == 0:
+                return 'No crows are left to drop.'
+            if plclass == PlayerClass.VULTURE and state.vulture != -1:
+                return 'Vulture is already on the board.'
+        elif self.spots(state)[source] != plclass:
+            return 'There is no such piece to move.'
+        if state.occupied >> target & 1:
+            return 'Movement must be to a vacant spot.'
+        if source == -1:
+            return None
+        if plclass == PlayerClass.VULTURE:
+            options = self.board.capture_options(state.crows, source)
+            if any(jump_idx == target for _, jump_idx in options):
+                return None
+            if options:
+                return 'Vulture must capture the crow'
+        if not self.board.neighbours[source] >> target & 1:
+            return 'Movement must be via a single link jump, except for a capture.'
+        return None
+
+    def make_move(self, state, source, target):
+        """
+        Builds the Move from source to target, filling in the captured crow if any.
+        """
+        if source != -1 and state.turn == PlayerClass.VULTURE:
+            for crow_idx, jump_idx in self.board.capture_options(state.crows, source):
+                if jump_idx == target:
+                    return Move(source, target, crow_idx)
+        return Move(source, target)
+
+    def legal_moves(self, state): # pylint: disable=too-many-return-statements
+        """
+        Returns the list of every legal move for the side to move.
+        A capture is returned alone whenever one is possible, as the vulture must take it.
+        """
+        if state.winner is not None:
+            return []
+        crows = state.crows
+        vulture = state.vulture
+        if state.turn == PlayerClass.VULTURE:
+            if vulture == -1:
+                return [self.drops[target] for target in spots_in(self.board.full_mask & ~crows)]
+            captures = [
+                move for move in self.jumps[vulture]
+                if crows >> move.captured & 1 and not crows >> move.target & 1
+            ]
+            if captures:
+                return captures
+            return [move for bit, move in self.slides[vulture] if not crows & bit]
+        occupied = state.occupied
+        if state.crows_in_hand > 0:
+            return [self.drops[target] for target in spots_in(self.board.full_mask & ~occupied)]
+        if state.moves < self.drop_phase_moves:
+            return []
+        return [
+            move for source in spots_in(crows)
+            for bit, move in self.slides[source] if not occupied & bit
+        ]
+
+    def apply_move(self, state, move):
+        """
+        Returns the state after playing move, and completing the turn.
+        The move is assumed to be legal; use validate_move to check untrusted input.
+        """
+        return _play(state, move, self.captures_to_win, self.board.vulture_blocked)
+
+    def validate_move(self, state, move):
+        """
+        Raises ValueError, if move is not legal in state.
+        """
+        reason = self.illegal_reason(state, state.turn, move.source, move.target)
+        if reason is not None:
+            raise ValueError(reason)
+        if move != self.make_move(state, move.source, move.target):
+            raise ValueError('Captured crow does not match the move.')
+
+    def mobility(self, state):
+        """
+        Returns the number of legal moves of the side to move,
+        counted by bits rather than by listing the moves.
+        """
+        if state.winner is not None:
+            return 0
+        board = self.board
+        crows = state.crows
+        vulture = state.vulture
+        if state.turn == PlayerClass.VULTURE:
+            if vulture == -1:
+                return (board.full_mask & ~crows).bit_count()
+            return (len(board.capture_options(crows, vulture))
+                    or (board.neighbours[vulture] & ~crows).bit_count())
+        vacant = board.full_mask & ~state.occupied
+        if state.crows_in_hand > 0:
+            return vacant.bit_count()
+        if state.moves < self.drop_phase_moves:
+            return 0
+        return sum((board.neighbours[source] & vacant).bit_count() for source in spots_in(crows))
+
+    def is_terminal(self, state):
+        """
+        Checks if the game has ended, either by a win or by the side to move being stuck.
+        """
+        return state.winner is not None or not self.mobility(state)
+
+    def destinations(self, state):
+        """
+        Returns the legal moves of the side to move, grouped by their source,
+        -1 for a drop, as a dict of source to a dict of target to move.
+        """
+        grouped = {}
+        for move in self.legal_moves(state):
+            grouped.setdefault(move.source, {})[move.target] = move
+        return grouped
+
+class StandardRules(Rules):
+    """
+    Rules of the standard game, whose move generation, moves and mobility
+    are the table driven module functions.
+    """
+    __slots__ = ()
+
+    initial_state = staticmethod(initial_state)
+    legal_moves = staticmethod(legal_moves)
+    apply_move = staticmethod(apply_move)
+    mobility = staticmethod(mobility)
+
+    def spots(self, state):
+        """
+        Returns the PlayerClass occupying each spot of state, or None if vacant.
+        """
+        return state.spots
+
+STANDARD_RULES = StandardRules(make_board(STANDARD_POINTS), CROW_COUNT, CAPTURES_TO_WIN)
+
+@functools.lru_cache(maxsize=None)
+def make_rules(points=STANDARD_POINTS, crow_count=CROW_COUNT, captures_to_win=CAPTURES_TO_WIN):
+    """
+    Returns the Rules of a variant, built once per variant.
+    """
+    if (points, crow_count, captures_to_win) == (STANDARD_POINTS, CROW_COUNT, CAPTURES_TO_WIN):
+        return STANDARD_RULES
+    return Rules(make_board(points), crow_count, captures_to_win)
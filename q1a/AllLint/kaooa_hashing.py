@@ -0,0 +1,220 @@
+"""
+Zobrist hashing and symmetry canonicalisation of Kaooa positions.
+
+The pentagram has the 10 symmetries of a pentagon: 5 rotations by two spots,
+each with or without a reflection. They keep outer points (even) and
+intersections (odd) apart, and map links and capture lines onto each other,
+so symmetric positions have the same value, and caches can store one of them.
+
+A star of n points has the 2n symmetries of an n-gon in the same way. A Hasher
+holds the keys and symmetries of the rules of any variant, and make_hasher
+returns the one of a variant. The module functions hash standard positions
+through STANDARD_HASHER, the Hasher of the standard rules, and the module keys
+and symmetries are those of STANDARD_HASHER.
+"""
+
+import random
+import functools
+from kaooa_board import spots_in
+from kaooa_engine import PlayerClass, Move, STANDARD_RULES
+
+def _symmetries(spot_count):
+    """
+    Returns the spot permutations of the symmetries of a star of spot_count spots,
+    and the index of the inverse of each of them.
+    """
+    symmetries = tuple(
+        tuple((sign * idx + shift) % spot_count for idx in range(spot_count))
+        for sign in (1, -1)
+        for shift in range(0, spot_count, 2)
+    )
+    inverse = tuple(
+        symmetries.index(tuple(perm.index(idx) for idx in range(spot_count)))
+        for perm in symmetries
+    )
+    return symmetries, inverse
+
+class Hasher:
+    """
+    Zobrist keys and symmetries of the positions of a variant,
+    with the hashing functions of this module as methods.
+    """
+    __slots__ = (
+        'crow_keys', 'vulture_keys', 'hand_keys', 'captured_keys', 'turn_key',
+        'symmetries', 'inverse', 'byte_images'
+    )
+
+    def __init__(self, rules):
+        """
+        Draws the keys of the positions of rules.
+        """
+        spot_count = rules.board.spot_count
+        rng = random.Random(0x4B414F4F41 ^ spot_count)
+        self.crow_keys = tuple(rng.getrandbits(64) for _ in range(spot_count))
+        self.vulture_keys = tuple(rng.getrandbits(64) for _ in range(spot_count))
+        self.hand_keys = tuple(rng.getrandbits(64) for _ in range(rules.crow_count + 1))
+        self.captured_keys = tuple(rng.getrandbits(64) for _ in range(rules.captures_to_win + 1))
+        self.turn_key = rng.getrandbits(64)
+        self.symmetries, self.inverse = _symmetries(spot_count)
+        # The image under each symmetry of every byte of a mask of spots, so masks
+        # are permuted a byte at a time whatever the size of the board.
+        full_mask = (1 << spot_count) - 1
+        self.byte_images = tuple(
+            tuple(
+                tuple(
+                    sum(1 << perm[idx] for idx in spots_in(byte << shift & full_mask))
+                    for byte in range(256)
+                )
+                for shift in range(0, spot_count, 8)
+            )
+            for perm in self.symmetries
+        )
+
+    def zobrist_hash(self, state, sym=0):
+        """
+        Returns the Zobrist hash of state, after applying the symmetry sym.
+        The move counter and winner are left out, as they follow from the rest.
+        """
+        perm = self.symmetries[sym]
+        key = self.hand_keys[state.crows_in_hand] ^ self.captured_keys[state.crows_captured]
+        for crow_idx in spots_in(state.crows):
+            key ^= self.crow_keys[perm[crow_idx]]
+        if state.vulture >= 0:
+            key ^= self.vulture_keys[perm[state.vulture]]
+        if state.turn == PlayerClass.VULTURE:
+            key ^= self.turn_key
+        return key
+
+    def update_hash(self, key, state, move, sym=0):
+        """
+        Returns the hash of the state after move, from the hash key of state,
+        with the symmetry sym applied to both.
+        """
+        perm = self.symmetries[sym]
+        if state.turn == PlayerClass.CROW:
+            if move.source == -1:
+                key ^= self.hand_keys[state.crows_in_hand] ^ self.hand_keys[state.crows_in_hand - 1]
+            else:
+                key ^= self.crow_keys[perm[move.source]]
+            key ^= self.crow_keys[perm[move.target]]
+        else:
+            if move.source != -1:
+                key ^= self.vulture_keys[perm[move.source]]
+            key ^= self.vulture_keys[perm[move.target]]
+            if move.captured != -1:
+                key ^= self.crow_keys[perm[move.captured]]
+                key ^= (self.captured_keys[state.crows_captured]
+                        ^ self.captured_keys[state.crows_captured + 1])
+        return key ^ self.turn_key
+
+    def symmetric_hashes(self, state):
+        """
+        Returns the hashes of state under every symmetry.
+        """
+        return tuple(self.zobrist_hash(state, sym) for sym in range(len(self.symmetries)))
+
+    def update_symmetric_hashes(self, hashes, state, move):
+        """
+        Returns the hashes under every symmetry of the state after move.
+        """
+        return tuple(self.update_hash(key, state, move, sym) for sym, key in enumerate(hashes))
+
+    def canonical_state(self, state):
+        """
+        Returns the representative of the symmetry class of state, the one with the
+        smallest (crows, vulture), and the symmetry mapping state onto it.
+        """
+        best = None
+        best_sym = 0
+        for sym, perm in enumerate(self.symmetries):
+            vulture = perm[state.vulture] if state.vulture >= 0 else -1
+            candidate = (self.transform_mask(state.crows, sym), vulture)
+            if best is None or candidate < best:
+                best, best_sym = candidate, sym
+        return state._replace(crows=best[0], vulture=best[1]), best_sym
+
+    def transform_mask(self, mask, sym):
+        """
+        Returns the mask of spots mask, with the symmetry sym applied.
+        """
+        image = 0
+        for images in self.byte_images[sym]:
+            image |= images[mask & 0xFF]
+            mask >>= 8
+        return image
+
+    def transform_move(self, move, sym):
+        """
+        Returns move with the symmetry sym applied to its spots.
+        """
+        perm = self.symmetries[sym]
+        return Move(
+            perm[move.source] if move.source != -1 else -1,
+            perm[move.target],
+            perm[move.captured] if move.captured != -1 else -1
+        )
+
+STANDARD_HASHER = Hasher(STANDARD_RULES)
+CROW_KEYS = STANDARD_HASHER.crow_keys
+VULTURE_KEYS = STANDARD_HASHER.vulture_keys
+HAND_KEYS = STANDARD_HASHER.hand_keys
+CAPTURED_KEYS = STANDARD_HASHER.captured_keys
+TURN_KEY = STANDARD_HASHER.turn_key
+SYMMETRIES = STANDARD_HASHER.symmetries
+INVERSE = STANDARD_HASHER.inverse
+
+def zobrist_hash(state, sym=0):
+    """
+    Returns the Zobrist hash of state, after applying the symmetry sym.
+    The move counter and winner are left out, as they follow from the rest.
+    """
+    return STANDARD_HASHER.zobrist_hash(state, sym)
+
+def update_hash(key, state, move, sym=0):
+    """
+    Returns the hash of the state after move, from the hash key of state,
+    with the symmetry sym applied to both.
+    """
+    return STANDARD_HASHER.update_hash(key, state, move, sym)
+
+def symmetric_hashes(state):
+    """
+    Returns the hashes of state under every symmetry.
+    """
+    return STANDARD_HASHER.symmetric_hashes(state)
+
+def update_symmetric_hashes(hashes, state, move):
+    """
+    Returns the hashes under every symmetry of the state after move.
+    """
+    return STANDARD_HASHER.update_symmetric_hashes(hashes, state, move)
+
+def canonical_hash(hashes):
+    """
+    Returns the hash shared by every position of the symmetry class,
+    and the symmetry mapping the position onto the class representative.
+    """
+    key = min(hashes)
+    return key, hashes.index(key)
+
+def canonical_state(state):
+    """
+    Returns the representative of the symmetry class of state, the one with the
+    smallest (crows, vulture), and the symmetry mapping state onto it.
+    """
+    return STANDARD_HASHER.canonical_state(state)
+
+def transform_move(move, sym):
+    """
+    Returns move with the symmetry sym applied to its spots.
+    """
+    return STANDARD_HASHER.transform_move(move, sym)
+
+@functools.lru_cache(maxsize=None)
+def make_hasher(rules):
+    """
+    Returns the Hasher of rules, built once per variant.
+    """
+    if rules is STANDARD_RULES:
+        return STANDARD_HASHER
+    return Hasher(rules)
@@ -0,0 +1,97 @@
+"""
+Undo and redo of Kaooa moves, over persistent game state snapshots.
+
+Game states are immutable, so a snapshot is just the state with the move that
+led to it and a link to the previous snapshot. Every snapshot shares its past
+with its predecessors, and playing, undoing or redoing a move costs O(1) time
+and memory however long the game is. Search code can use a Timeline for
+make/unmake: play a move before recursing, and undo it on the way back.
+"""
+
+from typing import NamedTuple, Optional
+from kaooa_engine import GameState, Move, STANDARD_RULES
+
+class Snapshot(NamedTuple):
+    """
+    State of the game after move, linked to the snapshot before it.
+    """
+    state: GameState
+    move: Optional[Move]
+    previous: Optional['Snapshot']
+
+class Timeline:
+    """
+    Current snapshot of a game, with a stack of undone snapshots to redo.
+    The undone stack is a linked list of (snapshot, rest) pairs.
+    """
+    __slots__ = ('rules', 'current', 'undone')
+
+    def __init__(self, state=None, rules=STANDARD_RULES):
+        """
+        Starts the timeline of a game of rules at state, or at the initial state.
+        """
+        self.rules = rules
+        self.current = Snapshot(rules.initial_state() if state is None else state, None, None)
+        self.undone = None
+
+    @property
+    def state(self):
+        """
+        Returns the current game state.
+        """
+        return self.current.state
+
+    @property
+    def can_undo(self):
+        """
+        Checks if there is a move to undo.
+        """
+        return self.current.previous is not None
+
+    @property
+    def can_redo(self):
+        """
+        Checks if there is an undone move to redo.
+        """
+        return self.undone is not None
+
+    def play(self, move):
+        """
+        Plays move, dropping the undone moves. Returns the new state.
+        The move is assumed to be legal, as with apply_move.
+        """
+        self.current = Snapshot(self.rules.apply_move(self.current.state, move), move, self.current)
+        self.undone = None
+        return self.current.state
+
+    def undo(self):
+        """
+        Takes back the last move, and returns it, or None if there is none.
+        """
+        if self.current.previous is None:
+            return None
+        move = self.current.move
+        self.undone = (self.current, self.undone)
+        self.current = self.current.previous
+        return move
+
+    def redo(self):
+        """
+        Plays the last undone move again, and returns it, or None if there is none.
+        """
+        if self.undone is None:
+            return None
+        self.current, self.undone = self.undone
+        return self.current.move
+
+    def moves(self):
+        """
+        Returns the list of moves from the start of the timeline to the current state.
+        """
+        moves = []
+        snapshot = self.current
+        while snapshot.previous is not None:
+            moves.append(snapshot.move)
+            snapshot = snapshot.previous
+        moves.reverse()
+        return moves
@@ -0,0 +1,120 @@
+"""
+Load-test client for the Kaooa game server.
+
+Opens a number of connections, each running several games at once, and plays
+random legal moves in all of them as fast as the server answers. Reports the
+moves per second, and the percentiles of the latency of a move.
+"""
+
+import sys
+import time
+import random
+import asyncio
+import argparse
+from typing import NamedTuple
+from kaooa_engine import initial_state, legal_moves, apply_move
+from kaooa_server import HOST, PORT, winner_name
+
+MAX_PLIES = 200
+
+class LoadResult(NamedTuple):
+    """
+    Outcome of a load test. latencies are the seconds taken by each move.
+    """
+    games: int
+    moves: int
+    elapsed: float
+    latencies: list
+
+    @property
+    def moves_per_second(self):
+        """
+        Returns the move throughput.
+        """
+        return self.moves / self.elapsed if self.elapsed > 0 else 0.0
+
+    def percentile(self, fraction):
+        """
+        Returns the latency below which the fraction of the moves were answered.
+        """
+        ordered = sorted(self.latencies)
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+async def request(reader, writer, line):
+    """
+    Sends a command, and returns the words of the reply.
+    """
+    writer.write((line + '\n').encode('ascii'))
+    reply = (await reader.readline()).decode('ascii').split()
+    if not reply or reply[0] == 'ERR':
+        raise RuntimeError(f'Server failed {line}: {" ".join(reply)}')
+    return reply
+
+async def run_client(host, port, games, seed, latencies): # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    """
+    Plays games random games over one connection, taking turns between them.
+    Checks every reply against the local rules engine. Returns the moves played.
+    """
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    active = []
+    for _ in range(games):
+        game_id = (await request(reader, writer, 'NEW'))[1]
+        active.append((game_id, initial_state(), 0))
+    moves = 0
+    while active:
+        playing = []
+        for game_id, state, plies in active:
+            options = legal_moves(state)
+            if not options or plies >= MAX_PLIES:
+                await request(reader, writer, f'END {game_id}')
+                continue
+            move = rng.choice(options)
+            start = time.perf_counter()
+            reply = await request(reader, writer, f'MOVE {game_id} {move.source} {move.target}')
+            latencies.append(time.perf_counter() - start)
+            state = apply_move(state, move)
+            if reply != ['OK', winner_name(state)]:
+                raise RuntimeError(f'Server replied {" ".join(reply)} to {move}.')
+            playing.append((game_id, state, plies + 1))
+            moves += 1
+        active = playing
+    writer.close()
+    await writer.wait_closed()
+    return moves
+
+async def load_test(host, port, clients, games, seed=0): # pylint: disable=too-many-arguments,too-many-positional-arguments
+    """
+    Runs clients connections of games games each, against the server at host:port.
+    Returns the LoadResult.
+    """
+    latencies = []
+    start = time.perf_counter()
+    moves = await asyncio.gather(*(
+        run_client(host, port, games, seed + idx, latencies) for idx in range(clients)
+    ))
+    return LoadResult(clients * games, sum(moves), time.perf_counter() - start, latencies)
+
+def parse_args(argv):
+    """
+    Parses the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description='Kaooa game server load test.')
+    parser.add_argument('--host', default=HOST, help='address of the server')
+    parser.add_argument('--port', type=int, default=PORT, help='port of the server')
+    parser.add_argument('--clients', type=int, default=100, help='concurrent connections')
+    parser.add_argument('--games', type=int, default=10, help='concurrent games per connection')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    args = parser.parse_args(argv)
+    if args.clients < 1 or args.games < 1:
+        parser.error('--clients and --games should be positive.')
+    return args
+
+if __name__ == '__main__':
+    ARGS = parse_args(sys.argv[1:])
+    RESULT = asyncio.run(load_test(ARGS.host, ARGS.port, ARGS.clients, ARGS.games, ARGS.seed))
+    print(f'{RESULT.games} games, {RESULT.moves} moves in {RESULT.elapsed:.2f}s: '
+          f'{RESULT.moves_per_second:.0f} moves/s')
+    print(f'Move latency: p50 {1000 * RESULT.percentile(0.5):.2f}ms, '
+          f'p99 {1000 * RESULT.percentile(0.99):.2f}ms, '
+          f'max {1000 * max(RESULT.latencies):.2f}ms')
@@ -0,0 +1,132 @@
+"""
+Logging of the Kaooa GUI, off the render thread.
+
+Records are put on a queue by a QueueHandler, and formatted and written by the
+handlers of a QueueListener on its own thread, so a frame never waits for the
+console. A ThrottleFilter drops repeats of a message within an interval, and
+caps the messages let through per interval; a later repeat reports how many
+copies were dropped. A MessageLine keeps the latest warning as plain text, for
+the GUI to show on screen. A DeferredHandler builds its handler at the first
+message, so a costly handler is only imported when there is something to log,
+and then on the listener thread.
+"""
+
+import time
+import queue
+import logging
+import logging.handlers
+
+THROTTLE_INTERVAL = 1.0
+THROTTLE_BURST = 10
+MAX_TRACKED = 256
+MESSAGE_SECONDS = 4.0
+
+class ThrottleFilter(logging.Filter): # pylint: disable=too-few-public-methods
+    """
+    Drops repeats of a message within interval seconds, and any message beyond
+    burst in an interval. clock returns the current time in seconds.
+    """
+    def __init__(self, interval=THROTTLE_INTERVAL, burst=THROTTLE_BURST, clock=time.monotonic):
+        """
+        Starts with no messages seen.
+        """
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self.clock = clock
+        self.recent = {}
+        self.window_start = None
+        self.passed = 0
+        self.dropped = 0
+
+    def filter(self, record):
+        """
+        Checks if record should be logged, and notes the repeats it stands for.
+        """
+        now = self.clock()
+        key = (record.levelno, record.getMessage())
+        last = self.recent.get(key)
+        if last is not None and now - last[0] < self.interval:
+            self.recent[key] = (last[0], last[1] + 1)
+            self.dropped += 1
+            return False
+        if self.window_start is None or now - self.window_start >= self.interval:
+            self.window_start = now
+            self.passed = 0
+        if self.passed >= self.burst:
+            self.dropped += 1
+            return False
+        self.passed += 1
+        if last is not None and last[1] > 0:
+            record.msg = f'{key[1]} (repeated {last[1]} more times)'
+            record.args = None
+        if len(self.recent) >= MAX_TRACKED:
+            self.recent = {
+                seen: entry for seen, entry in self.recent.items() if now - entry[0] < self.interval
+            }
+        self.recent[key] = (now, 0)
+        return True
+
+class MessageLine(logging.Handler):
+    """
+    Latest message at or above level, kept for duration seconds.
+    """
+    def __init__(self, level=logging.WARNING, duration=MESSAGE_SECONDS, clock=time.monotonic):
+        """
+        Starts with no message.
+        """
+        super().__init__(level)
+        self.duration = duration
+        self.clock = clock
+        self.text = None
+        self.shown_at = None
+
+    def emit(self, record):
+        """
+        Keeps the message of record, unformatted.
+        """
+        self.text = record.getMessage()
+        self.shown_at = self.clock()
+
+    def current(self):
+        """
+        Returns the message to show, or None if there is none or it has expired.
+        """
+        if self.text is None or self.clock() - self.shown_at >= self.duration:
+            return None
+        return self.text
+
+class DeferredHandler(logging.Handler):
+    """
+    Handler passing records on to the handler built by factory, at the first record.
+    """
+    def __init__(self, factory, level=logging.NOTSET):
+        """
+        Starts with the handler not built.
+        """
+        super().__init__(level)
+        self.factory = factory
+        self.handler = None
+
+    def emit(self, record):
+        """
+        Passes record on, building the handler if needed.
+        """
+        if self.handler is None:
+            self.handler = self.factory()
+        self.handler.handle(record)
+
+def start_logging(logger, *handlers, throttle=None):
+    """
+    Sends the records of logger through a queue to handlers, written on a
+    listener thread, with throttle or a default ThrottleFilter applied first.
+    Returns the started QueueListener, to be stopped when the program ends.
+    """
+    records = queue.SimpleQueue()
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    logger.addFilter(ThrottleFilter() if throttle is None else throttle)
+    logger.addHandler(logging.handlers.QueueHandler(records))
+    listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,243 @@
+"""
+Monte Carlo Tree Search player for the Kaooa game.
+
+The tree is grown in the calling process, while the random playouts from its
+leaves are run in batches on a concurrent.futures process pool, so the number
+of playouts scales with the number of cores. The playouts use the headless
+rules engine, so they follow the same rules as the GUI.
+"""
+
+import os
+import sys
+import math
+import time
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Optional
+from kaooa_engine import Move, initial_state, legal_moves, apply_move
+
+MAX_PLAYOUT_PLIES = 200
+
+class MCTSResult(NamedTuple):
+    """
+    Outcome of a search, with the playout statistics of each worker process.
+    worker_stats maps the worker pid to its (playouts, busy seconds).
+    """
+    move: Optional[Move]
+    visits: int
+    playouts: int
+    elapsed: float
+    worker_stats: dict
+
+    @property
+    def playouts_per_second(self):
+        """
+        Returns the overall playout throughput.
+        """
+        return self.playouts / self.elapsed if self.elapsed > 0 else 0.0
+
+    def worker_rates(self):
+        """
+        Returns the playouts per second of each worker, keyed by pid.
+        """
+        return {
+            pid: playouts / busy if busy > 0 else 0.0
+            for pid, (playouts, busy) in self.worker_stats.items()
+        }
+
+def playout(state, rng, max_plies=MAX_PLAYOUT_PLIES):
+    """
+    Plays uniformly random moves from state.
+    Returns the winner, or None if the game is stuck or exceeds max_plies.
+    """
+    for _ in range(max_plies):
+        if state.winner is not None:
+            return state.winner
+        moves = legal_moves(state)
+        if not moves:
+            return None
+        state = apply_move(state, rng.choice(moves))
+    return state.winner
+
+def rollout_batch(states, seed, max_plies):
+    """
+    Runs one playout from each state.
+    Returns the winners, the pid of the process, and the seconds spent.
+    """
+    start = time.perf_counter()
+    rng = random.Random(seed)
+    winners = [playout(state, rng, max_plies) for state in states]
+    return winners, os.getpid(), time.perf_counter() - start
+
+class Node:
+    """
+    Node of the search tree.
+    score is the total reward of the player who made move, over the visits.
+    """
+    __slots__ = ('state', 'move', 'parent', 'children', 'untried', 'visits', 'score')
+
+    def __init__(self, state, move=None, parent=None):
+        self.state = state
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.untried = legal_moves(state)
+        self.visits = 0
+        self.score = 0.0
+
+    def select_child(self, exploration):
+        """
+        Returns the child with the highest upper confidence bound.
+        """
+        log_visits = math.log(self.visits)
+        return max(
+            self.children,
+            key=lambda child: child.score / child.visits
+            + exploration * math.sqrt(log_visits / child.visits)
+        )
+
+    def expand(self, rng):
+        """
+        Adds a child for one of the untried moves, and returns it.
+        """
+        move = self.untried.pop(rng.randrange(len(self.untried)))
+        child = Node(apply_move(self.state, move), move, self)
+        self.children.append(child)
+        return child
+
+class MCTSAgent: # pylint: disable=too-many-instance-attributes
+    """
+    Computer player, choosing moves by Monte Carlo Tree Search.
+    With workers = 0 the playouts run in the calling process.
+    """
+    def __init__( # pylint: disable=too-many-arguments,too-many-positional-arguments
+            self, playouts=2000, workers=0, batch_size=64, exploration=1.4,
+            time_limit=None, seed=None
+    ):
+        """
+        Initialises the agent with its playout budget and pool size.
+        """
+        self.playouts = playouts
+        self.workers = workers
+        self.batch_size = max(batch_size, 1)
+        self.exploration = exploration
+        self.time_limit = time_limit
+        self.rng = random.Random(seed)
+        self.pool = None
+        self.last_result = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Shuts down the process pool, if one was started.
+        """
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def choose_move(self, state):
+        """
+        Returns the move chosen for the side to move in state.
+        """
+        return self.search(state).move
+
+    def search(self, state):
+        """
+        Grows the tree from state until the playout or time budget runs out.
+        Returns the MCTSResult, with the most visited move.
+        """
+        start = time.perf_counter()
+        root = Node(state)
+        worker_stats = {}
+        done = 0
+        if len(root.untried) > 1:
+            while done < self.playouts:
+                if self.time_limit is not None and time.perf_counter() - start >= self.time_limit:
+                    break
+                batch = min(self.batch_size, self.playouts - done)
+                leaves = [self.select(root) for _ in range(batch)]
+                for leaf, winner in zip(leaves, self.rollout(leaves, worker_stats)):
+                    backpropagate(leaf, winner)
+                done += len(leaves)
+
+        if root.children:
+            move = max(root.children, key=lambda child: child.visits).move
+        else:
+            move = root.untried[0] if root.untried else None
+        result = MCTSResult(move, root.visits, done, time.perf_counter() - start, worker_stats)
+        self.last_result = result
+        return result
+
+    def select(self, root):
+        """
+        Walks down the tree to a leaf, expanding it if it has untried moves.
+        The visits along the path are counted at once, as a virtual loss,
+        so the rest of the batch is steered towards other leaves.
+        """
+        node = root
+        while not node.untried and node.children:
+            node = node.select_child(self.exploration)
+        if node.untried:
+            node = node.expand(self.rng)
+        walk = node
+        while walk is not None:
+            walk.visits += 1
+            walk = walk.parent
+        return node
+
+    def rollout(self, leaves, worker_stats):
+        """
+        Returns the winners of one playout from each leaf, spread over the pool.
+        """
+        states = [leaf.state for leaf in leaves]
+        if self.workers == 0:
+            batches = [rollout_batch(states, self.rng.getrandbits(64), MAX_PLAYOUT_PLIES)]
+        else:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            chunk = math.ceil(len(states) / self.workers)
+            futures = [
+                self.pool.submit(
+                    rollout_batch, states[idx:idx + chunk],
+                    self.rng.getrandbits(64), MAX_PLAYOUT_PLIES
+                )
+                for idx in range(0, len(states), chunk)
+            ]
+            batches = [future.result() for future in futures]
+
+        winners = []
+        for batch_winners, pid, busy in batches:
+            playouts, seconds = worker_stats.get(pid, (0, 0.0))
+            worker_stats[pid] = (playouts + len(batch_winners), seconds + busy)
+            winners.extend(batch_winners)
+        return winners
+
+def backpropagate(leaf, winner):
+    """
+    Adds the reward of the playout to every node on the path to the root.
+    A node is credited when its mover won, and half credited when nobody won.
+    """
+    node = leaf
+    while node.parent is not None:
+        mover = node.parent.state.turn
+        if winner is None:
+            node.score += 0.5
+        elif winner == mover:
+            node.score += 1.0
+        node = node.parent
+
+if __name__ == '__main__':
+    WORKERS = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    PLAYOUTS = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    with MCTSAgent(playouts=PLAYOUTS, workers=WORKERS, batch_size=32 * max(WORKERS, 1)) as AGENT:
+        RESULT = AGENT.search(initial_state())
+    print(f'Best move: {RESULT.move}, from {RESULT.visits} visits.')
+    print(f'{RESULT.playouts} playouts in {RESULT.elapsed:.2f}s, '
+          f'{RESULT.playouts_per_second:.0f} playouts/s overall.')
+    for PID, RATE in sorted(RESULT.worker_rates().items()):
+        print(f'worker {PID}: {RESULT.worker_stats[PID][0]} playouts, {RATE:.0f} playouts/s')
@@ -0,0 +1,206 @@
+"""
+Frame timing of the Kaooa GUI.
+
+A FrameTimer splits each pass of the main loop into stages, marked as the loop
+goes, and keeps the timings of the recent frames for an on-screen summary: the
+frames per second, a histogram of the busy time of a frame, and the mean time
+of each stage. Time spent waiting, for events or for the next tick of the
+clock, counts towards the interval between frames but not towards their busy
+time. Every frame can also be written to a CSV trace.
+
+A ProfileCapture runs cProfile over the game on demand, and writes each capture
+to a timestamped pstats file, which pstats, snakeviz or flameprof can read.
+"""
+
+import os
+import csv
+import time
+import bisect
+import cProfile
+from collections import deque
+
+STAGES = ('events', 'logic', 'status', 'sprites', 'display')
+BUCKET_EDGES_MS = (1, 2, 4, 8, 16, 33)
+HISTORY = 240
+
+def bucket_labels(edges=BUCKET_EDGES_MS):
+    """
+    Returns the label of each histogram bucket, the last one being open ended.
+    """
+    return tuple(f'<{edge}' for edge in edges) + (f'{edges[-1]}+',)
+
+class FrameTimer: # pylint: disable=too-many-instance-attributes
+    """
+    Stage timings of the recent frames, and the optional CSV trace of all frames.
+    Times are passed in seconds, or read from time.perf_counter.
+    """
+    __slots__ = ('stages', 'history', 'frame_start', 'last', 'current', 'count', 'file', 'writer')
+
+    def __init__(self, stages=STAGES, history=HISTORY, trace=None):
+        """
+        Starts with no frames. trace is the path of a CSV file to write every frame to.
+        """
+        self.stages = stages
+        self.history = deque(maxlen=history)
+        self.frame_start = None
+        self.last = None
+        self.current = None
+        self.count = 0
+        self.file = None
+        self.writer = None
+        if trace is not None:
+            self.file = open( # pylint: disable=consider-using-with
+                trace, 'w', newline='', encoding='ascii'
+            )
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(
+                ('frame', 'interval_ms', 'busy_ms') + tuple(f'{stage}_ms' for stage in stages)
+            )
+
+    def start(self, now=None):
+        """
+        Starts a frame.
+        """
+        now = time.perf_counter() if now is None else now
+        if self.frame_start is not None and self.current is not None:
+            self.finish(now)
+        self.frame_start = now
+        self.last = now
+        self.current = [0.0] * len(self.stages)
+
+    def mark(self, stage, now=None):
+        """
+        Charges the time since the previous mark to stage, if a frame is running.
+        """
+        if self.current is None:
+            return
+        now = time.perf_counter() if now is None else now
+        self.current[self.stages.index(stage)] += now - self.last
+        self.last = now
+
+    def skip(self, now=None):
+        """
+        Leaves the time since the previous mark out of the busy time, as waiting.
+        """
+        self.last = time.perf_counter() if now is None else now
+
+    def finish(self, now):
+        """
+        Ends the current frame at now, the start of the next one.
+        """
+        interval = now - self.frame_start
+        self.history.append((interval, tuple(self.current)))
+        self.count += 1
+        if self.writer is not None:
+            self.writer.writerow(
+                (self.count, f'{1000 * interval:.3f}', f'{1000 * sum(self.current):.3f}')
+                + tuple(f'{1000 * seconds:.3f}' for seconds in self.current)
+            )
+        self.current = None
+
+    def fps(self):
+        """
+        Returns the frames per second over the recent frames.
+        """
+        elapsed = sum(interval for interval, _ in self.history)
+        return len(self.history) / elapsed if elapsed > 0 else 0.0
+
+    def busy_times(self):
+        """
+        Returns the busy seconds of each recent frame.
+        """
+        return [sum(stages) for _, stages in self.history]
+
+    def percentile(self, fraction):
+        """
+        Returns the busy time below which the fraction of the recent frames ran,
+        in milliseconds.
+        """
+        ordered = sorted(self.busy_times())
+        if not ordered:
+            return 0.0
+        return 1000 * ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+    def histogram(self, edges=BUCKET_EDGES_MS):
+        """
+        Returns the count of recent frames in each bucket of busy time,
+        with one more bucket above the last edge.
+        """
+        counts = [0] * (len(edges) + 1)
+        for busy in self.busy_times():
+            counts[bisect.bisect_right(edges, 1000 * busy)] += 1
+        return counts
+
+    def stage_means(self):
+        """
+        Returns the mean milliseconds of each stage over the recent frames.
+        """
+        if not self.history:
+            return {stage: 0.0 for stage in self.stages}
+        totals = [sum(column) for column in zip(*(stages for _, stages in self.history))]
+        return {
+            stage: 1000 * total / len(self.history) for stage, total in zip(self.stages, totals)
+        }
+
+    def close(self, now=None):
+        """
+        Ends the current frame, and closes the CSV trace, if any.
+        """
+        if self.current is not None:
+            self.finish(time.perf_counter() if now is None else now)
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            self.writer = None
+
+class ProfileCapture:
+    """
+    On demand cProfile capture of the running process, written to directory.
+    """
+    __slots__ = ('directory', 'profiler', 'started')
+
+    def __init__(self, directory='.'):
+        """
+        Starts with no capture running.
+        """
+        self.directory = directory
+        self.profiler = None
+        self.started = None
+
+    @property
+    def active(self):
+        """
+        Checks if a capture is running.
+        """
+        return self.profiler is not None
+
+    def start(self):
+        """
+        Starts a capture.
+        """
+        self.started = time.time()
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def stop(self):
+        """
+        Stops the capture, and returns the path of its pstats file.
+        The file is named after the time the capture started.
+        """
+        self.profiler.disable()
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started))
+        millis = int(1000 * (self.started % 1))
+        path = os.path.join(self.directory, f'kaooa-profile-{stamp}-{millis:03d}.pstats')
+        self.profiler.dump_stats(path)
+        self.profiler = None
+        return path
+
+    def toggle(self):
+        """
+        Starts a capture, or stops the running one.
+        Returns the path of the written file, or None if a capture started.
+        """
+        if self.active:
+            return self.stop()
+        self.start()
+        return None
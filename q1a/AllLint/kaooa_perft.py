@@ -0,0 +1,57 @@
+"""
+Perft node counting for the Kaooa rules engine.
+
+Counts the leaf nodes of the full game tree to a fixed depth, which checks the
+move generator against known totals, and measures its throughput.
+"""
+
+import sys
+import time
+from kaooa_engine import initial_state, legal_moves, apply_move
+
+PERFT_INITIAL = (1, 10, 90, 720, 1500, 10780, 23460, 149360, 296900, 1661000, 3140140)
+
+def perft(state, depth):
+    """
+    Returns the number of leaf nodes, depth plies below state.
+    Finished games are not expanded further, and so add no nodes.
+    """
+    if depth == 0:
+        return 1
+    moves = legal_moves(state)
+    if depth == 1:
+        return len(moves)
+    return sum(perft(apply_move(state, move), depth - 1) for move in moves)
+
+def divide(state, depth):
+    """
+    Returns the perft count below each legal move of state.
+    """
+    return {
+        move: perft(apply_move(state, move), depth - 1)
+        for move in legal_moves(state)
+    }
+
+def benchmark(max_depth):
+    """
+    Runs perft from the initial position up to max_depth, and prints the node
+    counts, nodes per second, and whether the counts match PERFT_INITIAL.
+    Returns True, if every known count matched.
+    """
+    matched = True
+    for depth in range(1, max_depth + 1):
+        start = time.perf_counter()
+        nodes = perft(initial_state(), depth)
+        elapsed = time.perf_counter() - start
+        if depth < len(PERFT_INITIAL):
+            status = 'ok' if nodes == PERFT_INITIAL[depth] else 'MISMATCH'
+            matched = matched and nodes == PERFT_INITIAL[depth]
+        else:
+            status = 'unknown'
+        rate = nodes / elapsed if elapsed > 0 else float('inf')
+        print(f'depth {depth:2}: {nodes:12} nodes {elapsed:8.3f}s {rate:12.0f} nodes/s {status}')
+    return matched
+
+if __name__ == '__main__':
+    DEPTH = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    sys.exit(0 if benchmark(DEPTH) else 1)
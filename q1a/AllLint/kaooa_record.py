@@ -0,0 +1,213 @@
+"""
+Compact binary records of Kaooa games, and their headless replay.
+
+An archive starts with a magic, followed by any number of games appended one
+after another. Each game is a header with its start time and move count, and
+4 bytes per move: the kind of move and its source spot, the target spot, and
+the hundredths of a second since the previous move. The captured crow is not
+stored, as it follows from the source and target of a capture.
+"""
+
+import sys
+import time
+import struct
+import functools
+from enum import Enum
+from typing import NamedTuple
+from kaooa_board import CAPTURES
+from kaooa_engine import PlayerClass, Move, initial_state, apply_move, validate_move
+
+MAGIC = b'KAOOAGR1'
+GAME_HEADER = struct.Struct('<dH')
+MOVE_RECORD = struct.Struct('<BBH')
+NO_SPOT = 0xF
+TICKS_PER_SECOND = 100
+MAX_TICKS = 0xFFFF
+MAX_MOVES = 0xFFFF
+CAPTURED = {
+    (source, jump_idx): crow_idx
+    for source, captures in enumerate(CAPTURES) for crow_idx, jump_idx in captures
+}
+
+class MoveKind(Enum):
+    """
+    Kind of a recorded move.
+    """
+    DROP = 0
+    SLIDE = 1
+    CAPTURE = 2
+
+class GameRecord(NamedTuple):
+    """
+    Moves of a game, with the seconds elapsed before each of them.
+    start is the time the game started, in seconds since the epoch.
+    """
+    start: float
+    moves: tuple
+    offsets: tuple
+
+def move_kind(move):
+    """
+    Returns the MoveKind of move.
+    """
+    if move.source == -1:
+        return MoveKind.DROP
+    if move.captured != -1:
+        return MoveKind.CAPTURE
+    return MoveKind.SLIDE
+
+def captured_spot(source, target):
+    """
+    Returns the crow captured by the vulture jumping from source to target.
+    """
+    if (source, target) not in CAPTURED:
+        raise ValueError(f'No capture from {source} to {target}.')
+    return CAPTURED[source, target]
+
+def encode_move(move, offset):
+    """
+    Packs a move, played offset seconds after the previous one, into a move record.
+    Offsets too long for the record are clamped.
+    """
+    source = NO_SPOT if move.source == -1 else move.source
+    ticks = min(max(round(offset * TICKS_PER_SECOND), 0), MAX_TICKS)
+    return MOVE_RECORD.pack(move_kind(move).value << 4 | source, move.target, ticks)
+
+@functools.lru_cache(maxsize=None)
+def decode_move(head, target):
+    """
+    Returns the move of a move record, from its first two fields.
+    There are few distinct moves, so each is built only once.
+    Raises ValueError, if the record is not a move. Its spots are checked by replay.
+    """
+    kind = MoveKind(head >> 4)
+    source = head & NO_SPOT
+    if kind == MoveKind.DROP:
+        move = Move(-1, target)
+    elif kind == MoveKind.CAPTURE:
+        move = Move(source, target, captured_spot(source, target))
+    else:
+        move = Move(source, target)
+    return move
+
+def encode_game(record):
+    """
+    Packs a game record, into its header followed by its moves.
+    Raises ValueError, if the game has more moves than the header can count.
+    """
+    if len(record.moves) > MAX_MOVES:
+        raise ValueError(f'Games of over {MAX_MOVES} moves cannot be archived.')
+    return GAME_HEADER.pack(record.start, len(record.moves)) + b''.join(
+        encode_move(move, offset) for move, offset in zip(record.moves, record.offsets)
+    )
+
+def decode_games(buffer, pos=len(MAGIC)):
+    """
+    Yields the game records of buffer, starting at pos.
+    Raises ValueError, if the buffer ends within a game.
+    """
+    while pos < len(buffer):
+        if pos + GAME_HEADER.size > len(buffer):
+            raise ValueError('Archive ends within a game header.')
+        start, count = GAME_HEADER.unpack_from(buffer, pos)
+        pos += GAME_HEADER.size
+        end = pos + count * MOVE_RECORD.size
+        if end > len(buffer):
+            raise ValueError('Archive ends within the moves of a game.')
+        fields = tuple(MOVE_RECORD.iter_unpack(buffer[pos:end]))
+        pos = end
+        yield GameRecord(
+            start,
+            tuple(decode_move(head, target) for head, target, _ in fields),
+            tuple(ticks / TICKS_PER_SECOND for _, _, ticks in fields)
+        )
+
+def append_games(path, records):
+    """
+    Appends game records to the archive at path, creating it if it is missing.
+    """
+    with open(path, 'ab') as file:
+        if file.tell() == 0:
+            file.write(MAGIC)
+        for record in records:
+            file.write(encode_game(record))
+
+def read_archive(path):
+    """
+    Returns the list of game records in the archive at path.
+    """
+    with open(path, 'rb') as file:
+        buffer = file.read()
+    if buffer[:len(MAGIC)] != MAGIC:
+        raise ValueError('File is not a Kaooa game archive.')
+    return list(decode_games(buffer))
+
+def replay(record, validate=True):
+    """
+    Plays the moves of a game record through the rules engine.
+    Returns the final state. Raises ValueError on an illegal move, if validate is set.
+    """
+    state = initial_state()
+    for move in record.moves:
+        if validate:
+            validate_move(state, move)
+        state = apply_move(state, move)
+    return state
+
+class GameRecorder:
+    """
+    Collects the moves of a game as they are played, with their timing.
+    """
+    __slots__ = ('start', 'last', 'moves', 'offsets')
+
+    def __init__(self, start=None):
+        """
+        Starts a recording, at start or at the current time.
+        """
+        self.start = time.time() if start is None else start
+        self.last = self.start
+        self.moves = []
+        self.offsets = []
+
+    def add(self, move, now=None):
+        """
+        Records move, played at now or at the current time.
+        Raises ValueError, if the recording already holds the most moves an archive can.
+        """
+        if len(self.moves) >= MAX_MOVES:
+            raise ValueError(f'Games of over {MAX_MOVES} moves cannot be archived.')
+        now = time.time() if now is None else now
+        self.moves.append(move)
+        self.offsets.append(now - self.last)
+        self.last = now
+
+    def undo(self):
+        """
+        Drops the last recorded move, when it is taken back.
+        """
+        if self.moves:
+            self.moves.pop()
+            self.offsets.pop()
+
+    def record(self):
+        """
+        Returns the GameRecord of the moves so far.
+        """
+        return GameRecord(self.start, tuple(self.moves), tuple(self.offsets))
+
+if __name__ == '__main__':
+    ARCHIVE = sys.argv[1] if len(sys.argv) > 1 else 'kaooa.kgr'
+    START = time.perf_counter()
+    RECORDS = read_archive(ARCHIVE)
+    READ = time.perf_counter() - START
+    WINS = {PlayerClass.VULTURE: 0, PlayerClass.CROW: 0, None: 0}
+    START = time.perf_counter()
+    for RECORD in RECORDS:
+        WINS[replay(RECORD).winner] += 1
+    ELAPSED = time.perf_counter() - START
+    MOVES = sum(len(RECORD.moves) for RECORD in RECORDS)
+    print(f'Read {len(RECORDS)} games, {MOVES} moves in {READ:.2f}s.')
+    print(f'Replayed in {ELAPSED:.2f}s: {len(RECORDS) / ELAPSED:.0f} games/s, '
+          f'{MOVES / ELAPSED:.0f} moves/s.')
+    print(f'VULTURE: {WINS[PlayerClass.VULTURE]}, CROW: {WINS[PlayerClass.CROW]}, '
+          f'unfinished: {WINS[None]}')
@@ -0,0 +1,243 @@
+"""
+Alpha-beta search for a computer player of the Kaooa game.
+
+The search is a negamax with iterative deepening and a transposition table,
+over the headless rules engine, so it follows the same capture obligation,
+drop phase and win conditions as the GUI. The table is keyed by the canonical
+Zobrist hash, so the symmetric copies of a position share one entry.
+An agent plays the standard game, or the variant of the rules it is given.
+"""
+
+import time
+from typing import NamedTuple, Optional
+from kaooa_board import VULTURE_SLIDE_COUNT, CAPTURE_COUNT
+from kaooa_engine import PlayerClass, Move, STANDARD_RULES
+from kaooa_hashing import canonical_hash, make_hasher
+
+WIN_SCORE = 100000
+MAX_DEPTH = 64
+EXACT, LOWER, UPPER = 0, 1, 2
+
+class SearchResult(NamedTuple):
+    """
+    Outcome of a search, with the statistics of the deepest completed iteration.
+    """
+    move: Optional[Move]
+    score: int
+    depth: int
+    nodes: int
+    elapsed: float
+
+    @property
+    def nodes_per_second(self):
+        """
+        Returns the search throughput.
+        """
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+class SearchTimeout(Exception):
+    """
+    Raised inside the search, when the time or node budget is exhausted.
+    """
+
+def evaluate(state, board=None):
+    """
+    Returns a static score of state, from the point of view of the side to move.
+    The vulture gains from captures, open neighbours and capture threats.
+    board is the Board of a variant, or None for the standard board, whose
+    counts are read from the move count tables.
+    """
+    score = 100 * state.crows_captured
+    vulture = state.vulture
+    if vulture >= 0 and board is None:
+        score += 10 * VULTURE_SLIDE_COUNT[vulture][state.crows]
+        score += 40 * CAPTURE_COUNT[vulture][state.crows]
+    elif vulture >= 0:
+        vacant = board.full_mask & ~state.occupied
+        score += 10 * (board.neighbours[vulture] & vacant).bit_count()
+        score += 40 * len(board.capture_options(state.crows, vulture))
+    if state.turn == PlayerClass.CROW:
+        return -score
+    return score
+
+class AlphaBetaAgent: # pylint: disable=too-many-instance-attributes
+    """
+    Computer player, choosing moves by alpha-beta search.
+    Plays whichever side is to move in the state it is given.
+    """
+    def __init__(self, time_limit=1.0, node_limit=None, max_depth=MAX_DEPTH, table_size=1 << 20, # pylint: disable=too-many-arguments,too-many-positional-arguments
+                 rules=STANDARD_RULES):
+        """
+        Initialises the agent with its search budget, and the rules it plays by.
+        time_limit is in seconds, and either limit can be None to disable it.
+        """
+        self.rules = rules
+        self.hasher = make_hasher(rules)
+        self.board = None if rules is STANDARD_RULES else rules.board
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.max_depth = max_depth
+        self.table_size = table_size
+        self.table = {}
+        self.nodes = 0
+        self.deadline = None
+        self.last_result = None
+
+    def choose_move(self, state):
+        """
+        Returns the move chosen for the side to move in state.
+        """
+        return self.search(state).move
+
+    def search(self, state):
+        """
+        Searches state by iterative deepening, until the budget runs out.
+        Returns the SearchResult of the deepest completed iteration.
+        """
+        start = time.perf_counter()
+        self.nodes = 0
+        self.deadline = None if self.time_limit is None else start + self.time_limit
+        if len(self.table) > self.table_size:
+            self.table.clear()
+
+        moves = self.rules.legal_moves(state)
+        result = SearchResult(moves[0] if moves else None, 0, 0, 0, 0.0)
+        if len(moves) <= 1:
+            self.last_result = result
+            return result
+
+        for depth in range(1, self.max_depth + 1):
+            moves.remove(result.move)
+            moves.insert(0, result.move)
+            try:
+                score, move = self.search_root(
+                    state, self.hasher.symmetric_hashes(state), moves, depth
+                )
+            except SearchTimeout:
+                break
+            result = SearchResult(move, score, depth, self.nodes, time.perf_counter() - start)
+            if abs(score) >= WIN_SCORE - MAX_DEPTH:
+                break
+        result = result._replace(nodes=self.nodes, elapsed=time.perf_counter() - start)
+        self.last_result = result
+        return result
+
+    def search_root(self, state, hashes, moves, depth):
+        """
+        Returns the best score and move of state, searched depth plies deep.
+        """
+        alpha = -WIN_SCORE - 1
+        best_move = moves[0]
+        for move in moves:
+            child = self.rules.apply_move(state, move)
+            child_hashes = self.hasher.update_symmetric_hashes(hashes, state, move)
+            score = -self.negamax(child, child_hashes, depth - 1, -WIN_SCORE - 1, -alpha, 1)
+            if score > alpha:
+                alpha = score
+                best_move = move
+        return alpha, best_move
+
+    def check_budget(self):
+        """
+        Raises SearchTimeout, if the time or node budget is exhausted.
+        """
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            raise SearchTimeout
+        if self.deadline is not None and self.nodes & 1023 == 0:
+            if time.perf_counter() >= self.deadline:
+                raise SearchTimeout
+
+    def negamax(self, state, hashes, depth, alpha, beta, ply): # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+        """
+        Returns the score of state for the side to move, searched depth plies deep.
+        hashes are the symmetric Zobrist hashes of state, updated move by move.
+        """
+        self.nodes += 1
+        self.check_budget()
+        if state.winner is not None:
+            if state.winner == state.turn:
+                return WIN_SCORE - ply
+            return -(WIN_SCORE - ply)
+        rules = self.rules
+        hasher = self.hasher
+        moves = rules.legal_moves(state)
+        if not moves:
+            return 0
+        if depth == 0:
+            return evaluate(state, self.board)
+
+        key, sym = canonical_hash(hashes)
+        cutoff, best_move = self.probe(key, sym, depth, alpha, beta, ply)
+        if cutoff is not None:
+            return cutoff
+        if best_move in moves:
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+
+        original_alpha = alpha
+        best_score = -WIN_SCORE - 1
+        for move in moves:
+            score = -self.negamax(
+                rules.apply_move(state, move), hasher.update_symmetric_hashes(hashes, state, move),
+                depth - 1, -beta, -alpha, ply + 1
+            )
+            if score > best_score:
+                best_score = score
+                best_move = move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if best_score <= original_alpha:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table[key] = (
+            depth, to_table(best_score, ply), flag, hasher.transform_move(best_move, sym)
+        )
+        return best_score
+
+    def probe(self, key, sym, depth, alpha, beta, ply): # pylint: disable=too-many-arguments,too-many-positional-arguments
+        """
+        Looks up key in the transposition table.
+        Returns the stored score if it settles the node at this depth and window,
+        or None otherwise, along with the stored best move for move ordering.
+        Moves are stored as seen from the class representative, and sym maps
+        the position onto it.
+        """
+        entry = self.table.get(key)
+        if entry is None:
+            return None, None
+        entry_depth, entry_score, flag, best_move = entry
+        best_move = self.hasher.transform_move(best_move, self.hasher.inverse[sym])
+        entry_score = from_table(entry_score, ply)
+        if entry_depth >= depth:
+            if flag == EXACT:
+                return entry_score, best_move
+            if flag == LOWER and entry_score >= beta:
+                return entry_score, best_move
+            if flag == UPPER and entry_score <= alpha:
+                return entry_score, best_move
+        return None, best_move
+
+def to_table(score, ply):
+    """
+    Converts a win score relative to the root into one relative to the stored node.
+    """
+    if score >= WIN_SCORE - MAX_DEPTH:
+        return score + ply
+    if score <= -WIN_SCORE + MAX_DEPTH:
+        return score - ply
+    return score
+
+def from_table(score, ply):
+    """
+    Converts a stored win score back into one relative to the root.
+    """
+    if score >= WIN_SCORE - MAX_DEPTH:
+        return score - ply
+    if score <= -WIN_SCORE + MAX_DEPTH:
+        return score + ply
+    return score
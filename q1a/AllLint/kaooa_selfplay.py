@@ -0,0 +1,124 @@
+"""
+Headless self-play runner for the Kaooa game.
+
+Plays a number of games between two agents over a pool of worker processes,
+and reports the throughput, the win rates and the distribution of game lengths.
+"""
+
+import os
+import sys
+import time
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Optional
+from kaooa_engine import PlayerClass, initial_state, apply_move
+from kaooa_agents import AGENTS, make_agent
+from kaooa_record import GameRecord, append_games
+
+MAX_PLIES = 200
+BUCKET = 10
+
+class GameResult(NamedTuple):
+    """
+    Outcome of a game. winner is None, if the game was stuck or hit the ply limit.
+    """
+    winner: Optional[PlayerClass]
+    plies: int
+    moves: tuple = ()
+
+def play_game(vulture_agent, crow_agent, max_plies=MAX_PLIES):
+    """
+    Plays a game between the agents, and returns its GameResult.
+    """
+    state = initial_state()
+    moves = []
+    for ply in range(max_plies):
+        if state.winner is not None:
+            return GameResult(state.winner, ply, tuple(moves))
+        agent = vulture_agent if state.turn == PlayerClass.VULTURE else crow_agent
+        move = agent.choose_move(state)
+        if move is None:
+            return GameResult(None, ply, tuple(moves))
+        state = apply_move(state, move)
+        moves.append(move)
+    return GameResult(state.winner, max_plies, tuple(moves))
+
+def play_games(vulture, crow, count, seed, think, max_plies): # pylint: disable=too-many-arguments,too-many-positional-arguments
+    """
+    Plays count games between the agents named vulture and crow, in one worker.
+    Returns the list of GameResults.
+    """
+    vulture_agent = make_agent(vulture, seed, think)
+    crow_agent = make_agent(crow, seed + 1, think)
+    return [play_game(vulture_agent, crow_agent, max_plies) for _ in range(count)]
+
+def run(args):
+    """
+    Spreads the games over the worker processes.
+    Returns the list of GameResults, and the seconds taken.
+    """
+    start = time.perf_counter()
+    chunks = [args.games // args.workers] * args.workers
+    for idx in range(args.games % args.workers):
+        chunks[idx] += 1
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(
+                play_games, args.vulture, args.crow, count,
+                args.seed + 2 * idx, args.think, args.max_plies
+            )
+            for idx, count in enumerate(chunks) if count > 0
+        ]
+        results = [result for future in futures for result in future.result()]
+    return results, time.perf_counter() - start
+
+def report(results, elapsed):
+    """
+    Prints the throughput, win rates and histogram of game lengths.
+    """
+    games = len(results)
+    plies = sum(result.plies for result in results)
+    print(f'{games} games, {plies} moves in {elapsed:.2f}s: '
+          f'{games / elapsed:.1f} games/s, {plies / elapsed:.0f} moves/s')
+
+    winners = Counter(result.winner for result in results)
+    for winner, label in ((PlayerClass.VULTURE, 'VULTURE'), (PlayerClass.CROW, 'CROW'),
+                          (None, 'NO RESULT')):
+        print(f'{label:>10}: {winners[winner]:6} ({100 * winners[winner] / games:5.1f}%)')
+
+    lengths = Counter(result.plies // BUCKET for result in results)
+    widest = max(lengths.values())
+    print('Game lengths (plies):')
+    for bucket in sorted(lengths):
+        row = '#' * max(1, 50 * lengths[bucket] // widest)
+        print(f'{bucket * BUCKET:4}-{bucket * BUCKET + BUCKET - 1:<4} {lengths[bucket]:6} {row}')
+
+def parse_args(argv):
+    """
+    Parses the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description='Kaooa self-play runner.')
+    parser.add_argument('--games', type=int, default=1000, help='number of games')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='worker processes')
+    parser.add_argument('--vulture', choices=AGENTS, default='random', help='vulture agent')
+    parser.add_argument('--crow', choices=AGENTS, default='random', help='crow agent')
+    parser.add_argument('--think', type=float, default=0.05,
+                        help='seconds of search per move, for search based agents')
+    parser.add_argument('--max-plies', type=int, default=MAX_PLIES, help='plies before a draw')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    parser.add_argument('--record', help='game archive to append the games to')
+    args = parser.parse_args(argv)
+    if args.games < 1 or args.workers < 1:
+        parser.error('--games and --workers should be positive.')
+    return args
+
+if __name__ == '__main__':
+    ARGS = parse_args(sys.argv[1:])
+    RESULTS, ELAPSED = run(ARGS)
+    report(RESULTS, ELAPSED)
+    if ARGS.record is not None:
+        NOW = time.time()
+        append_games(ARGS.record, (
+            GameRecord(NOW, RESULT.moves, (0.0,) * len(RESULT.moves)) for RESULT in RESULTS
+        ))
@@ -0,0 +1,177 @@
+"""
+Asyncio TCP server hosting concurrent Kaooa games in one process.
+
+Clients speak a line based text protocol, and may run any number of games
+over one connection. Each game is a GameSession, dropped when its connection
+closes. Commands and their replies:
+
+    NEW                      -> GAME <id>
+    MOVE <id> <from> <to>    -> OK <winner>, with -1 as <from> for a drop
+    UNDO <id>                -> OK <winner>
+    STATE <id>               -> STATE <crows> <vulture> <turn> <moves> <in hand> <captured> <winner>
+    END <id>                 -> BYE <id>
+    WATCH <id> [<seq>]       -> binary frames of kaooa_broadcast, until the game ends
+
+<winner> is VULTURE, CROW, or - while the game goes on.
+A failed command is answered with ERR <reason>. Any connection may watch a game,
+and a watching connection takes no further commands. <seq> is the last frame
+seen by a returning spectator, which is then only sent the frames it missed.
+"""
+
+import sys
+import asyncio
+import argparse
+from kaooa_session import GameSession
+from kaooa_broadcast import Channel
+
+HOST = '127.0.0.1'
+PORT = 8765
+
+def winner_name(state):
+    """
+    Returns the protocol name of the winner of state.
+    """
+    return '-' if state.winner is None else state.winner.name
+
+class GameServer:
+    """
+    Hosts the game sessions of every connection.
+    """
+    def __init__(self):
+        """
+        Starts with no games.
+        """
+        self.sessions = {}
+        self.channels = {}
+        self.next_id = 0
+        self.moves = 0
+
+    async def handle(self, reader, writer):
+        """
+        Serves the commands of one connection, and ends its games when it closes.
+        """
+        owned = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.isascii():
+                    writer.write(b'ERR Commands must be ASCII.\n')
+                    await writer.drain()
+                    continue
+                words = line.decode('ascii').split()
+                if words[:1] == ['WATCH']:
+                    await self.spectate(words, reader, writer)
+                    break
+                writer.write(self.dispatch(words, owned))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for game_id in owned:
+                self.drop(game_id)
+            writer.close()
+
+    async def spectate(self, words, reader, writer):
+        """
+        Streams the frames of a game to a spectator, until either side leaves.
+        """
+        if len(words) not in (2, 3) or not all(word.isdigit() for word in words[1:]):
+            writer.write(b'ERR Unknown command.\n')
+            return
+        game_id = int(words[1])
+        if game_id not in self.sessions:
+            writer.write(f'ERR No game {game_id}.\n'.encode('ascii'))
+            return
+        channel = self.channels.get(game_id)
+        if channel is None:
+            channel = self.channels[game_id] = Channel(self.sessions[game_id].state)
+        channel.subscribe(writer, int(words[2]) if len(words) == 3 else None)
+        try:
+            await reader.read()
+        finally:
+            channel.unsubscribe(writer)
+
+    def drop(self, game_id):
+        """
+        Ends a game, and the streams of its spectators.
+        """
+        del self.sessions[game_id]
+        channel = self.channels.pop(game_id, None)
+        if channel is not None:
+            channel.close()
+
+    def dispatch(self, words, owned):
+        """
+        Runs one command for the connection owning the games in owned.
+        Returns the encoded reply line.
+        """
+        try:
+            reply = self.command(words, owned)
+        except ValueError as error:
+            reply = f'ERR {error}'
+        return (reply + '\n').encode('ascii', 'replace')
+
+    def command(self, words, owned): # pylint: disable=too-many-return-statements
+        """
+        Returns the reply to a command. Raises ValueError, if the command fails.
+        """
+        if words == ['NEW']:
+            game_id = self.next_id
+            self.next_id += 1
+            self.sessions[game_id] = GameSession()
+            owned.add(game_id)
+            return f'GAME {game_id}'
+        if len(words) < 2 or not words[1].isdigit():
+            raise ValueError('Unknown command.')
+        game_id = int(words[1])
+        if game_id not in owned:
+            raise ValueError(f'No game {game_id}.')
+        session = self.sessions[game_id]
+        if words[0] == 'MOVE' and len(words) == 4:
+            state = session.submit(int(words[2]), int(words[3]))
+            self.moves += 1
+            if game_id in self.channels:
+                self.channels[game_id].publish(session.timeline.current.move, state)
+            return f'OK {winner_name(state)}'
+        if words[0] == 'UNDO' and len(words) == 2:
+            if session.undo() is None:
+                raise ValueError('No move to undo.')
+            if game_id in self.channels:
+                self.channels[game_id].reset(session.state)
+            return f'OK {winner_name(session.state)}'
+        if words[0] == 'STATE' and len(words) == 2:
+            state = session.state
+            return (f'STATE {state.crows} {state.vulture} {state.turn.name} {state.moves} '
+                    f'{state.crows_in_hand} {state.crows_captured} {winner_name(state)}')
+        if words[0] == 'END' and len(words) == 2:
+            owned.remove(game_id)
+            self.drop(game_id)
+            return f'BYE {game_id}'
+        raise ValueError('Unknown command.')
+
+    async def start(self, host=HOST, port=PORT):
+        """
+        Starts listening, and returns the asyncio server.
+        """
+        return await asyncio.start_server(self.handle, host, port)
+
+async def serve(host, port):
+    """
+    Runs a game server until it is interrupted.
+    """
+    server = await GameServer().start(host, port)
+    print(f'Serving Kaooa games on {host}:{server.sockets[0].getsockname()[1]}.')
+    async with server:
+        await server.serve_forever()
+
+if __name__ == '__main__':
+    PARSER = argparse.ArgumentParser(description='Kaooa game server.')
+    PARSER.add_argument('--host', default=HOST, help='address to listen on')
+    PARSER.add_argument('--port', type=int, default=PORT, help='port to listen on')
+    ARGS = PARSER.parse_args(sys.argv[1:])
+    try:
+        asyncio.run(serve(ARGS.host, ARGS.port))
+    except KeyboardInterrupt:
+        pass
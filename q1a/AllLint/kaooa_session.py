@@ -0,0 +1,89 @@
+"""
+Per-instance Kaooa game sessions.
+
+A session holds everything about one game: its timeline of states for undo and
+redo, the recording of its moves, and its clock. Sessions share no state, so a
+process can host any number of them, as the GUI hosts one and the game server
+hosts thousands. They use __slots__, to keep each one small. A game is limited
+to MAX_MOVES plies, the most its archive record and broadcast frames can count.
+"""
+
+import time
+from kaooa_engine import STANDARD_RULES
+from kaooa_history import Timeline
+from kaooa_record import MAX_MOVES, GameRecorder
+
+class GameSession:
+    """
+    One game, with its undo history, move recording and clock.
+    """
+    __slots__ = ('rules', 'timeline', 'recorder', 'start_time', 'finish_time')
+
+    def __init__(self, start=None, rules=STANDARD_RULES):
+        """
+        Starts a new game of rules, at start or at the current time.
+        """
+        self.rules = rules
+        self.start_time = time.time() if start is None else start
+        self.finish_time = None
+        self.timeline = Timeline(rules=rules)
+        self.recorder = GameRecorder(self.start_time)
+
+    @property
+    def state(self):
+        """
+        Returns the current game state.
+        """
+        return self.timeline.state
+
+    def play(self, move, now=None):
+        """
+        Plays a legal move, and returns the new state.
+        Raises ValueError, if the game already has MAX_MOVES moves.
+        """
+        if len(self.recorder.moves) >= MAX_MOVES:
+            raise ValueError(f'Games are limited to {MAX_MOVES} moves.')
+        state = self.timeline.play(move)
+        self.recorder.add(move, now)
+        if state.winner is not None:
+            self.finish_time = time.time() if now is None else now
+        return state
+
+    def submit(self, source, target, now=None):
+        """
+        Plays the move from source to target, after checking it against the rules.
+        Raises ValueError, if the move is illegal.
+        """
+        reason = self.rules.illegal_reason(self.state, self.state.turn, source, target)
+        if reason is not None:
+            raise ValueError(reason)
+        return self.play(self.rules.make_move(self.state, source, target), now)
+
+    def undo(self):
+        """
+        Takes back the last move, and returns it, or None if there is none.
+        """
+        move = self.timeline.undo()
+        if move is not None:
+            self.recorder.undo()
+            self.finish_time = None
+        return move
+
+    def redo(self):
+        """
+        Plays the last undone move again, and returns it, or None if there is none.
+        """
+        move = self.timeline.redo()
+        if move is not None:
+            self.recorder.add(move)
+            if self.state.winner is not None:
+                self.finish_time = time.time()
+        return move
+
+    def elapsed_seconds(self, now=None):
+        """
+        Returns the seconds elapsed in the game, up to its end if it has finished.
+        """
+        if self.finish_time is not None:
+            return self.finish_time - self.start_time
+        return (time.time() if now is None else now) - self.start_time
@@ -0,0 +1,183 @@
+"""
+Fan-out benchmark of the spectator broadcast of the Kaooa game server.
+
+Subscribes a number of spectator connections to one game, then plays random
+moves in it up to the end of the game, waiting after each move until every
+spectator has received its delta. Each spectator rebuilds the game from its
+frames, and the result is checked against the moves played. Reports the
+deliveries per second, and the percentiles of the time for a move to reach
+the last spectator.
+"""
+
+import sys
+import time
+import random
+import asyncio
+import argparse
+from typing import NamedTuple
+from kaooa_engine import initial_state, legal_moves, apply_move
+from kaooa_server import HOST, PORT
+from kaooa_broadcast import DELTA, apply_frame, read_frame
+from kaooa_loadtest import request
+
+class FanoutResult(NamedTuple):
+    """
+    Outcome of a fan-out benchmark. latencies are the seconds taken by each
+    move to reach every spectator.
+    """
+    spectators: int
+    moves: int
+    elapsed: float
+    latencies: list
+
+    @property
+    def deliveries_per_second(self):
+        """
+        Returns the frames delivered to spectators per second.
+        """
+        return self.spectators * self.moves / self.elapsed if self.elapsed > 0 else 0.0
+
+    def percentile(self, fraction):
+        """
+        Returns the fan-out time below which the fraction of the moves were delivered.
+        """
+        ordered = sorted(self.latencies)
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+class Spectator: # pylint: disable=too-few-public-methods
+    """
+    One spectator connection, rebuilding the game from its frames.
+    """
+    __slots__ = ('reader', 'writer', 'seq', 'state')
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.seq = None
+        self.state = None
+
+    async def receive(self):
+        """
+        Reads and applies the next frame. Returns False at the end of the stream.
+        """
+        frame = await read_frame(self.reader)
+        if frame is None or frame[:1] == b'X':
+            return False
+        self.seq, self.state = apply_frame(self.state, frame)
+        return True
+
+async def watch(host, port, game_id, since=None):
+    """
+    Opens a spectator connection to game_id, and reads its catch up frames
+    up to the snapshot or delta of the current move.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    command = f'WATCH {game_id}' if since is None else f'WATCH {game_id} {since}'
+    writer.write((command + '\n').encode('ascii'))
+    spectator = Spectator(reader, writer)
+    await spectator.receive()
+    return spectator
+
+class Arrivals:
+    """
+    Counts the spectators which received each frame, and signals
+    when all of them have.
+    """
+    __slots__ = ('expected', 'counts', 'events')
+
+    def __init__(self, expected):
+        self.expected = expected
+        self.counts = {}
+        self.events = {}
+
+    def add(self, seq):
+        """
+        Counts an arrival of the frame seq.
+        """
+        count = self.counts.get(seq, 0) + 1
+        self.counts[seq] = count
+        if count == self.expected:
+            self.event(seq).set()
+
+    def event(self, seq):
+        """
+        Returns the event set once every spectator received the frame seq.
+        """
+        if seq not in self.events:
+            self.events[seq] = asyncio.Event()
+        return self.events[seq]
+
+async def follow(spectator, arrivals):
+    """
+    Applies the frames of a spectator until the stream ends,
+    counting the arrivals of each sequence number.
+    """
+    while await spectator.receive():
+        arrivals.add(spectator.seq)
+
+async def fanout(host, port, spectators, moves, seed=0): # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    """
+    Runs the benchmark against the server at host:port, and returns its FanoutResult.
+    Raises RuntimeError, if a spectator ends up out of sync with the game.
+    """
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    game_id = (await request(reader, writer, 'NEW'))[1]
+    watchers = []
+    for start in range(0, spectators, 500):
+        watchers.extend(await asyncio.gather(*(
+            watch(host, port, game_id) for _ in range(start, min(start + 500, spectators))
+        )))
+    arrivals = Arrivals(spectators)
+    tasks = [asyncio.create_task(follow(spectator, arrivals)) for spectator in watchers]
+
+    state = initial_state()
+    latencies = []
+    start = time.perf_counter()
+    for seq in range(1, moves + 1):
+        options = legal_moves(state)
+        if not options:
+            break
+        move = rng.choice(options)
+        sent = time.perf_counter()
+        await request(reader, writer, f'MOVE {game_id} {move.source} {move.target}')
+        await arrivals.event(seq).wait()
+        latencies.append(time.perf_counter() - sent)
+        state = apply_move(state, move)
+    elapsed = time.perf_counter() - start
+
+    late = await watch(host, port, game_id)
+    while late.seq < len(latencies):
+        await late.receive()
+    await request(reader, writer, f'END {game_id}')
+    await asyncio.gather(*tasks)
+    writer.close()
+    for spectator in watchers + [late]:
+        if spectator.state != state:
+            raise RuntimeError('Spectator out of sync with the game.')
+        spectator.writer.close()
+    return FanoutResult(spectators, len(latencies), elapsed, latencies)
+
+def parse_args(argv):
+    """
+    Parses the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description='Kaooa spectator fan-out benchmark.')
+    parser.add_argument('--host', default=HOST, help='address of the server')
+    parser.add_argument('--port', type=int, default=PORT, help='port of the server')
+    parser.add_argument('--spectators', type=int, default=10000, help='spectator connections')
+    parser.add_argument('--moves', type=int, default=100, help='moves to broadcast')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    args = parser.parse_args(argv)
+    if args.spectators < 1 or args.moves < 1:
+        parser.error('--spectators and --moves should be positive.')
+    return args
+
+if __name__ == '__main__':
+    ARGS = parse_args(sys.argv[1:])
+    RESULT = asyncio.run(fanout(ARGS.host, ARGS.port, ARGS.spectators, ARGS.moves, ARGS.seed))
+    print(f'{RESULT.moves} moves to {RESULT.spectators} spectators in {RESULT.elapsed:.2f}s: '
+          f'{RESULT.deliveries_per_second:.0f} frames/s, {DELTA.size} bytes per frame')
+    print(f'Fan-out time: p50 {1000 * RESULT.percentile(0.5):.2f}ms, '
+          f'p99 {1000 * RESULT.percentile(0.99):.2f}ms, '
+          f'max {1000 * max(RESULT.latencies):.2f}ms')
@@ -0,0 +1,95 @@
+"""
+Startup benchmark of the Kaooa GUI.
+
+Starts the game in a fresh interpreter with -X importtime and the dummy SDL
+drivers, and times it from the spawn to its first frame, when it quits. Reports
+the median and slowest time to first frame over a number of runs, with the
+imports costing the most, and fails if the median is over the budget.
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+from typing import NamedTuple
+
+GAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'kaooafinal.py')
+BUDGET_MS = 750.0
+FIRST_FRAME = 'FIRST FRAME'
+
+class ImportTime(NamedTuple):
+    """
+    Time taken by the import of a module, by itself and with its own imports,
+    in microseconds.
+    """
+    module: str
+    self_us: int
+    cumulative_us: int
+
+def parse_importtime(output):
+    """
+    Returns the ImportTime of every module in the -X importtime output.
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        imports.append(ImportTime(module.strip(), int(self_us), int(cumulative_us)))
+    return imports
+
+def first_frame(args=()):
+    """
+    Runs the game with args until its first frame. Its stderr, where the
+    import times go, is written to a temporary file, so it cannot fill up a pipe
+    and stall the game while its stdout is read.
+    Returns the milliseconds from the spawn to the first frame, and the imports.
+    Raises RuntimeError, if the game quits without drawing a frame.
+    """
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy')
+    with tempfile.TemporaryFile('w+') as stderr:
+        start = time.perf_counter()
+        with subprocess.Popen(
+            [sys.executable, '-X', 'importtime', GAME, '--first-frame', *args],
+            stdout=subprocess.PIPE, stderr=stderr, env=env, text=True
+        ) as game:
+            elapsed = None
+            for line in game.stdout:
+                if line.startswith(FIRST_FRAME):
+                    elapsed = 1000 * (time.perf_counter() - start)
+        stderr.seek(0)
+        errors = stderr.read()
+    if elapsed is None:
+        raise RuntimeError(f'The game quit before its first frame:\n{errors}')
+    return elapsed, parse_importtime(errors)
+
+def parse_args(argv):
+    """
+    Parses the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description='Kaooa GUI startup benchmark.')
+    parser.add_argument('--runs', type=int, default=5, help='startups to time')
+    parser.add_argument('--budget', type=float, default=BUDGET_MS,
+                        help='milliseconds allowed to the first frame')
+    parser.add_argument('--top', type=int, default=10, help='slowest imports to list')
+    args = parser.parse_args(argv)
+    if args.runs < 1:
+        parser.error('--runs should be positive.')
+    return args
+
+if __name__ == '__main__':
+    ARGS = parse_args(sys.argv[1:])
+    RESULTS = [first_frame() for _ in range(ARGS.runs)]
+    TIMES = [elapsed for elapsed, _ in RESULTS]
+    MEDIAN = statistics.median(TIMES)
+    print(f'First frame: median {MEDIAN:.0f}ms, max {max(TIMES):.0f}ms '
+          f'over {ARGS.runs} runs, budget {ARGS.budget:.0f}ms')
+    print('Slowest imports, by themselves:')
+    for IMPORT in sorted(RESULTS[-1][1], key=lambda entry: -entry.self_us)[:ARGS.top]:
+        print(f'{IMPORT.self_us / 1000:8.1f}ms  {IMPORT.module}')
+    if MEDIAN > ARGS.budget:
+        print(f'Over budget by {MEDIAN - ARGS.budget:.0f}ms.')
+        sys.exit(1)
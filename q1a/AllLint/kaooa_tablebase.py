@@ -0,0 +1,237 @@
+"""
+Retrograde solved tablebase of every reachable Kaooa position.
+
+The solver enumerates the positions reachable from the initial state with the
+headless engine, and labels each as a win, loss or draw for the side to move,
+with the number of plies to the end of the game under best play. Only the
+representative of each symmetry class is solved and stored. The table is
+stored densely, as the sorted little-endian 32 bit keys of the solved positions
+followed by their 16 bit entries, and is memory mapped for lookups, so it is
+never loaded into memory as a whole; a position is found by bisecting the keys.
+"""
+
+import sys
+import mmap
+import time
+import bisect
+import struct
+from array import array
+from collections import deque
+from enum import Enum
+from kaooa_engine import (
+    CAPTURES_TO_WIN, CROW_COUNT, PlayerClass, initial_state, legal_moves, apply_move
+)
+from kaooa_hashing import canonical_state
+
+MAGIC = b'KAOOATB2'
+HEADER = struct.Struct('<8sI')
+KEY_SIZE = 4
+ENTRY_SIZE = 2
+DISTANCE_BITS = 14
+DISTANCE_MASK = (1 << DISTANCE_BITS) - 1
+POSITION_COUNT = 2889
+
+class Outcome(Enum):
+    """
+    Result of a position for the side to move, under best play.
+    """
+    UNKNOWN = 0
+    WIN = 1
+    LOSS = 2
+    DRAW = 3
+
+def position_key(state):
+    """
+    Returns the key of state, under which it is stored in the table.
+    The move counter is left out, as it does not change the legal moves
+    once the number of crows in hand is known.
+    """
+    key = state.turn.value
+    key = key * (CAPTURES_TO_WIN + 1) + state.crows_captured
+    key = key * (CROW_COUNT + 1) + state.crows_in_hand
+    key = key * 11 + state.vulture + 1
+    return key << 10 | state.crows
+
+def encode(outcome, distance):
+    """
+    Packs an outcome and a distance to the end into a table entry.
+    """
+    return outcome.value << DISTANCE_BITS | min(distance, DISTANCE_MASK)
+
+def decode(entry):
+    """
+    Unpacks a table entry into an outcome and a distance to the end.
+    """
+    return Outcome(entry >> DISTANCE_BITS), entry & DISTANCE_MASK
+
+def enumerate_positions():
+    """
+    Returns the class representatives of the positions reachable from the initial
+    state, by position_key, along with the keys of the successors of each.
+    """
+    start = canonical_state(initial_state())[0]
+    positions = {position_key(start): start}
+    successors = {}
+    frontier = deque([start])
+    while frontier:
+        state = frontier.popleft()
+        children = []
+        for move in legal_moves(state):
+            child = canonical_state(apply_move(state, move))[0]
+            child_key = position_key(child)
+            if child_key not in positions:
+                positions[child_key] = child
+                frontier.append(child)
+            children.append(child_key)
+        successors[position_key(state)] = children
+    return positions, successors
+
+def invert(successors):
+    """
+    Returns the keys of the predecessors of each position.
+    """
+    predecessors = {key: [] for key in successors}
+    for key, children in successors.items():
+        for child_key in children:
+            predecessors[child_key].append(key)
+    return predecessors
+
+def solve():
+    """
+    Labels every reachable class representative by retrograde analysis.
+    Returns the sorted keys of the positions, and an array of their entries.
+    """
+    positions, successors = enumerate_positions()
+    predecessors = invert(successors)
+    table = dict.fromkeys(positions, 0)
+    remaining = {}
+    frontier = deque()
+    for key, state in positions.items():
+        if state.winner is not None:
+            outcome = Outcome.WIN if state.winner == state.turn else Outcome.LOSS
+            table[key] = encode(outcome, 0)
+            frontier.append(key)
+        else:
+            remaining[key] = len(successors[key])
+
+    while frontier:
+        key = frontier.popleft()
+        outcome, distance = decode(table[key])
+        for parent in predecessors[key]:
+            if table[parent]:
+                continue
+            if outcome == Outcome.LOSS:
+                table[parent] = encode(Outcome.WIN, distance + 1)
+                frontier.append(parent)
+            else:
+                remaining[parent] -= 1
+                if remaining[parent] == 0:
+                    table[parent] = encode(Outcome.LOSS, distance + 1)
+                    frontier.append(parent)
+
+    for key in positions:
+        if not table[key]:
+            table[key] = encode(Outcome.DRAW, 0)
+    keys = array('I', sorted(table))
+    return keys, array('H', (table[key] for key in keys))
+
+def write_tablebase(path, keys, table):
+    """
+    Writes the keys and entries of the table to path,
+    after a header with the magic and position count.
+    """
+    keys = array('I', keys)
+    table = array('H', table)
+    if sys.byteorder != 'little':
+        keys.byteswap()
+        table.byteswap()
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, len(keys)))
+        keys.tofile(file)
+        table.tofile(file)
+
+class Tablebase:
+    """
+    Memory mapped tablebase file, for O(log n) lookups of any position.
+    """
+    def __init__(self, path):
+        """
+        Maps the file at path, after validating its header and size.
+        """
+        with open(path, 'rb') as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        size = HEADER.size + POSITION_COUNT * (KEY_SIZE + ENTRY_SIZE)
+        if len(self.buffer) != size or HEADER.unpack_from(self.buffer, 0) != (
+            MAGIC, POSITION_COUNT
+        ):
+            self.buffer.close()
+            raise ValueError('File is not a Kaooa tablebase.')
+        self.entries = HEADER.size + POSITION_COUNT * KEY_SIZE
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Unmaps the file.
+        """
+        self.buffer.close()
+
+    def probe(self, state):
+        """
+        Returns the outcome and distance to the end of state, for the side to move.
+        Finished games are answered directly, without reading the table.
+        Positions that are not in the table are UNKNOWN.
+        """
+        if state.winner is not None:
+            return (Outcome.WIN if state.winner == state.turn else Outcome.LOSS), 0
+        key = position_key(canonical_state(state)[0])
+        slot = bisect.bisect_left(range(POSITION_COUNT), key, key=self.key_at)
+        if slot == POSITION_COUNT or self.key_at(slot) != key:
+            return Outcome.UNKNOWN, 0
+        offset = self.entries + ENTRY_SIZE * slot
+        return decode(int.from_bytes(self.buffer[offset:offset + ENTRY_SIZE], 'little'))
+
+    def key_at(self, slot):
+        """
+        Returns the key of the position stored at slot.
+        """
+        offset = HEADER.size + KEY_SIZE * slot
+        return int.from_bytes(self.buffer[offset:offset + KEY_SIZE], 'little')
+
+    def best_move(self, state):
+        """
+        Returns a move of state preserving its outcome: the fastest win,
+        the slowest loss, or any drawing move. Returns None, if there is no move.
+        """
+        best = None
+        best_rank = None
+        for move in legal_moves(state):
+            outcome, distance = self.probe(apply_move(state, move))
+            if outcome == Outcome.LOSS:
+                rank = (2, -distance)
+            elif outcome == Outcome.WIN:
+                rank = (0, distance)
+            else:
+                rank = (1, 0)
+            if best_rank is None or rank > best_rank:
+                best, best_rank = move, rank
+        return best
+
+if __name__ == '__main__':
+    OUTPUT = sys.argv[1] if len(sys.argv) > 1 else 'kaooa.tb'
+    START = time.perf_counter()
+    KEYS, TABLE = solve()
+    write_tablebase(OUTPUT, KEYS, TABLE)
+    COUNTS = {outcome: 0 for outcome in Outcome}
+    for ENTRY in TABLE:
+        COUNTS[decode(ENTRY)[0]] += 1
+    print(f'Solved in {time.perf_counter() - START:.1f}s, written to {OUTPUT}.')
+    for OUTCOME in (Outcome.WIN, Outcome.LOSS, Outcome.DRAW):
+        print(f'{OUTCOME.name}: {COUNTS[OUTCOME]} positions')
+    with Tablebase(OUTPUT) as TABLEBASE:
+        RESULT, DISTANCE = TABLEBASE.probe(initial_state())
+        print(f'Initial position: {RESULT.name} for {PlayerClass.CROW.name}, in {DISTANCE} plies')
@@ -1,26 +1,33 @@
 """
 Python implementation of Kaooa game, using the Pygame library.
+
+Modules only some sessions need, the search for a computer player and Rich for
+the console log, are imported when first used, to keep the startup short.
 """
 
+import os
 import sys
 import math
+import functools
+import argparse
 import time
-import inspect
 import logging
-from enum import Enum
-from rich.logging import RichHandler
+from collections import deque
 import pygame
 import pygame.locals
+from kaooa_board import STANDARD_POINTS
+from kaooa_engine import CROW_COUNT, CAPTURES_TO_WIN, STANDARD_RULES, PlayerClass, make_rules
+from kaooa_session import GameSession
+from kaooa_record import append_games, read_archive, replay
+from kaooa_perf import FrameTimer, ProfileCapture, bucket_labels
+from kaooa_logging import DeferredHandler, MessageLine, start_logging
 
 def access_member(module_name, member_name):
     """
-    Returns the member's value from the module.
+    Returns the member's value from the module, or None if it has no such member.
+    Looked up by name, as pylint cannot see the members of pygame's compiled modules.
     """
-    module = __import__(module_name)
-    for name, value in inspect.getmembers(module):
-        if name == member_name:
-            return value
-    return None
+    return getattr(sys.modules[module_name], member_name, None)
 
 SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 800
@@ -31,38 +38,107 @@ SEGMENT_WIDTH = [
     SCREEN_WIDTH // 3
 ]
 SEGMENT_HEIGHT = 30
+FRAME_RATE = 60
+GRID_CELL = 60
+BOARD_CENTER = (600, 400)
+BOARD_RADIUS = 300
+HAND_COLUMN = 7
+HUD_RECT = (10, 10, 260, 190)
+HUD_REFRESH = 0.25
+MESSAGE_RECT = (0, SCREEN_HEIGHT - SEGMENT_HEIGHT - 26, SCREEN_WIDTH, 26)
+NORMAL, HOVER, HIGHLIGHT = 'normal', 'hover', 'highlight'
+HIGHLIGHT_WIDTH = 4
+SPOT_RADIUS = 30
 
 WHITE = (255, 255, 255)
 RED = (255, 0, 0)
 BLUE = (0, 0, 255)
 YELLOW = (250, 206, 53)
 GRAY = (100, 100, 100)
+DARK_GRAY = (40, 40, 40)
 BLACK = (0, 0, 0)
 SRCALPHA = access_member('pygame.locals', 'SRCALPHA')
 MOUSEBUTTONDOWN = access_member('pygame.locals', 'MOUSEBUTTONDOWN')
 MOUSEBUTTONUP = access_member('pygame.locals', 'MOUSEBUTTONUP')
-
-class PlayerClass(Enum):
+MOUSEMOTION = access_member('pygame.locals', 'MOUSEMOTION')
+EXPOSE_EVENTS = tuple(
+    access_member('pygame.locals', name) for name in ('WINDOWEXPOSED', 'VIDEOEXPOSE')
+)
+ALLOWED_EVENTS = [
+    access_member('pygame.locals', name)
+    for name in ('QUIT', 'KEYDOWN', 'MOUSEBUTTONDOWN', 'MOUSEBUTTONUP', 'MOUSEMOTION')
+] + list(EXPOSE_EVENTS)
+
+class SpotGrid: # pylint: disable=too-few-public-methods
     """
-    Different types of players in the game.
+    Uniform grid over the window, for finding the spot near a point
+    without measuring the distance to every spot.
+    Each cell lists the spots within reach of some point of the cell.
     """
-    VULTURE = 0
-    CROW = 1
-
-class Game:
+    def __init__(self, coords, reach, cell=GRID_CELL):
+        """
+        Buckets the spots at coords into the cells within reach of them.
+        """
+        self.coords = coords
+        self.reach = reach
+        self.cell = cell
+        self.cells = {}
+        span = math.ceil(reach / cell)
+        for idx, (x_coord, y_coord) in enumerate(coords):
+            col, row = int(x_coord // cell), int(y_coord // cell)
+            for key in [
+                    (col + d_col, row + d_row)
+                    for d_col in range(-span, span + 1)
+                    for d_row in range(-span, span + 1)
+            ]:
+                self.cells.setdefault(key, []).append(idx)
+
+    def nearest(self, point):
+        """
+        Returns the index of the nearest spot closer than reach to point, or -1.
+        """
+        best, best_dist = -1, self.reach
+        for idx in self.cells.get((int(point[0] // self.cell), int(point[1] // self.cell)), ()):
+            dist = math.dist(point, self.coords[idx])
+            if dist < best_dist:
+                best, best_dist = idx, dist
+        return best
+
+class Game: # pylint: disable=too-many-public-methods
     """
-    Holds the shared variables and methods for all the players.
+    Holds the window, the sprites and the methods for all the players.
+    The game itself lives in Game.session, and the rules in the headless engine.
     """
-    spots = [None for i in range(10)]
-    players = pygame.sprite.Group()
-    winner = None
-    start_time = None
-    finish_time = None
-    moves = 1
-    turn = PlayerClass.CROW
-    crows_captured = 0
+    rules = STANDARD_RULES
+    session = GameSession()
+    spots = []
+    players = pygame.sprite.LayeredDirty()
+    background = None
+    status = (None, None, None, None)
     segments = []
     font = None
+    ai = None
+    ai_side = None
+    dragged = None
+    hovered = None
+    legal_state = None
+    legal = {}
+    marked = ()
+    spot_grid = None
+    record_path = None
+    replay_record = None
+    replay = deque()
+    replay_speed = 1.0
+    replay_due = None
+    timer = FrameTimer()
+    capture = ProfileCapture()
+    hud_shown = False
+    hud_font = None
+    hud_under = None
+    hud_due = 0.0
+    messages = None
+    message_text = None
+    message_under = None
 
     @classmethod
     def init(cls):
@@ -70,14 +146,12 @@ class Game:
         Initialises the game.
         """
         vulture = Vulture((100, 400), 26.5)
-        crow1 = Crow((1100, 100), 26.5)
-        crow2 = Crow((1100, 200), 26.5)
-        crow3 = Crow((1100, 300), 26.5)
-        crow4 = Crow((1100, 400), 26.5)
-        crow5 = Crow((1100, 500), 26.5)
-        crow6 = Crow((1100, 600), 26.5)
-        crow7 = Crow((1100, 700), 26.5)
-        Game.players.add(vulture, crow1, crow2, crow3, crow4, crow5, crow6, crow7)
+        Game.players.add(vulture)
+        for idx in range(Game.rules.crow_count):
+            column, row = divmod(idx, HAND_COLUMN)
+            Game.players.add(Crow((1100 - 70 * column, 100 + 100 * row), 26.5))
+        Game.spots = [None for i in range(Game.rules.board.spot_count)]
+        Game.spot_grid = SpotGrid(spot_coords, 2 * vulture.radius)
 
         for idx in range(4):
             x_coord = sum(SEGMENT_WIDTH[:idx])
@@ -86,121 +160,514 @@ class Game:
             Game.segments.append(rect)
 
         Game.font = pygame.font.Font(None, 26)
-        Game.start_time = time.time()
+        Game.hud_font = pygame.font.Font(None, 20)
+        Game.session = GameSession(rules=Game.rules)
+        Game.start_replay()
+        Game.background = Game.render_board()
+        Game.hud_under = Game.background.subsurface(HUD_RECT).copy()
+        Game.message_under = Game.background.subsurface(MESSAGE_RECT).copy()
+        Game.players.clear(screen, Game.background)
+
+    @classmethod
+    def render_board(cls):
+        """
+        Returns a rendering of the static board, drawn once and reused as the
+        background, from which the regions vacated by the sprites are restored.
+        """
+        board = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        board.fill(BLACK)
+        for first, last in Game.rules.board.lines:
+            pygame.draw.line(board, WHITE, spot_coords[first], spot_coords[last], width=5)
+        for point in spot_coords:
+            pygame.draw.circle(board, WHITE, point, SPOT_RADIUS)
+        return board
+
+    @classmethod
+    def play(cls, player, move):
+        """
+        Applies a legal move to the game state, and moves the sprites to match it.
+        """
+        if move.captured != -1:
+            log.info('Crow captured')
+            Game.spots[move.captured].hide()
+            Game.spots[move.captured] = None
+        if move.source != -1:
+            Game.spots[move.source] = None
+        Game.spots[move.target] = player
+        player.rect.center = spot_coords[move.target]
+        player.position = move.target
+        player.dirty = 1
+
+        if Game.session.state.moves == Game.rules.drop_phase_moves:
+            log.info('Dropping phase ends.')
+        Game.session.play(move)
+        if Game.session.state.winner == PlayerClass.VULTURE:
+            log.info('Vulture has won the game.')
+        elif Game.session.state.winner == PlayerClass.CROW:
+            log.info('Crows have won the game.')
+        Game.hover(None)
+
+    @classmethod
+    def piece_for(cls, move):
+        """
+        Returns the sprite to be moved by move.
+        """
+        if move.source != -1:
+            return Game.spots[move.source]
+        for player in Game.players:
+            if player.plclass == Game.session.state.turn and player.position == -1:
+                return player
+        return None
+
+    @classmethod
+    def play_ai(cls):
+        """
+        Plays the move of the computer player, if it is the computer's turn.
+        """
+        if not Game.ai_to_move():
+            return
+        result = Game.ai.search(Game.session.state)
+        if result.move is None:
+            return
+        log.info(
+            'Searched %d nodes to depth %d, at %.0f nodes/s.',
+            result.nodes, result.depth, result.nodes_per_second
+        )
+        Game.play(Game.piece_for(result.move), result.move)
+
+    @classmethod
+    def start_replay(cls):
+        """
+        Queues the moves of the game being replayed, if any, from its beginning.
+        """
+        if Game.replay_record is not None:
+            Game.replay = deque(zip(Game.replay_record.moves, Game.replay_record.offsets))
+            if Game.replay:
+                Game.replay_due = time.time() + Game.replay[0][1] / Game.replay_speed
+
+    @classmethod
+    def play_replay(cls):
+        """
+        Plays the next move of the game being replayed, once it is due.
+        """
+        if not Game.replay or time.time() < Game.replay_due:
+            return
+        move, _ = Game.replay.popleft()
+        Game.play(Game.piece_for(move), move)
+        if Game.replay:
+            Game.replay_due = time.time() + Game.replay[0][1] / Game.replay_speed
+
+    @classmethod
+    def save_record(cls):
+        """
+        Appends the moves of the game so far to the archive, if one was given.
+        Games are saved on restart and on quitting,
+        so moves taken back after the end are left out.
+        """
+        recorder = Game.session.recorder
+        if Game.record_path is not None and Game.replay_record is None and recorder.moves:
+            append_games(Game.record_path, [recorder.record()])
+            log.info('Game recorded to %s.', Game.record_path)
+
+    @classmethod
+    def undo(cls):
+        """
+        Takes back the last move, or the last moves up to the human player's turn,
+        when playing against the computer.
+        """
+        if Game.replay_record is not None:
+            return
+        while Game.session.undo() is not None:
+            if not Game.ai_to_move():
+                break
+        Game.show_state()
+
+    @classmethod
+    def redo(cls):
+        """
+        Plays the last undone move again, or the moves up to the human player's turn,
+        when playing against the computer.
+        """
+        if Game.replay_record is not None:
+            return
+        while True:
+            if Game.session.redo() is None:
+                break
+            if not Game.ai_to_move() or not Game.session.timeline.can_redo:
+                break
+        Game.show_state()
+
+    @classmethod
+    def show_state(cls):
+        """
+        Moves the sprites to match Game.session.state, after an undo or redo.
+        Sprites already on the right spots stay, so only the pieces
+        of the moves taken back or replayed move.
+        """
+        state = Game.session.state
+        Game.dragged = None
+        Game.reset_looks()
+        Game.spots = [None for i in range(Game.rules.board.spot_count)]
+        crows = []
+        for player in Game.players:
+            if player.plclass == PlayerClass.VULTURE:
+                if state.vulture == -1:
+                    player.show()
+                else:
+                    player.place(state.vulture)
+            else:
+                crows.append(player)
+        wanted = [
+            idx for idx, plclass in enumerate(Game.rules.spots(state))
+            if plclass == PlayerClass.CROW
+        ]
+        staying = [crow for crow in crows if crow.position in wanted]
+        moving = [crow for crow in crows if crow.position not in wanted]
+        for crow in staying:
+            wanted.remove(crow.position)
+            Game.spots[crow.position] = crow
+        moving.sort(key=lambda crow: (crow.position < 0, crow.position == -1))
+        for crow, spot in zip(moving, wanted):
+            crow.place(spot)
+        spare = sorted(moving[len(wanted):], key=lambda crow: crow.position != -1)
+        for idx, crow in enumerate(spare):
+            if idx < state.crows_in_hand:
+                crow.show()
+            else:
+                crow.hide()
+
+    @classmethod
+    def ai_to_move(cls):
+        """
+        Checks if the computer player is to move.
+        """
+        state = Game.session.state
+        return Game.ai is not None and state.winner is None and state.turn == Game.ai_side
 
     @classmethod
-    def declare_winner(cls, plclass):
+    def is_active(cls):
         """
-        Terminates the game, blocking new moves.
+        Checks if the window needs to be redrawn at the full frame rate,
+        that is while a sprite is dragged, the computer player is to move,
+        or a game is being replayed. Otherwise the window only changes on events,
+        and on the tick of the timer.
         """
-        Game.winner = plclass
-        Game.finish_time = time.time()
+        return Game.ai_to_move() or Game.dragged is not None or bool(Game.replay)
+
+    @classmethod
+    def idle_timeout(cls):
+        """
+        Returns the milliseconds until the time elapsed in the status bar changes,
+        or 0 to wait indefinitely, when the game has finished and the timer is stopped.
+        """
+        if Game.session.state.winner is not None:
+            return 0
+        fraction = Game.session.elapsed_seconds() % 1
+        return max(1, math.ceil(1000 * (1 - fraction)))
 
     @classmethod
     def handle_event(cls, new_event):
         """
         Handles mouse event updates.
+        A press picks the sprite under the mouse, and the following events
+        up to the release are routed to that sprite only.
+        """
+        if Game.replay_record is not None:
+            return
+        if new_event.type == MOUSEBUTTONDOWN and new_event.button == 1:
+            Game.hover(None)
+            Game.dragged = Game.sprite_at(new_event.pos)
+            if Game.dragged is not None:
+                Game.dragged.set_look(HIGHLIGHT)
+                if Game.movable(Game.dragged):
+                    Game.mark_targets(Game.dragged)
+        if Game.dragged is not None:
+            player = Game.dragged
+            if new_event.type == MOUSEBUTTONUP and new_event.button == 1:
+                Game.dragged = None
+                Game.hovered = None
+                player.set_look(NORMAL)
+                Game.mark_targets(None)
+            player.handle_event(new_event)
+        elif new_event.type == MOUSEMOTION:
+            Game.hover(Game.sprite_at(new_event.pos))
+
+    @classmethod
+    def reset_looks(cls):
+        """
+        Returns every piece to its normal look.
         """
         for player in Game.players:
-            player.handle_event(new_event)
+            player.set_look(NORMAL)
+        Game.hovered = None
+        Game.mark_targets(None)
+
+    @classmethod
+    def hover(cls, player):
+        """
+        Shows the piece under the mouse in its hover look, and rings the spots
+        it may move to, if the player may move it.
+        """
+        if player is not None and not Game.movable(player):
+            player = None
+        if player is Game.hovered:
+            return
+        if Game.hovered is not None:
+            Game.hovered.set_look(NORMAL)
+        if player is not None:
+            player.set_look(HOVER)
+        Game.hovered = player
+        Game.mark_targets(player)
+
+    @classmethod
+    def destinations(cls, source):
+        """
+        Returns the legal moves from source of the side to move, by their target.
+        The legal moves of a position are grouped once, when first asked for
+        after the turn changes, and then looked up for every hover and drop.
+        """
+        state = Game.session.state
+        if state is not Game.legal_state:
+            Game.legal = Game.rules.destinations(state)
+            Game.legal_state = state
+        return Game.legal.get(source, {})
+
+    @classmethod
+    def movable(cls, player):
+        """
+        Checks if the user may move player, that is if it belongs to the side
+        to move, played by the user, and it has a legal move.
+        """
+        return (
+            player.plclass == Game.session.state.turn and not Game.ai_to_move()
+            and bool(Game.destinations(player.position))
+        )
+
+    @classmethod
+    def mark_targets(cls, player):
+        """
+        Rings the spots player may move to, in red for a capture, after clearing
+        the rings of the previous piece. None only clears the rings.
+        """
+        moves = {} if player is None else Game.destinations(player.position)
+        for target in Game.marked:
+            pygame.draw.circle(Game.background, WHITE, spot_coords[target], SPOT_RADIUS)
+        for move in moves.values():
+            color = YELLOW if move.captured == -1 else RED
+            pygame.draw.circle(
+                Game.background, color, spot_coords[move.target], SPOT_RADIUS,
+                width=HIGHLIGHT_WIDTH
+            )
+        for target in set(Game.marked).union(moves):
+            rect = pygame.Rect(0, 0, 2 * SPOT_RADIUS, 2 * SPOT_RADIUS)
+            rect.center = spot_coords[target]
+            Game.players.repaint_rect(rect)
+        Game.marked = tuple(moves)
+
+    @classmethod
+    def sprite_at(cls, pos):
+        """
+        Returns the topmost visible sprite under pos, or None.
+        """
+        sprites = [player for player in Game.players.get_sprites_at(pos) if player.visible]
+        return sprites[-1] if sprites else None
 
     @classmethod
     def restart(cls):
         """
         Resets the game, to the initial configuration.
         """
-        Game.winner = None
-        Game.spots = [None for i in range(10)]
+        Game.save_record()
+        Game.session = GameSession(rules=Game.rules)
+        Game.spots = [None for i in range(Game.rules.board.spot_count)]
         for player in Game.players:
             player.show()
-        Game.moves = 1
-        Game.turn = PlayerClass.CROW
-        Game.crows_captured = 0
-        Game.start_time = time.time()
-        Game.finish_time = None
+        Game.dragged = None
+        Game.reset_looks()
+        Game.status = (None, None, None, None)
+        Game.start_replay()
 
     @classmethod
     def update(cls):
         """
         Updates the rendering of the game window.
+        Returns the list of regions of the window that changed.
         """
-        Game.update_rectangles()
-        Game.update_fonts()
-        Game.players.draw(screen)
+        for rect in Game.update_status() + Game.update_message() + Game.update_hud():
+            Game.players.repaint_rect(rect)
+        Game.timer.mark('status')
         Game.players.update()
+        changed = Game.players.draw(screen)
+        Game.timer.mark('sprites')
+        return changed
 
     @classmethod
-    def update_rectangles(cls):
+    def update_status(cls):
         """
-        Updates the color of text boxes in the status bar.
+        Redraws the segments of the status bar whose text or color changed,
+        onto the background. Returns the list of redrawn segments.
         """
-        pygame.draw.rect(screen, YELLOW, Game.segments[0])
-        if Game.turn == PlayerClass.VULTURE:
-            pygame.draw.rect(screen, RED, Game.segments[1])
-        else:
-            pygame.draw.rect(screen, BLUE, Game.segments[1])
-        pygame.draw.rect(screen, YELLOW, Game.segments[2])
-        pygame.draw.rect(screen, GRAY, Game.segments[3])
+        status = Game.status_texts()
+        changed = []
+        for idx, segment in enumerate(status):
+            if Game.status[idx] != segment:
+                text, text_color, box_color = segment
+                Game.draw_segment(Game.segments[idx], render_text(text, text_color), box_color)
+                changed.append(Game.segments[idx])
+        Game.status = status
+        return changed
 
     @classmethod
-    def update_fonts(cls):
-        """
-        Updates the text in the status bar.
-        """
-        text = []
-        text.append(Game.render_move_num())
-        text.append(Game.render_next_move())
-        text.append(Game.render_crows_captured())
-        text.append(Game.render_time_elapsed())
-
-        for idx, _ in enumerate(Game.segments):
-            x_offset = (Game.segments[idx].width - text[idx].get_width()) // 2
-            y_offset = (Game.segments[idx].height - text[idx].get_height()) // 2
-            x_coord = Game.segments[idx].x + x_offset
-            y_coord = Game.segments[idx].y + y_offset
-            screen.blit(text[idx], (x_coord,y_coord))
+    def update_message(cls):
+        """
+        Redraws the message line onto the background, when the warning to show
+        changes or expires. Returns the list of redrawn regions.
+        """
+        text = None if Game.messages is None else Game.messages.current()
+        if text == Game.message_text:
+            return []
+        Game.message_text = text
+        Game.background.blit(Game.message_under, MESSAGE_RECT)
+        rect = pygame.Rect(MESSAGE_RECT)
+        if text is not None:
+            rendering = render_text(text, YELLOW)
+            Game.background.blit(
+                rendering, (rect.x + 10, rect.y + (rect.height - rendering.get_height()) // 2)
+            )
+        return [rect]
 
     @classmethod
-    def render_move_num(cls):
+    def toggle_hud(cls):
         """
-        Returns rendering of the number of current move.
+        Shows or hides the performance overlay.
         """
-        return Game.font.render(f'MOVE: {Game.moves}', True, BLACK)
+        Game.hud_shown = not Game.hud_shown
+        Game.hud_due = 0.0
+        if not Game.hud_shown:
+            Game.background.blit(Game.hud_under, HUD_RECT)
+            Game.players.repaint_rect(pygame.Rect(HUD_RECT))
 
     @classmethod
-    def render_next_move(cls):
+    def toggle_profile(cls):
         """
-        Returns rendering of the player for the current move.
+        Starts a profiler capture of the game, or stops it and writes it out.
         """
-        if Game.winner is None:
-            font = Game.font.render(f'{Game.turn.name}', True, WHITE)
+        path = Game.capture.toggle()
+        if path is None:
+            log.info('Profiling started, press p again to stop.')
         else:
-            font = Game.font.render(f'{Game.winner.name} WON!', True, WHITE)
-        return font
+            log.info('Profile written to %s.', path)
+
+    @classmethod
+    def update_hud(cls):
+        """
+        Redraws the performance overlay onto the background, a few times a second
+        while it is shown. Returns the list of redrawn regions.
+        """
+        now = time.perf_counter()
+        if not Game.hud_shown or now < Game.hud_due:
+            return []
+        Game.hud_due = now + HUD_REFRESH
+        rect = pygame.Rect(HUD_RECT)
+        pygame.draw.rect(Game.background, DARK_GRAY, rect)
+        timer = Game.timer
+        lines = [f'{timer.fps():.0f} FPS   busy p50 {timer.percentile(0.5):.2f} ms, '
+                 f'p99 {timer.percentile(0.99):.2f} ms']
+        lines.extend(f'{stage}: {ms:.3f} ms' for stage, ms in timer.stage_means().items())
+        for idx, line in enumerate(lines):
+            Game.background.blit(
+                Game.hud_font.render(line, True, WHITE), (rect.x + 8, rect.y + 6 + 17 * idx)
+            )
+        counts = timer.histogram()
+        tallest = max(*counts, 1)
+        base = rect.bottom - 20
+        width = (rect.width - 16) // len(counts)
+        for idx, (count, label) in enumerate(zip(counts, bucket_labels())):
+            height = 50 * count // tallest
+            x_coord = rect.x + 8 + width * idx
+            pygame.draw.rect(Game.background, YELLOW, (x_coord, base - height, width - 4, height))
+            Game.background.blit(Game.hud_font.render(label, True, WHITE), (x_coord, base + 4))
+        return [rect]
 
     @classmethod
-    def render_crows_captured(cls):
+    def draw_segment(cls, rect, text, box_color):
         """
-        Returns rendering of the number of crows captured.
+        Draws a text box of the status bar, with the rendered text centred in it.
         """
-        return Game.font.render(f'CROWS CAPTURED: {Game.crows_captured}', True, BLACK)
+        pygame.draw.rect(Game.background, box_color, rect)
+        x_coord = rect.x + (rect.width - text.get_width()) // 2
+        y_coord = rect.y + (rect.height - text.get_height()) // 2
+        Game.background.blit(text, (x_coord, y_coord))
 
     @classmethod
-    def render_time_elapsed(cls):
+    def status_texts(cls):
         """
-        Returns rendering of the time elapsed in the game.
+        Returns the (text, text color, box color) of each segment of the status bar:
+        the number of current move, the player for the current move (or the winner),
+        the number of crows captured, and the time elapsed in the game.
         """
-        if Game.winner is None:
-            time_elapsed = time.gmtime(time.time() - Game.start_time)
-            time_string = time.strftime("%H:%M:%S", time_elapsed)
-            font = Game.font.render(f'TIME ELAPSED: {time_string}', True, BLACK)
+        state = Game.session.state
+        if state.winner is None:
+            turn_text = f'{state.turn.name}'
         else:
-            time_elapsed = time.gmtime(Game.finish_time - Game.start_time)
-            time_string = time.strftime("%H:%M:%S", time_elapsed)
-            font = Game.font.render(f'TIME ELAPSED: {time_string}', True, BLACK)
-        return font
+            turn_text = f'{state.winner.name} WON!'
+        turn_color = RED if state.turn == PlayerClass.VULTURE else BLUE
+        return (
+            (f'MOVE: {state.moves}', BLACK, YELLOW),
+            (turn_text, WHITE, turn_color),
+            (f'CROWS CAPTURED: {state.crows_captured}', BLACK, YELLOW),
+            (f'TIME ELAPSED: {format_elapsed(Game.elapsed_seconds())}', BLACK, GRAY)
+        )
 
-class Player(pygame.sprite.Sprite):
+    @classmethod
+    def elapsed_seconds(cls):
+        """
+        Returns the whole seconds elapsed in the game.
+        """
+        return int(Game.session.elapsed_seconds())
+
+def console_handler():
+    """
+    Returns the Rich handler of the console log.
+    Built by a DeferredHandler at the first message, on the logging thread.
+    """
+    from rich.logging import RichHandler # pylint: disable=import-outside-toplevel
+    handler = RichHandler()
+    handler.setFormatter(logging.Formatter("%(message)s", datefmt="[%X]"))
+    return handler
+
+@functools.lru_cache(maxsize=1)
+def format_elapsed(seconds):
+    """
+    Returns the seconds as HH:MM:SS.
+    Formatted once per second, as the status bar asks for it every frame.
+    """
+    return time.strftime("%H:%M:%S", time.gmtime(seconds))
+
+@functools.lru_cache(maxsize=None)
+def piece_surface(color, radius, look=NORMAL):
+    """
+    Returns the image of a piece of color and radius, in the look NORMAL, HOVER
+    or HIGHLIGHT. Images are shared by every piece looking the same, and
+    converted once to the display format, so no state change allocates.
+    """
+    surface = pygame.Surface((radius * 2, radius * 2), SRCALPHA)
+    if look == HOVER:
+        color = tuple((channel + 255) // 2 for channel in color)
+    pygame.draw.circle(surface, color, (radius, radius), radius)
+    if look == HIGHLIGHT:
+        pygame.draw.circle(surface, WHITE, (radius, radius), radius, width=HIGHLIGHT_WIDTH)
+    return surface.convert_alpha()
+
+@functools.lru_cache(maxsize=64)
+def render_text(text, color):
+    """
+    Returns the rendering of text in the status bar font.
+    Renderings are cached by (text, color), as rasterising the font is costly.
+    """
+    return Game.font.render(text, True, color)
+
+class Player(pygame.sprite.DirtySprite): # pylint: disable=too-many-instance-attributes
     """
     Player class.
     """
@@ -211,18 +678,19 @@ class Player(pygame.sprite.Sprite):
         super().__init__()
         #self.identifier = identifier
         self.plclass = plclass
+        self.color = color
         self.radius = radius
         self.init_position = center
         self.position = -1
-        self.dragging = False
+        self.visible = 1
+        self.dirty = 1
         self.__init_graphics__(color)
 
     def __init_graphics__(self, color):
         """
         Initialises the rendering of the player.
         """
-        self.image = pygame.Surface((self.radius * 2, self.radius * 2), SRCALPHA)
-        pygame.draw.circle(self.image, color, (self.radius, self.radius), self.radius)
+        self.image = piece_surface(color, self.radius)
         #font = pygame.font.Font(None, 28)
         #text_surface = font.render(self.identifier, True, (255, 255, 255))
         #text_rect = text_surface.get_rect(center=(self.radius, self.radius))
@@ -230,12 +698,33 @@ class Player(pygame.sprite.Sprite):
         self.rect = self.image.get_rect()
         self.rect.center = self.init_position
 
+    def set_look(self, look):
+        """
+        Switches the player to the image of look, from the shared piece images.
+        """
+        image = piece_surface(self.color, self.radius, look)
+        if image is not self.image:
+            self.image = image
+            self.dirty = 1
+
     def show(self):
         """
         Reset the player's coordinates to the initial position.
         """
         self.rect.center = self.init_position
         self.position = -1
+        self.visible = 1
+        self.dirty = 1
+
+    def place(self, point_idx):
+        """
+        Updates the player's coordinates to the spot point_idx of the board.
+        """
+        self.rect.center = spot_coords[point_idx]
+        self.position = point_idx
+        self.visible = 1
+        self.dirty = 1
+        Game.spots[point_idx] = self
 
     def hide(self):
         """
@@ -243,34 +732,25 @@ class Player(pygame.sprite.Sprite):
         """
         self.rect.center = (-1000, -1000)
         self.position = -2
-
-    def update(self):
-        """
-        Updates the player's rendering, when the player is selected by the mouse,
-        provided the game has not terminated.
-        """
-        if Game.winner is None:
-            if self.dragging:
-                self.rect.center = pygame.mouse.get_pos()
+        self.visible = 0
+        self.dirty = 1
 
     def handle_event(self, player_event):
         """
-        Handles mouse event updates.
-        Processes the new position, and its legality as a move in the game.
+        Handles the mouse events of a drag of the player.
+        Follows the mouse, provided the game has not terminated, and on release
+        processes the new position, and its legality as a move in the game.
         """
-        if player_event.type == MOUSEBUTTONDOWN and player_event.button == 1:
-            if self.rect.collidepoint(player_event.pos):
-                self.dragging = True
+        if player_event.type in (MOUSEBUTTONDOWN, MOUSEMOTION):
+            if Game.session.state.winner is None and self.rect.center != player_event.pos:
+                self.rect.center = player_event.pos
+                self.dirty = 1
         elif player_event.type == MOUSEBUTTONUP and player_event.button == 1:
-            self.dragging = False
+            self.dirty = 1
             point_idx = self.find_new_position()
-            if point_idx >= 0 and self.is_legal_move(point_idx):
-                if self.position != -1:
-                    Game.spots[self.position] = None
-                Game.spots[point_idx] = self
-                self.rect.center = spot_coords[point_idx]
-                self.position = point_idx
-                self.complete_turn()
+            move = self.legal_move(point_idx) if point_idx >= 0 else None
+            if move is not None:
+                Game.play(self, move)
             else:
                 if self.position == -1:
                     self.rect.center = self.init_position
@@ -284,201 +764,121 @@ class Player(pygame.sprite.Sprite):
         Maps the player's position to a spot in the game board.
         Ensures the mapping is finalised, only if it is the player's move.
         """
-        for point_idx, _ in enumerate(spot_coords):
-            if point_idx != self.position:
-                if math.dist(self.rect.center, spot_coords[point_idx]) < (2 * self.radius):
-                    if self.plclass == Game.turn:
-                        return point_idx
-                    log.warning('Movement should be in the player\'s turn.')
-        return -1
-
-    def is_legal_move(self, point_idx):
-        """
-        Checks if movement is to a vacant spot.
-        Returns False, if the spot is not vacant.
-        Returns True, when it is the player's first move (to a vacant spot).
-        Returns None, otherwise (to be overridden by the subclass).
-        """
-        if Game.spots[point_idx] is not None:
-            log.warning('Movement must be to a vacant spot.')
-            return False
-        if self.position == -1:
-            return True
-        return None
-
-    def jump_adjacency(self, point_idx):
-        """
-        Checks if point_idx is one link away from the current position.
-        """
-        jump = (point_idx - self.position) % 10
-        if jump in (1,9):
-            return True
-        if jump in (2,8):
-            if self.position % 2 == 1:
-                return True
-        log.warning('Movement must be via a single link jump, except for a capture.')
-        return False
-
-    def complete_turn(self):
-        """
-        Checks if the game has terminated.
-        Increments the number of moves and switches the turn attribute.
-        """
-        if Game.turn == PlayerClass.VULTURE:
-            Game.turn = PlayerClass.CROW
-        else:
-            Game.turn = PlayerClass.VULTURE
-        if Game.moves == 14:
-            log.info('Dropping phase ends.')
-        if Game.crows_captured == 4:
-            log.info('Vulture has won the game.')
-            Game.declare_winner(PlayerClass.VULTURE)
-        elif self.vulture_blocked():
-            log.info('Crows have won the game.')
-            Game.declare_winner(PlayerClass.CROW)
-        else:
-            Game.moves += 1
+        point_idx = Game.spot_grid.nearest(self.rect.center)
+        if point_idx in (-1, self.position):
+            return -1
+        if self.plclass != Game.session.state.turn:
+            log.warning('Movement should be in the player\'s turn.')
+            return -1
+        return point_idx
 
-    def vulture_blocked(self):
+    def legal_move(self, point_idx):
         """
-        Checks if the vulture has a possible move.
-        Returns True, if their exists no such move.
-        Returns False, otherwise.
+        Looks up the movement to point_idx in the legal moves of the turn.
+        Returns None, and logs the reason from the rules engine, if it is illegal.
         """
-        vulture_idx = -1
-        for player_idx, _ in enumerate(Game.spots):
-            if Game.spots[player_idx] is not None:
-                if Game.spots[player_idx].plclass == PlayerClass.VULTURE:
-                    vulture_idx = player_idx
-                    break
-        else:
-            return False
-
-        bool1 = Game.spots[(vulture_idx - 3) % 10] is None
-        bool2 = Game.spots[(vulture_idx - 2) % 10] is None
-        bool3 = Game.spots[(vulture_idx - 1) % 10] is None
-        bool4 = Game.spots[(vulture_idx + 1) % 10] is None
-        bool5 = Game.spots[(vulture_idx + 2) % 10] is None
-        bool6 = Game.spots[(vulture_idx + 3) % 10] is None
-
-        if bool1 or bool3 or bool4 or bool6:
-            return False
-        if vulture_idx % 2 == 1:
-            if bool2 or bool5:
-                return False
-        return True
+        move = Game.destinations(self.position).get(point_idx)
+        if move is None:
+            log.warning(Game.rules.illegal_reason(
+                Game.session.state, self.plclass, self.position, point_idx
+            ))
+        return move
 
 class Vulture(Player):
     """
-    Player with plclass = PlayerClass.CROW, and a distinct color in the GUI.
-    The notion of legal move is limited to adjacent nodes,
-    but extended to enforce strict capturing of crows.
+    Player with plclass = PlayerClass.VULTURE, and a distinct color in the GUI.
     """
     def __init__(self, center, radius):
         super().__init__(PlayerClass.VULTURE, RED, center, radius)
 
-    def is_legal_move(self, point_idx):
-        """
-        Checks if movement is to a vacant and adjacent spot.
-        Ensures the move results in capture of a crow, whenever possible.
-        """
-        ret = super().is_legal_move(point_idx)
-        if ret is not None:
-            return ret
-        ret = self.find_crow(point_idx)
-        if ret is not None:
-            return ret
-        return self.jump_adjacency(point_idx)
-
-    def find_crow(self, point_idx):
-        """
-        Checks if there exists a crow, in an adjacent spot, that can be captured.
-        Returns True, if movement to point_idx, results in a capture.
-        Returns False, if movement does not result in a capture, although possible.
-        Returns None, otherwise.
-        """
-        if self.position % 2 == 0:
-            crow_positions = [(self.position + 1) % 10, (self.position - 1) % 10]
-            jump_positions = [(self.position + 3) % 10, (self.position - 3) % 10]
-        else:
-            crow_positions = [(self.position + 2) % 10, (self.position - 2) % 10]
-            jump_positions = [(self.position + 3) % 10, (self.position - 3) % 10]
-        can_capture = [
-            Game.spots[crow_positions[0]] is not None and Game.spots[jump_positions[0]] is None,
-            Game.spots[crow_positions[1]] is not None and Game.spots[jump_positions[1]] is None
-        ]
-        if can_capture[0] and point_idx == jump_positions[0]:
-            self.capture_crow(crow_positions[0])
-            return True
-        if can_capture[1] and point_idx == jump_positions[1]:
-            self.capture_crow(crow_positions[1])
-            return True
-        if can_capture[0] or can_capture[1]:
-            log.warning('Vulture must capture the crow')
-            return False
-        return None
-
-    def capture_crow(self, crow_idx):
-        """ Hides the crow, and vacates the spots. """
-        log.info('Crow captured')
-        Game.spots[crow_idx].hide()
-        Game.spots[crow_idx] = None
-        Game.crows_captured += 1
-
 class Crow(Player):
     """
     Player with plclass = PlayerClass.CROW, and a distinct color in the GUI.
-    The notion of legal move is limited to adjacent nodes, and extended to check for drop phase.
     """
     def __init__(self, center, radius):
         super().__init__(PlayerClass.CROW, BLUE, center, radius)
 
-    def is_legal_move(self, point_idx):
-        """
-        Checks if movement is to a vacant and adjacent spot.
-        Ensures position is not altered twice in drop phase of the game.
-        """
-        if Game.moves < 14:
-            if self.position != -1:
-                log.warning('Position of crows cannot be altered, till all crows are on board.')
-                return False
-        ret = super().is_legal_move(point_idx)
-        if ret is not None:
-            return ret
-        return self.jump_adjacency(point_idx)
-
 if __name__ == "__main__":
-    logging.basicConfig(
-        level="NOTSET",
-        format="%(message)s",
-        datefmt="[%X]",
-        handlers=[RichHandler()]
-    )
+    parser = argparse.ArgumentParser(description='Kaooa game.')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--ai', choices=['vulture', 'crow'], help='side played by the computer')
+    mode.add_argument('--replay', metavar='ARCHIVE', help='game archive to play back')
+    parser.add_argument('--think', type=float, default=1.0, help='seconds of search per move')
+    parser.add_argument('--record', metavar='ARCHIVE', help='game archive to append the games to')
+    parser.add_argument('--game', type=int, default=0, help='index of the game to play back')
+    parser.add_argument('--speed', type=float, default=1.0, help='speed factor of the play back')
+    parser.add_argument('--points', type=int, default=STANDARD_POINTS, help='points of the star')
+    parser.add_argument('--crows', type=int, default=CROW_COUNT, help='crows in the game')
+    parser.add_argument('--captures', type=int, default=CAPTURES_TO_WIN,
+                        help='captures for the vulture to win')
+    parser.add_argument('--hud', action='store_true', help='start with the performance overlay')
+    parser.add_argument('--trace', metavar='CSV', help='file to write the frame timings to')
+    parser.add_argument('--profile-dir', default='.', help='directory for the profiler captures')
+    parser.add_argument('--first-frame', action='store_true',
+                        help='quit after the first frame, for the startup benchmark')
+    args = parser.parse_args()
+    if args.speed <= 0:
+        parser.error('--speed should be positive.')
+    try:
+        Game.rules = make_rules(args.points, args.crows, args.captures)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.crows > 3 * HAND_COLUMN:
+        parser.error(f'--crows should be at most {3 * HAND_COLUMN}, the crows fitting the window.')
+    if Game.rules is not STANDARD_RULES and (args.replay or args.record):
+        parser.error('Game archives only hold games of the standard rules.')
+    if args.replay is not None:
+        try:
+            records = read_archive(args.replay)
+        except ValueError as error:
+            parser.error(f'{args.replay}: {error}')
+        if not 0 <= args.game < len(records):
+            parser.error(f'--game should be below {len(records)}, the games in the archive.')
+        try:
+            replay(records[args.game])
+        except ValueError as error:
+            parser.error(f'{args.replay}: game {args.game}: {error}')
+        Game.replay_record = records[args.game]
+        Game.replay_speed = args.speed
+    Game.record_path = args.record
+    if args.ai is not None:
+        Game.ai_side = PlayerClass[args.ai.upper()]
+        from kaooa_search import AlphaBetaAgent # pylint: disable=import-outside-toplevel
+        Game.ai = AlphaBetaAgent(time_limit=args.think, rules=Game.rules)
+    Game.timer = FrameTimer(trace=args.trace)
+    Game.hud_shown = args.hud
+    if not os.path.isdir(args.profile_dir):
+        parser.error('--profile-dir should be an existing directory.')
+    Game.capture = ProfileCapture(args.profile_dir)
+
     log = logging.getLogger("rich")
+    Game.messages = MessageLine()
+    listener = start_logging(log, DeferredHandler(console_handler), Game.messages)
 
     pygame.init()
     pygame.display.set_caption('Kaooa')
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    Game.init()
 
-    spot_coords = [
-        (600, 100),
-        (667, 307),
-        (888, 307),
-        (708, 433),
-        (774, 640),
-        (600, 514),
-        (426, 640),
-        (492, 433),
-        (312, 307),
-        (532, 307)
-    ]
+    spot_coords = Game.rules.board.layout(BOARD_CENTER, BOARD_RADIUS)
+    Game.init()
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(ALLOWED_EVENTS)
+    pygame.display.update(Game.update())
+    if args.first_frame:
+        print('FIRST FRAME', flush=True)
 
     clock = pygame.time.Clock()
-    RUNNING = True
+    RUNNING = not args.first_frame
 
     while RUNNING:
-        for event in pygame.event.get():
+        Game.timer.start()
+        if Game.is_active():
+            events = pygame.event.get()
+        else:
+            events = [pygame.event.wait(Game.idle_timeout())]
+            Game.timer.skip()
+            events += pygame.event.get()
+        for event in events:
             if event.type == pygame.QUIT:
                 RUNNING = False
             elif event.type == pygame.KEYDOWN:
@@ -486,20 +886,32 @@ if __name__ == "__main__":
                     RUNNING = False
                 elif event.key == pygame.K_r:
                     Game.restart()
+                elif event.key == pygame.K_u:
+                    Game.undo()
+                elif event.key == pygame.K_y:
+                    Game.redo()
+                elif event.key == pygame.K_h:
+                    Game.toggle_hud()
+                elif event.key == pygame.K_p:
+                    Game.toggle_profile()
+            elif event.type in EXPOSE_EVENTS:
+                Game.players.repaint_rect(screen.get_rect())
             else:
                 Game.handle_event(event)
-
-        screen.fill(BLACK)
-        for i in range(0, len(spot_coords), 2):
-            u = spot_coords[i]
-            v = spot_coords[(i + 4) % len(spot_coords)]
-            pygame.draw.line(screen, WHITE, u, v, width=5)
-        for point in spot_coords:
-            pygame.draw.circle(screen, WHITE, point, 30)
-
-        Game.update()
-        pygame.display.flip()
-        clock.tick(60)
-
+        Game.timer.mark('events')
+        Game.play_ai()
+        Game.play_replay()
+        Game.timer.mark('logic')
+
+        pygame.display.update(Game.update())
+        Game.timer.mark('display')
+        if Game.is_active():
+            clock.tick(FRAME_RATE)
+
+    Game.timer.close()
+    if Game.capture.active:
+        Game.toggle_profile()
+    Game.save_record()
+    listener.stop()
     pygame.quit()
     sys.exit()
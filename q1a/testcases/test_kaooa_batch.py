@@ -0,0 +1,69 @@
+"""Module for unit tests on kaooa_batch."""
+
+import os
+import sys
+sys.path.insert(1, os.path.join(sys.path[0], '../AllLint'))
+
+import pytest
+from kaooa_engine import PlayerClass, Move, STANDARD_RULES, make_rules
+
+np = pytest.importorskip('numpy')
+kaooa_batch = pytest.importorskip('kaooa_batch')
+
+def play_lockstep(rules, count, seed):
+    """Plays random games in a batch and in the engine side by side, comparing every ply."""
+
+    env = kaooa_batch.BatchEnv(count, rules, auto_reset=False)
+    rng = np.random.default_rng(seed)
+    states = [rules.initial_state() for _ in range(count)]
+    while not env.done.all():
+        for game in np.flatnonzero(~env.done):
+            expected = {env.action_of(move) for move in rules.legal_moves(states[game])}
+            assert set(np.flatnonzero(env.legal[game])) == expected
+        actions = kaooa_batch.sample_actions(env.legal, rng)
+        moves = {game: env.move_of(game, actions[game]) for game in np.flatnonzero(~env.done)}
+        rewards, ended = env.step(actions)
+        for game, move in moves.items():
+            mover = states[game].turn
+            states[game] = rules.apply_move(states[game], move)
+            assert env.state(game) == states[game]
+            truncated = env.plies[game] >= env.max_plies
+            assert ended[game] == (rules.is_terminal(states[game]) or truncated)
+            if states[game].winner is not None:
+                assert rewards[game] == (1 if states[game].winner == mover else -1)
+    return states
+
+def test_lockstep_standard():
+    """Tests that batched random games follow the engine, move by move."""
+
+    states = play_lockstep(STANDARD_RULES, 64, 1)
+    assert {state.winner for state in states} <= {PlayerClass.VULTURE, PlayerClass.CROW, None}
+
+def test_lockstep_variant():
+    """Tests that the batch plays a bigger star by its own rules."""
+
+    play_lockstep(make_rules(7, 9, 5), 16, 2)
+
+def test_auto_reset_and_illegal_actions():
+    """Tests that ended games restart, and that an illegal action is refused."""
+
+    env = kaooa_batch.BatchEnv(8, max_plies=3)
+    rng = np.random.default_rng(3)
+    for _ in range(2):
+        env.step(kaooa_batch.sample_actions(env.legal, rng))
+    _, ended = env.step(kaooa_batch.sample_actions(env.legal, rng))
+    assert ended.all()
+    assert not env.done.any()
+    assert (env.plies == 0).all() and (env.crows == 0).all()
+    assert env.observe().shape == (8, 24)
+    with pytest.raises(ValueError):
+        env.step(np.full(8, env.action_of(Move(0, 1))))
+
+def test_out_of_range_actions():
+    """Tests that actions outside the action set are refused, not wrapped around."""
+
+    env = kaooa_batch.BatchEnv(1)
+    for action in (-2, env.action_count, env.action_count + 5):
+        with pytest.raises(ValueError, match='out of range'):
+            env.step(np.array([action]))
+    assert env.state(0) == STANDARD_RULES.initial_state()
@@ -0,0 +1,99 @@
+"""Module for unit tests on kaooa_board."""
+
+import os
+import sys
+sys.path.insert(1, os.path.join(sys.path[0], '../AllLint'))
+
+import pytest
+from kaooa_board import (
+    NEIGHBOURS, CAPTURES, SPOTS_OF, STANDARD_BOARD, VULTURE_SLIDE_COUNT, CAPTURE_COUNT,
+    CROW_SLIDE_COUNT, capture_options, vulture_blocked, make_board, spots_in
+)
+
+def mask(*spots):
+    """Returns the bitmask of the given spots."""
+
+    return sum(1 << spot for spot in spots)
+
+def test_neighbour_table():
+    """Tests that outer points have two links, and intersections have four."""
+
+    assert NEIGHBOURS[0] == mask(1, 9)
+    assert NEIGHBOURS[1] == mask(0, 2, 3, 9)
+    for idx in range(10):
+        assert bin(NEIGHBOURS[idx]).count('1') == (4 if idx % 2 else 2)
+        for other in SPOTS_OF[NEIGHBOURS[idx]]:
+            assert NEIGHBOURS[other] >> idx & 1
+
+def test_capture_table():
+    """Tests that captures jump along a straight line of the pentagram."""
+
+    assert CAPTURES[0] == ((1, 3), (9, 7))
+    assert CAPTURES[1] == ((3, 4), (9, 8))
+    for idx in range(10):
+        for crow_idx, jump_idx in CAPTURES[idx]:
+            assert NEIGHBOURS[idx] >> crow_idx & 1
+            assert NEIGHBOURS[crow_idx] >> jump_idx & 1
+
+def test_spots_of():
+    """Tests the decoding of masks into spot indices."""
+
+    assert SPOTS_OF[0] == ()
+    assert SPOTS_OF[mask(2, 5, 9)] == (2, 5, 9)
+
+def test_move_count_tables():
+    """Tests the move count tables against the moves counted spot by spot."""
+
+    for vulture in range(-1, 10):
+        for crows in range(1 << 10):
+            if vulture >= 0 and crows >> vulture & 1:
+                continue
+            vacant = mask(*range(10)) & ~crows & ~(mask(vulture) if vulture >= 0 else 0)
+            assert CROW_SLIDE_COUNT[vulture][crows] == \
+                sum(len(SPOTS_OF[NEIGHBOURS[crow] & vacant]) for crow in SPOTS_OF[crows])
+            if vulture >= 0:
+                slides = SPOTS_OF[NEIGHBOURS[vulture] & vacant]
+                assert VULTURE_SLIDE_COUNT[vulture][crows] == len(slides)
+                assert CAPTURE_COUNT[vulture][crows] == len(capture_options(crows, vulture))
+
+def test_capture_options():
+    """Tests capture detection for a vulture on an intersection."""
+
+    assert capture_options(mask(3, 9), 1) == [(3, 4), (9, 8)]
+    assert capture_options(mask(3, 4, 9), 1) == [(9, 8)]
+    assert not capture_options(mask(3, 4), -1)
+
+def test_vulture_blocked():
+    """Tests blocking of the vulture on outer points and intersections."""
+
+    assert vulture_blocked(mask(1, 9, 3, 7), 0)
+    assert not vulture_blocked(mask(1, 9, 3), 0)
+    assert vulture_blocked(mask(0, 2, 3, 9, 4, 8), 1)
+    assert not vulture_blocked(mask(0, 2, 3, 9, 4), 1)
+    assert not vulture_blocked(mask(0, 2, 3, 9, 4, 8), -1)
+
+def test_standard_board():
+    """Tests that the generated pentagram matches the module tables."""
+
+    assert make_board() is STANDARD_BOARD
+    assert STANDARD_BOARD.neighbours == NEIGHBOURS
+    assert STANDARD_BOARD.captures == CAPTURES
+    assert STANDARD_BOARD.lines == ((0, 4), (2, 6), (4, 8), (6, 0), (8, 2))
+
+def test_larger_stars():
+    """Tests that links and captures of bigger stars run both ways along their lines."""
+
+    for points in (7, 9, 11):
+        board = make_board(points)
+        assert board.spot_count == 2 * points
+        for idx in range(board.spot_count):
+            assert len(spots_in(board.neighbours[idx])) == (4 if idx % 2 else 2)
+            for other in spots_in(board.neighbours[idx]):
+                assert board.neighbours[other] >> idx & 1
+            for crow_idx, jump_idx in board.captures[idx]:
+                assert board.neighbours[idx] >> crow_idx & 1
+                assert board.neighbours[crow_idx] >> jump_idx & 1
+                assert (crow_idx, idx) in board.captures[jump_idx]
+        assert len(set(board.layout((600, 400), 300))) == board.spot_count
+    with pytest.raises(ValueError):
+        make_board(4)
@@ -0,0 +1,98 @@
+"""Module for unit tests on kaooa_broadcast and kaooa_spectate."""
+
+import os
+import sys
+sys.path.insert(1, os.path.join(sys.path[0], '../AllLint'))
+
+import random
+import asyncio
+from kaooa_engine import initial_state, legal_moves, apply_move
+from kaooa_broadcast import (
+    DELTA, KEYFRAME_INTERVAL, Channel, encode_snapshot, encode_delta, apply_frame
+)
+from kaooa_server import GameServer
+from kaooa_spectate import fanout, watch
+from kaooa_loadtest import request
+
+def random_game(seed, plies):
+    """Returns the moves and states of a random game."""
+
+    rng = random.Random(seed)
+    state = initial_state()
+    played = []
+    for _ in range(plies):
+        moves = legal_moves(state)
+        if not moves:
+            break
+        move = rng.choice(moves)
+        state = apply_move(state, move)
+        played.append((move, state))
+    return played
+
+def test_frames_rebuild_game():
+    """Tests that snapshots and deltas rebuild every state of random games."""
+
+    for seed in range(20):
+        seq, state = apply_frame(None, encode_snapshot(0, initial_state()))
+        assert (seq, state) == (0, initial_state())
+        for idx, (move, expected) in enumerate(random_game(seed, 100), 1):
+            frame = encode_delta(idx, move, expected)
+            assert len(frame) == DELTA.size
+            seq, state = apply_frame(state, frame)
+            assert (seq, state) == (idx, expected)
+            assert apply_frame(None, encode_snapshot(idx, expected)) == (idx, expected)
+
+def test_catch_up():
+    """Tests that late joiners get the last snapshot and the deltas since."""
+
+    channel = Channel(initial_state())
+    played = random_game(12, KEYFRAME_INTERVAL + 5)
+    assert len(played) == KEYFRAME_INTERVAL + 5
+    for move, state in played:
+        channel.publish(move, state)
+
+    frames = channel.catch_up()
+    assert len(frames) == 6
+    state = None
+    for frame in frames:
+        seq, state = apply_frame(state, frame)
+    assert (seq, state) == (len(played), played[-1][1])
+
+    frames = channel.catch_up(since=KEYFRAME_INTERVAL + 3)
+    assert len(frames) == 2
+    state = played[KEYFRAME_INTERVAL + 2][1]
+    for frame in frames:
+        seq, state = apply_frame(state, frame)
+    assert state == played[-1][1]
+    assert len(channel.catch_up(since=3)) == 6
+
+async def served_fanout(spectators):
+    """Runs the fan-out benchmark against a fresh server, and watches an undo."""
+
+    server = GameServer()
+    listener = await server.start(port=0)
+    port = listener.sockets[0].getsockname()[1]
+    result = await fanout('127.0.0.1', port, spectators, 30, seed=2)
+
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    game_id = (await request(reader, writer, 'NEW'))[1]
+    await request(reader, writer, f'MOVE {game_id} -1 0')
+    spectator = await watch('127.0.0.1', port, game_id)
+    await request(reader, writer, f'UNDO {game_id}')
+    await spectator.receive()
+    undone = spectator.state
+    await request(reader, writer, f'END {game_id}')
+    ended = not await spectator.receive()
+    writer.close()
+    listener.close()
+    return result, undone, ended, server
+
+def test_fanout():
+    """Tests live broadcast to many spectators, undo snapshots and stream end."""
+
+    result, undone, ended, server = asyncio.run(served_fanout(50))
+    assert result.spectators == 50 and result.moves > 0
+    assert len(result.latencies) == result.moves
+    assert undone == initial_state()
+    assert ended
+    assert not server.sessions and not server.channels
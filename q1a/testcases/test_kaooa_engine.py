@@ -0,0 +1,173 @@
+"""Module for unit tests on kaooa_engine."""
+
+import os
+import sys
+sys.path.insert(1, os.path.join(sys.path[0], '../AllLint'))
+
+import random
+import pytest
+from kaooa_engine import (
+    PlayerClass, Move, GameState, initial_state, legal_moves, apply_move,
+    validate_move, is_terminal, illegal_reason, mobility, Rules, STANDARD_RULES, make_rules
+)
+from kaooa_board import make_board
+from kaooa_perft import PERFT_INITIAL
+
+def state_from(vulture, crows, **kwargs):
+    """Builds a sliding phase state from a vulture spot and a list of crow spots."""
+
+    kwargs.setdefault('moves', 15)
+    kwargs.setdefault('crows_in_hand', 0)
+    return GameState(sum(1 << crow for crow in crows), vulture, **kwargs)
+
+def test_initial_drops():
+    """Tests that the crows open the game by dropping on any spot."""
+
+    state = initial_state()
+    assert state.turn == PlayerClass.CROW
+    assert sorted(legal_moves(state)) == [Move(-1, idx) for idx in range(10)]
+
+def test_crow_cannot_move_in_drop_phase():
+    """Tests that a dropped crow stays in place until the drop phase ends."""
+
+    state = apply_move(initial_state(), Move(-1, 0))
+    state = apply_move(state, Move(-1, 5))
+    assert all(move.source == -1 for move in legal_moves(state))
+    assert illegal_reason(state, PlayerClass.CROW, 0, 1) == \
+        'Position of crows cannot be altered, till all crows are on board.'
+
+def test_mandatory_capture():
+    """Tests that the vulture must capture whenever it is possible."""
+
+    state = state_from(0, [1, 6], turn=PlayerClass.VULTURE)
+    assert legal_moves(state) == [Move(0, 3, 1)]
+    assert illegal_reason(state, PlayerClass.VULTURE, 0, 9) == 'Vulture must capture the crow'
+
+    state = apply_move(state, Move(0, 3, 1))
+    assert state.spots[1] is None
+    assert state.crows_captured == 1
+    assert state.turn == PlayerClass.CROW
+
+def test_inner_spot_adjacency():
+    """Tests that only inner spots are linked to the neighbouring inner spots."""
+
+    state = state_from(8, [1, 2, 4, 6], turn=PlayerClass.CROW)
+    targets = {(move.source, move.target) for move in legal_moves(state)}
+    assert (1, 3) in targets
+    assert (2, 3) in targets
+    assert (2, 0) not in targets
+
+def test_crows_win_by_blocking():
+    """Tests that the crows win once the vulture has no possible move."""
+
+    state = state_from(0, [1, 9, 3, 6], turn=PlayerClass.CROW)
+    state = apply_move(state, Move(6, 7))
+    assert state.winner == PlayerClass.CROW
+    assert is_terminal(state)
+    assert not legal_moves(state)
+
+def test_vulture_wins_on_fourth_capture():
+    """Tests that the vulture wins on capturing the fourth crow."""
+
+    state = state_from(0, [1, 6], turn=PlayerClass.VULTURE, crows_captured=3)
+    state = apply_move(state, Move(0, 3, 1))
+    assert state.winner == PlayerClass.VULTURE
+    assert state.moves == 15
+
+def test_validate_move():
+    """Tests rejection of illegal moves from untrusted input."""
+
+    state = state_from(0, [1, 6], turn=PlayerClass.VULTURE)
+    with pytest.raises(ValueError, match='^Vulture must capture the crow$'):
+        validate_move(state, Move(0, 9))
+    with pytest.raises(ValueError, match='^Captured crow does not match the move.$'):
+        validate_move(state, Move(0, 3))
+    validate_move(state, Move(0, 3, 1))
+    for move in (Move(-1, 40), Move(-1, 10), Move(-1, -1), Move(-2, 3), Move(10, 3)):
+        with pytest.raises(ValueError, match='^Spot is not on the board.$'):
+            validate_move(initial_state(), move)
+
+def test_random_playouts():
+    """Tests that random games keep the piece counts consistent."""
+
+    rng = random.Random(7)
+    for _ in range(200):
+        state = initial_state()
+        for _ in range(100):
+            if is_terminal(state):
+                break
+            move = rng.choice(legal_moves(state))
+            validate_move(state, move)
+            state = apply_move(state, move)
+            crows = state.spots.count(PlayerClass.CROW)
+            assert crows + state.crows_in_hand + state.crows_captured == 7
+            assert state.spots.count(PlayerClass.VULTURE) <= 1
+
+def perft(rules, state, depth):
+    """Counts the leaf nodes depth plies below state, under rules."""
+
+    if depth == 0:
+        return 1
+    return sum(
+        perft(rules, rules.apply_move(state, move), depth - 1) for move in rules.legal_moves(state)
+    )
+
+def test_generic_rules_match_standard():
+    """Tests that the generic rules on the pentagram play the standard game."""
+
+    rules = Rules(make_board(), 7, 4)
+    assert [perft(rules, rules.initial_state(), depth) for depth in range(6)] == \
+        list(PERFT_INITIAL[:6])
+    rng = random.Random(3)
+    for _ in range(100):
+        state = initial_state()
+        while not is_terminal(state):
+            assert sorted(rules.legal_moves(state)) == sorted(legal_moves(state))
+            assert mobility(state) == rules.mobility(state) == len(legal_moves(state))
+            assert rules.spots(state) == state.spots
+            move = rng.choice(legal_moves(state))
+            assert rules.apply_move(state, move) == apply_move(state, move)
+            state = apply_move(state, move)
+
+def test_variants():
+    """Tests random games of bigger variants, and the checks of their parameters."""
+
+    assert make_rules() is STANDARD_RULES
+    rng = random.Random(5)
+    for points, crow_count, captures_to_win in ((7, 9, 5), (9, 12, 6), (11, 15, 8)):
+        rules = make_rules(points, crow_count, captures_to_win)
+        assert rules is make_rules(points, crow_count, captures_to_win)
+        for _ in range(20):
+            state = rules.initial_state()
+            while not rules.is_terminal(state) and state.moves < 500:
+                move = rng.choice(rules.legal_moves(state))
+                rules.validate_move(state, move)
+                assert rules.mobility(state) == len(rules.legal_moves(state))
+                state = rules.apply_move(state, move)
+                spots = rules.spots(state)
+                assert spots.count(PlayerClass.CROW) + state.crows_in_hand + \
+                    state.crows_captured == crow_count
+            assert state.crows_captured <= captures_to_win
+    with pytest.raises(ValueError):
+        make_rules(7, 13, 4)
+    with pytest.raises(ValueError):
+        make_rules(7, 5, 6)
+
+def test_destinations_match_illegal_reason():
+    """Tests that the grouped legal moves hold exactly the moves illegal_reason allows."""
+
+    assert STANDARD_RULES.destinations(state_from(0, [1, 6], turn=PlayerClass.VULTURE)) == \
+        {0: {3: Move(0, 3, 1)}}
+    rng = random.Random(11)
+    for _ in range(30):
+        state = initial_state()
+        while not is_terminal(state):
+            grouped = STANDARD_RULES.destinations(state)
+            sources = [-1] + [
+                idx for idx, plclass in enumerate(state.spots) if plclass == state.turn
+            ]
+            for source in sources:
+                for target in range(10):
+                    allowed = illegal_reason(state, state.turn, source, target) is None
+                    assert (target in grouped.get(source, {})) == allowed
+            state = apply_move(state, rng.choice(legal_moves(state)))
@@ -0,0 +1,103 @@
+"""Module for unit tests on kaooa_hashing."""
+
+import os
+import sys
+sys.path.insert(1, os.path.join(sys.path[0], '../AllLint'))
+
+import random
+from kaooa_board import NEIGHBOURS, CAPTURES
+from kaooa_engine import initial_state, legal_moves, apply_move, make_rules, STANDARD_RULES
+from kaooa_hashing import (
+    SYMMETRIES, INVERSE, zobrist_hash, update_hash, symmetric_hashes,
+    update_symmetric_hashes, canonical_hash, canonical_state, transform_move,
+    Hasher, STANDARD_HASHER, make_hasher
+)
+
+def random_states(count, seed):
+    """Yields pairs of a state and a legal move from it, along random games."""
+
+    rng = random.Random(seed)
+    for _ in range(count):
+        state = initial_state()
+        for _ in range(40):
+            moves = legal_moves(state)
+            if not moves:
+                break
+            move = rng.choice(moves)
+            yield state, move
+            state = apply_move(state, move)
+
+def transform_state(state, sym):
+    """Returns state with the symmetry sym applied to its spots."""
+
+    vulture = SYMMETRIES[sym][state.vulture] if state.vulture >= 0 else -1
+    return state._replace(crows=STANDARD_HASHER.transform_mask(state.crows, sym), vulture=vulture)
+
+def test_symmetries_preserve_board():
+    """Tests that every symmetry maps links and capture lines onto each other."""
+
+    assert len(set(SYMMETRIES)) == 10
+    for sym, perm in enumerate(SYMMETRIES):
+        assert SYMMETRIES[INVERSE[sym]][perm[0]] == 0
+        for idx in range(10):
+            assert STANDARD_HASHER.transform_mask(NEIGHBOURS[idx], sym) == NEIGHBOURS[perm[idx]]
+            assert {(perm[crow], perm[jump]) for crow, jump in CAPTURES[idx]} == \
+                set(CAPTURES[perm[idx]])
+
+def test_incremental_hash():
+    """Tests that updating the hash move by move matches hashing from scratch."""
+
+    for state, move in random_states(50, 1):
+        child = apply_move(state, move)
+        for sym in (0, 3, 7):
+            assert update_hash(zobrist_hash(state, sym), state, move, sym) == \
+                zobrist_hash(child, sym)
+        assert update_symmetric_hashes(symmetric_hashes(state), state, move) == \
+            symmetric_hashes(child)
+
+def test_symmetric_positions_share_keys():
+    """Tests that the symmetric copies of a position share the canonical hash and state."""
+
+    for state, move in random_states(20, 2):
+        key = canonical_hash(symmetric_hashes(state))[0]
+        representative = canonical_state(state)[0]
+        for sym in range(10):
+            image = transform_state(state, sym)
+            assert canonical_hash(symmetric_hashes(image))[0] == key
+            assert canonical_state(image)[0] == representative
+            assert transform_move(move, sym) in legal_moves(image)
+            assert transform_move(transform_move(move, sym), INVERSE[sym]) == move
+
+def test_standard_hasher():
+    """Tests that the module functions and constants are those of the standard Hasher."""
+
+    assert STANDARD_HASHER.symmetries == SYMMETRIES
+    for state, move in random_states(10, 5):
+        assert zobrist_hash(state) == Hasher(STANDARD_RULES).zobrist_hash(state)
+        assert canonical_state(state) == STANDARD_HASHER.canonical_state(state)
+        assert update_hash(zobrist_hash(state), state, move) == \
+            STANDARD_HASHER.zobrist_hash(apply_move(state, move))
+
+def test_variant_hasher():
+    """Tests incremental and symmetric hashing on a 9 point star."""
+
+    assert make_hasher(STANDARD_RULES) is STANDARD_HASHER
+    rules = make_rules(9, 12, 6)
+    hasher = make_hasher(rules)
+    assert len(set(hasher.symmetries)) == 18
+    rng = random.Random(4)
+    state = rules.initial_state()
+    while not rules.is_terminal(state):
+        move = rng.choice(rules.legal_moves(state))
+        child = rules.apply_move(state, move)
+        assert hasher.update_symmetric_hashes(hasher.symmetric_hashes(state), state, move) == \
+            hasher.symmetric_hashes(child)
+        key = canonical_hash(hasher.symmetric_hashes(state))[0]
+        for sym, perm in enumerate(hasher.symmetries):
+            image = state._replace(
+                crows=hasher.transform_mask(state.crows, sym),
+                vulture=perm[state.vulture] if state.vulture >= 0 else -1
+            )
+            assert canonical_hash(hasher.symmetric_hashes(image))[0] == key
+            assert hasher.transform_move(move, sym) in rules.legal_moves(image)
+        state = child
@@ -0,0 +1,66 @@
+"""Module for unit tests on kaooa_history."""
+
+import os
+import sys
+sys.path.insert(1, os.path.join(sys.path[0], '../AllLint'))
+
+import random
+from kaooa_engine import Move, initial_state, legal_moves, apply_move
+from kaooa_perft import PERFT_INITIAL
+from kaooa_history import Timeline
+
+def timeline_perft(timeline, depth):
+    """Counts the leaf nodes at depth, with make/unmake on the timeline."""
+
+    if depth == 0:
+        return 1
+    nodes = 0
+    for move in legal_moves(timeline.state):
+        timeline.play(move)
+        nodes += timeline_perft(timeline, depth - 1)
+        timeline.undo()
+    return nodes
+
+def test_undo_redo():
+    """Tests that undo and redo walk the states of a game both ways."""
+
+    rng = random.Random(3)
+    timeline = Timeline()
+    states = [timeline.state]
+    for _ in range(60):
+        moves = legal_moves(timeline.state)
+        if not moves:
+            break
+        move = rng.choice(moves)
+        assert timeline.play(move) == apply_move(states[-1], move)
+        states.append(timeline.state)
+    assert len(timeline.moves()) == len(states) - 1
+
+    for state in reversed(states[:-1]):
+        assert timeline.undo() is not None
+        assert timeline.state == state
+    assert not timeline.can_undo and timeline.undo() is None
+
+    for state in states[1:]:
+        assert timeline.redo() is not None
+        assert timeline.state == state
+    assert not timeline.can_redo and timeline.redo() is None
+
+def test_play_drops_redo():
+    """Tests that a new move after an undo discards the undone moves."""
+
+    timeline = Timeline()
+    timeline.play(Move(-1, 0))
+    timeline.undo()
+    assert timeline.can_redo
+    timeline.play(Move(-1, 2))
+    assert not timeline.can_redo
+    assert timeline.moves() == [Move(-1, 2)]
+
+def test_make_unmake_perft():
+    """Tests that make/unmake on a timeline visits the same tree as perft."""
+
+    timeline = Timeline()
+    for depth in range(6):
+        assert timeline_perft(timeline, depth) == PERFT_INITIAL[depth]
+    assert timeline.state == initial_state()
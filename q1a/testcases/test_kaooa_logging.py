@@ -0,0 +1,80 @@
+"""Module for unit tests on kaooa_logging."""
+
+import os
+import sys
+sys.path.insert(1, os.path.join(sys.path[0], '../AllLint'))
+
+import logging
+from kaooa_logging import ThrottleFilter, MessageLine, start_logging
+
+class FakeClock:
+    """Clock moved by hand."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def record(message, *args, level=logging.WARNING):
+    """Builds a log record of message."""
+
+    return logging.LogRecord('test', level, __file__, 1, message, args, None)
+
+def test_repeats_are_dropped_and_counted():
+    """Tests that repeats within the interval are dropped, and counted on the next copy."""
+
+    clock = FakeClock()
+    throttle = ThrottleFilter(interval=1.0, burst=100, clock=clock)
+    assert throttle.filter(record('Vacant spot %d', 3))
+    for _ in range(5):
+        clock.now += 0.1
+        assert not throttle.filter(record('Vacant spot %d', 3))
+    assert throttle.filter(record('Vacant spot %d', 4))
+    clock.now = 1.5
+    later = record('Vacant spot %d', 3)
+    assert throttle.filter(later)
+    assert later.getMessage() == 'Vacant spot 3 (repeated 5 more times)'
+    assert throttle.dropped == 5
+
+def test_burst_limit():
+    """Tests that distinct messages beyond the burst of an interval are dropped."""
+
+    clock = FakeClock()
+    throttle = ThrottleFilter(interval=1.0, burst=3, clock=clock)
+    passed = [throttle.filter(record(f'Message {idx}')) for idx in range(5)]
+    assert passed == [True, True, True, False, False]
+    clock.now = 1.0
+    assert throttle.filter(record('Message 9'))
+
+def test_message_line_expires():
+    """Tests that the message line keeps the latest message for its duration only."""
+
+    clock = FakeClock()
+    line = MessageLine(duration=2.0, clock=clock)
+    assert line.current() is None
+    line.handle(record('Movement must be to a vacant spot.'))
+    clock.now = 1.0
+    assert line.current() == 'Movement must be to a vacant spot.'
+    clock.now = 2.5
+    assert line.current() is None
+
+def test_queued_logging():
+    """Tests throttled delivery through the listener, and warnings only on the message line."""
+
+    logger = logging.getLogger('test_kaooa_logging')
+    line = MessageLine()
+    collected = []
+    sink = logging.Handler()
+    sink.emit = lambda record: collected.append(record.getMessage())
+    listener = start_logging(logger, sink, line, throttle=ThrottleFilter(burst=100))
+    try:
+        for _ in range(50):
+            logger.warning('Vulture must capture the crow')
+        logger.info('Crow captured')
+    finally:
+        listener.stop()
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+    assert collected == ['Vulture must capture the crow', 'Crow captured']
+    assert line.current() == 'Vulture must capture the crow'
@@ -0,0 +1,37 @@
+"""Module for unit tests on kaooa_mcts."""
+
+import os
+import sys
+sys.path.insert(1, os.path.join(sys.path[0], '../AllLint'))
+
+import random
+from kaooa_engine import PlayerClass, Move, GameState, initial_state, legal_moves
+from kaooa_mcts import MCTSAgent, playout
+
+def test_playout_finishes():
+    """Tests that random playouts end with a winner, or none once the ply cap is hit."""
+
+    rng = random.Random(11)
+    for _ in range(50):
+        assert playout(initial_state(), rng) in (PlayerClass.VULTURE, PlayerClass.CROW, None)
+
+def test_crows_block_vulture():
+    """Tests that the search finds the move trapping the vulture."""
+
+    state = GameState(
+        crows=1 << 1 | 1 << 9 | 1 << 3 | 1 << 6, vulture=0, turn=PlayerClass.CROW,
+        moves=30, crows_in_hand=0, crows_captured=3
+    )
+    agent = MCTSAgent(playouts=1000, seed=1)
+    assert agent.choose_move(state) == Move(6, 7)
+    assert agent.last_result.playouts == 1000
+
+def test_process_pool():
+    """Tests that playouts are spread over the worker processes, and accounted for."""
+
+    with MCTSAgent(playouts=256, workers=2, batch_size=32, seed=2) as agent:
+        result = agent.search(initial_state())
+    assert result.move in legal_moves(initial_state())
+    assert sum(playouts for playouts, _ in result.worker_stats.values()) == 256
+    assert os.getpid() not in result.worker_stats
+    assert all(rate > 0 for rate in result.worker_rates().values())
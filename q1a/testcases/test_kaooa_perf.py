@@ -0,0 +1,104 @@
+"""Module for unit tests on kaooa_perf."""
+
+import os
+import sys
+sys.path.insert(1, os.path.join(sys.path[0], '../AllLint'))
+
+import csv
+import pstats
+from kaooa_perf import FrameTimer, ProfileCapture, bucket_labels
+
+def run_frame(timer, start, stage_ms, wait_ms=0.0):
+    """Runs a frame from start, spending stage_ms in each stage and then waiting."""
+
+    timer.start(start)
+    now = start
+    for stage, spent in zip(timer.stages, stage_ms):
+        now += spent / 1000
+        timer.mark(stage, now)
+    return now + wait_ms / 1000
+
+def test_stage_timings():
+    """Tests that stages are charged their time, and waits are left out of the busy time."""
+
+    timer = FrameTimer(stages=('events', 'draw'))
+    now = run_frame(timer, 0.0, (1.0, 3.0), wait_ms=12.0)
+    now = run_frame(timer, now, (2.0, 1.0), wait_ms=13.0)
+    timer.start(now)
+    assert len(timer.history) == 2
+    means = timer.stage_means()
+    assert abs(means['events'] - 1.5) < 1e-9
+    assert abs(means['draw'] - 2.0) < 1e-9
+    assert abs(timer.fps() - 2 / 0.032) < 1e-6
+    assert [round(1000 * busy, 6) for busy in timer.busy_times()] == [4.0, 3.0]
+
+def test_skip_excludes_waiting():
+    """Tests that time skipped inside a frame counts towards the interval only."""
+
+    timer = FrameTimer(stages=('events',))
+    timer.start(0.0)
+    timer.skip(0.5)
+    timer.mark('events', 0.501)
+    timer.start(0.6)
+    interval, stages = timer.history[0]
+    assert abs(interval - 0.6) < 1e-9
+    assert abs(stages[0] - 0.001) < 1e-9
+
+def test_histogram():
+    """Tests that frames land in the bucket of their busy time."""
+
+    timer = FrameTimer(stages=('draw',), history=10)
+    now = 0.0
+    for busy_ms in (0.5, 1.5, 3.0, 40.0, 40.0):
+        now = run_frame(timer, now, (busy_ms,), wait_ms=1.0)
+    timer.start(now)
+    assert timer.histogram() == [1, 1, 1, 0, 0, 0, 2]
+    assert len(bucket_labels()) == len(timer.histogram())
+    assert timer.percentile(0.5) == 3.0
+    assert timer.percentile(1.0) == 40.0
+
+def test_history_limit():
+    """Tests that only the recent frames are summarised."""
+
+    timer = FrameTimer(stages=('draw',), history=3)
+    now = 0.0
+    for _ in range(10):
+        now = run_frame(timer, now, (1.0,))
+    timer.close(now)
+    assert len(timer.history) == 3
+    assert timer.count == 10
+
+def test_csv_trace(tmp_path):
+    """Tests that every frame is written to the trace, the last one when closing."""
+
+    path = tmp_path / 'trace.csv'
+    timer = FrameTimer(stages=('events', 'draw'), history=2, trace=str(path))
+    now = 0.0
+    for _ in range(5):
+        now = run_frame(timer, now, (1.0, 2.0), wait_ms=5.0)
+    timer.close(now)
+    with open(path, newline='', encoding='ascii') as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == ['frame', 'interval_ms', 'busy_ms', 'events_ms', 'draw_ms']
+    assert len(rows) == 6
+    assert rows[1] == ['1', '8.000', '3.000', '1.000', '2.000']
+    assert timer.file is None
+
+def busy_work():
+    """Spends a little time in a function the profiler can find."""
+
+    return sum(idx * idx for idx in range(20000))
+
+def test_profile_capture(tmp_path):
+    """Tests that a capture toggles on and off, and writes a readable pstats file."""
+
+    capture = ProfileCapture(str(tmp_path))
+    assert capture.toggle() is None
+    assert capture.active
+    busy_work()
+    path = capture.toggle()
+    assert not capture.active
+    assert os.path.dirname(path) == str(tmp_path)
+    assert os.path.basename(path).startswith('kaooa-profile-')
+    stats = pstats.Stats(path)
+    assert any(function == 'busy_work' for _, _, function in stats.stats)
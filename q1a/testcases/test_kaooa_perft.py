@@ -0,0 +1,47 @@
+"""Module for unit tests on kaooa_perft."""
+
+import os
+import sys
+sys.path.insert(1, os.path.join(sys.path[0], '../AllLint'))
+
+import random
+from kaooa_engine import initial_state, legal_moves, apply_move, illegal_reason, make_move
+from kaooa_perft import PERFT_INITIAL, perft, divide
+
+def brute_force_moves(state):
+    """Returns the legal moves by asking illegal_reason about every source and target."""
+
+    if state.winner is not None:
+        return []
+    return sorted(
+        make_move(state, source, target)
+        for source in range(-1, 10)
+        for target in range(10)
+        if illegal_reason(state, state.turn, source, target) is None
+    )
+
+def test_perft_initial():
+    """Tests the perft counts of the initial position against the known totals."""
+
+    for depth in range(7):
+        assert perft(initial_state(), depth) == PERFT_INITIAL[depth]
+
+def test_divide():
+    """Tests that divide splits the perft count over the legal moves."""
+
+    split = divide(initial_state(), 5)
+    assert len(split) == 10
+    assert sum(split.values()) == PERFT_INITIAL[5]
+
+def test_generator_matches_rules():
+    """Tests the move generator against a brute force check of every move."""
+
+    rng = random.Random(3)
+    for _ in range(100):
+        state = initial_state()
+        for _ in range(60):
+            moves = legal_moves(state)
+            assert sorted(moves) == brute_force_moves(state)
+            if not moves:
+                break
+            state = apply_move(state, rng.choice(moves))
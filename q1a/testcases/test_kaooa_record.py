@@ -0,0 +1,118 @@
+"""Module for unit tests on kaooa_record."""
+
+import os
+import sys
+sys.path.insert(1, os.path.join(sys.path[0], '../AllLint'))
+
+import random
+import pytest
+from kaooa_engine import Move, initial_state, legal_moves, apply_move
+from kaooa_record import (
+    MAGIC, GAME_HEADER, MOVE_RECORD, MAX_MOVES, MoveKind, GameRecord, GameRecorder, move_kind, encode_move,
+    decode_move, encode_game, append_games, read_archive, replay
+)
+
+def random_record(seed):
+    """Returns the record of a random game, and its final state."""
+
+    rng = random.Random(seed)
+    state = initial_state()
+    moves = []
+    while legal_moves(state) and len(moves) < 200:
+        move = rng.choice(legal_moves(state))
+        moves.append(move)
+        state = apply_move(state, move)
+    offsets = tuple(rng.randrange(1000) / 100 for _ in moves)
+    return GameRecord(1700000000.5, tuple(moves), offsets), state
+
+def test_move_roundtrip():
+    """Tests that every kind of move survives encoding, in a few bytes."""
+
+    for move, kind in ((Move(-1, 4), MoveKind.DROP), (Move(3, 5), MoveKind.SLIDE),
+                       (Move(1, 4, 3), MoveKind.CAPTURE)):
+        data = encode_move(move, 1.25)
+        assert len(data) == MOVE_RECORD.size == 4
+        head, target, ticks = MOVE_RECORD.unpack(data)
+        assert move_kind(move) == kind
+        assert decode_move(head, target) == move
+        assert ticks == 125
+
+def test_archive_roundtrip(tmp_path):
+    """Tests that games appended to an archive read back and replay to the same result."""
+
+    path = tmp_path / 'games.kgr'
+    games = [random_record(seed) for seed in range(20)]
+    append_games(path, [record for record, _ in games[:10]])
+    append_games(path, [record for record, _ in games[10:]])
+    assert path.read_bytes().count(MAGIC) == 1
+    assert path.stat().st_size == len(MAGIC) + sum(
+        len(encode_game(record)) for record, _ in games
+    )
+    records = read_archive(path)
+    assert records == [record for record, _ in games]
+    assert [replay(record) for record in records] == [state for _, state in games]
+
+def test_replay_rejects_illegal_moves(tmp_path):
+    """Tests that replay and read_archive reject bad input."""
+
+    with pytest.raises(ValueError):
+        replay(GameRecord(0.0, (Move(-1, 0), Move(-1, 0)), (0.0, 0.0)))
+    path = tmp_path / 'bad.kgr'
+    path.write_bytes(b'not an archive')
+    with pytest.raises(ValueError):
+        read_archive(path)
+
+def test_corrupted_spots_are_rejected(tmp_path):
+    """Tests that replays reject moves to or from spots off the board, archived or not."""
+
+    record, _ = random_record(7)
+    path = tmp_path / 'corrupt.kgr'
+    append_games(path, [record])
+    good = path.read_bytes()
+    first_move = len(MAGIC) + GAME_HEADER.size
+    for pos, value in ((first_move + 1, 40), (first_move, MoveKind.SLIDE.value << 4 | 12)):
+        corrupt = bytearray(good)
+        corrupt[pos] = value
+        path.write_bytes(bytes(corrupt))
+        with pytest.raises(ValueError):
+            replay(read_archive(path)[0])
+    with pytest.raises(ValueError):
+        replay(GameRecord(0.0, (Move(-1, 40),), (0.0,)))
+    with pytest.raises(ValueError):
+        replay(GameRecord(0.0, (Move(-1, -3),), (0.0,)))
+
+def test_truncated_archive_is_rejected(tmp_path):
+    """Tests that an archive cut off within a header or within the moves is rejected."""
+
+    record, _ = random_record(8)
+    path = tmp_path / 'cut.kgr'
+    append_games(path, [record])
+    good = path.read_bytes()
+    for size in (len(MAGIC) + 3, len(MAGIC) + GAME_HEADER.size + 6, len(good) - 1):
+        path.write_bytes(good[:size])
+        with pytest.raises(ValueError):
+            read_archive(path)
+
+def test_overlong_game_is_rejected():
+    """Tests that a game with more moves than a header can count is neither packed nor recorded."""
+
+    moves = (Move(-1, 0),) * (MAX_MOVES + 1)
+    with pytest.raises(ValueError):
+        encode_game(GameRecord(0.0, moves, (0.0,) * len(moves)))
+    recorder = GameRecorder(start=0.0)
+    for _ in range(MAX_MOVES):
+        recorder.add(Move(-1, 0), now=0.0)
+    with pytest.raises(ValueError):
+        recorder.add(Move(-1, 0), now=0.0)
+    assert len(recorder.record().moves) == MAX_MOVES
+
+def test_recorder_offsets():
+    """Tests that the recorder stores the time between moves."""
+
+    recorder = GameRecorder(start=100.0)
+    recorder.add(Move(-1, 0), now=101.5)
+    recorder.add(Move(-1, 1), now=104.0)
+    record = recorder.record()
+    assert record.start == 100.0
+    assert record.moves == (Move(-1, 0), Move(-1, 1))
+    assert record.offsets == (1.5, 2.5)
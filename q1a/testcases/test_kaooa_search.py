@@ -0,0 +1,59 @@
+"""Module for unit tests on kaooa_search."""
+
+import os
+import sys
+sys.path.insert(1, os.path.join(sys.path[0], '../AllLint'))
+
+from kaooa_engine import PlayerClass, Move, GameState, initial_state, legal_moves, make_rules
+from kaooa_search import AlphaBetaAgent, WIN_SCORE, MAX_DEPTH
+
+def test_takes_winning_capture():
+    """Tests that the vulture takes the fourth crow when it can."""
+
+    state = GameState(
+        crows=1 << 1 | 1 << 6, vulture=0, turn=PlayerClass.VULTURE,
+        moves=30, crows_in_hand=0, crows_captured=3
+    )
+    result = AlphaBetaAgent(time_limit=None, max_depth=4).search(state)
+    assert result.move == Move(0, 3, 1)
+
+def test_crows_block_vulture():
+    """Tests that the crows find the move trapping the vulture."""
+
+    state = GameState(
+        crows=1 << 1 | 1 << 9 | 1 << 3 | 1 << 6, vulture=0, turn=PlayerClass.CROW,
+        moves=30, crows_in_hand=0, crows_captured=3
+    )
+    result = AlphaBetaAgent(time_limit=None, max_depth=4).search(state)
+    assert result.move == Move(6, 7)
+    assert result.score >= WIN_SCORE - MAX_DEPTH
+
+def test_node_budget():
+    """Tests that the search stops within its node budget, with a legal move."""
+
+    agent = AlphaBetaAgent(time_limit=None, node_limit=5000)
+    result = agent.search(initial_state())
+    assert result.move in legal_moves(initial_state())
+    assert result.nodes <= 5000
+    assert result.depth >= 1
+    assert agent.last_result == result
+
+def test_time_budget():
+    """Tests that the search reports its throughput under a time budget."""
+
+    result = AlphaBetaAgent(time_limit=0.05).search(initial_state())
+    assert result.elapsed < 1.0
+    assert result.nodes_per_second > 0
+
+def test_variant_search():
+    """Tests that the search plays legal moves on a 7 point star."""
+
+    rules = make_rules(7, 9, 5)
+    agent = AlphaBetaAgent(time_limit=None, node_limit=2000, rules=rules)
+    state = rules.initial_state()
+    for _ in range(30):
+        if rules.is_terminal(state):
+            break
+        move = agent.choose_move(state)
+        assert move in rules.legal_moves(state)
+        state = rules.apply_move(state, move)
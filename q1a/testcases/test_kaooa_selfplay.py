@@ -0,0 +1,45 @@
+"""Module for unit tests on kaooa_selfplay and kaooa_agents."""
+
+import os
+import sys
+sys.path.insert(1, os.path.join(sys.path[0], '../AllLint'))
+
+import pytest
+from kaooa_engine import PlayerClass, Move, GameState
+from kaooa_agents import GreedyAgent, RandomAgent, make_agent
+from kaooa_selfplay import play_game, parse_args, run
+
+def test_greedy_takes_win():
+    """Tests that the greedy agent takes a move that wins at once."""
+
+    state = GameState(
+        crows=1 << 1 | 1 << 9 | 1 << 3 | 1 << 6, vulture=0, turn=PlayerClass.CROW,
+        moves=30, crows_in_hand=0, crows_captured=3
+    )
+    assert GreedyAgent(0).choose_move(state) == Move(6, 7)
+
+def test_play_game():
+    """Tests that a game between agents ends with a consistent result."""
+
+    result = play_game(RandomAgent(1), RandomAgent(2), max_plies=200)
+    assert result.winner in (PlayerClass.VULTURE, PlayerClass.CROW)
+    assert 0 < result.plies < 200
+    assert len(result.moves) == result.plies
+
+    result = play_game(RandomAgent(1), RandomAgent(2), max_plies=5)
+    assert result[:2] == (None, 5)
+    assert len(result.moves) == 5
+
+def test_unknown_agent():
+    """Tests rejection of an unknown agent name."""
+
+    with pytest.raises(ValueError, match='^Unknown agent'):
+        make_agent('human')
+
+def test_run_over_workers():
+    """Tests that every game is played, when spread over the workers."""
+
+    args = parse_args(['--games', '25', '--workers', '3', '--crow', 'greedy'])
+    results, elapsed = run(args)
+    assert len(results) == 25
+    assert elapsed > 0
@@ -0,0 +1,133 @@
+"""Module for unit tests on kaooa_server, kaooa_session and kaooa_loadtest."""
+
+import os
+import sys
+sys.path.insert(1, os.path.join(sys.path[0], '../AllLint'))
+
+import asyncio
+import pytest
+from kaooa_engine import PlayerClass, Move
+import kaooa_session
+from kaooa_session import GameSession
+from kaooa_server import GameServer
+from kaooa_loadtest import load_test
+
+async def exchange(reader, writer, line):
+    """Sends a command line, and returns the reply line."""
+
+    writer.write((line + '\n').encode('ascii'))
+    return (await reader.readline()).decode('ascii').strip()
+
+async def protocol_session():
+    """Runs a few commands against a server, including bad ones."""
+
+    server = GameServer()
+    listener = await server.start(port=0)
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    other_reader, other_writer = await asyncio.open_connection('127.0.0.1', port)
+    replies = [
+        await exchange(reader, writer, 'NEW'),
+        await exchange(reader, writer, 'MOVE 0 -1 4'),
+        await exchange(reader, writer, 'MOVE 0 -1 4'),
+        await exchange(reader, writer, 'MOVE 0 -1 42'),
+        await exchange(reader, writer, 'STATE 0'),
+        await exchange(reader, writer, 'UNDO 0'),
+        await exchange(other_reader, other_writer, 'STATE 0'),
+        await exchange(reader, writer, 'JUMP'),
+        await exchange(reader, writer, 'END 0'),
+        await exchange(reader, writer, 'STATE 0'),
+    ]
+    await exchange(other_reader, other_writer, 'NEW')
+    sessions = len(server.sessions)
+    other_writer.close()
+    writer.close()
+    await asyncio.sleep(0.1)
+    listener.close()
+    return replies, sessions, len(server.sessions)
+
+async def non_ascii_session():
+    """Sends non-ASCII commands, then checks the connection still serves its game."""
+
+    server = GameServer()
+    listener = await server.start(port=0)
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    replies = [await exchange(reader, writer, 'NEW')]
+    for line in ('MOVE 0 \u00b2 1'.encode('utf-8'), b'MOVE 0 \xff 1', b'MOVE \xb2 -1 4'):
+        writer.write(line + b'\n')
+        replies.append((await reader.readline()).decode('ascii').strip())
+    replies.append(await exchange(reader, writer, 'MOVE 0 -1 4'))
+    writer.close()
+    await asyncio.sleep(0.1)
+    listener.close()
+    return replies
+
+def test_non_ascii_command():
+    """Tests that a non-ASCII line gets an error reply, and leaves the connection open."""
+
+    replies = asyncio.run(non_ascii_session())
+    assert replies[0] == 'GAME 0'
+    assert replies[1:4] == ['ERR Commands must be ASCII.'] * 3
+    assert replies[4] == 'OK -'
+
+def test_protocol():
+    """Tests the replies of the server to good and bad commands."""
+
+    replies, sessions, left = asyncio.run(protocol_session())
+    assert replies[0] == 'GAME 0'
+    assert replies[1] == 'OK -'
+    assert replies[2].startswith('ERR')
+    assert replies[3] == 'ERR Spot is not on the board.'
+    assert replies[4] == 'STATE 16 -1 VULTURE 2 6 0 -'
+    assert replies[5] == 'OK -'
+    assert replies[6] == 'ERR No game 0.'
+    assert replies[7] == 'ERR Unknown command.'
+    assert replies[8] == 'BYE 0'
+    assert replies[9] == 'ERR No game 0.'
+    assert (sessions, left) == (1, 0)
+
+async def served_load_test(clients, games):
+    """Runs the load test against a fresh server."""
+
+    server = GameServer()
+    listener = await server.start(port=0)
+    port = listener.sockets[0].getsockname()[1]
+    result = await load_test('127.0.0.1', port, clients, games, seed=5)
+    listener.close()
+    return result, server
+
+def test_load_test():
+    """Tests that many concurrent games are played to the end, and cleaned up."""
+
+    result, server = asyncio.run(served_load_test(20, 5))
+    assert result.games == 100
+    assert result.moves == server.moves == len(result.latencies) > 0
+    assert 0 < result.percentile(0.5) <= result.percentile(0.99) <= max(result.latencies)
+    assert not server.sessions
+
+def test_session_undo_and_clock():
+    """Tests a session playing, taking back and replaying moves."""
+
+    session = GameSession(start=100.0)
+    session.submit(-1, 0, now=101.0)
+    with pytest.raises(ValueError):
+        session.submit(-1, 0, now=102.0)
+    assert session.undo() == Move(-1, 0)
+    assert session.redo() == Move(-1, 0)
+    assert session.state.turn == PlayerClass.VULTURE
+    assert session.elapsed_seconds(now=110.0) == 10.0
+    assert not hasattr(session, '__dict__')
+
+def test_session_move_limit(monkeypatch):
+    """Tests that a session refuses moves past the limit, and is left unchanged."""
+
+    monkeypatch.setattr(kaooa_session, 'MAX_MOVES', 3)
+    session = GameSession(start=100.0)
+    for source, target in ((-1, 0), (-1, 5), (-1, 2)):
+        session.submit(source, target)
+    state = session.state
+    with pytest.raises(ValueError, match='^Games are limited to 3 moves.$'):
+        session.submit(5, 4)
+    assert session.state == state
+    assert len(session.recorder.moves) == 3
@@ -0,0 +1,48 @@
+"""Module for unit tests on kaooa_startup."""
+
+import os
+import sys
+sys.path.insert(1, os.path.join(sys.path[0], '../AllLint'))
+
+import pytest
+import kaooa_startup
+from kaooa_startup import ImportTime, parse_importtime, first_frame
+
+def test_parse_importtime():
+    """Tests the parsing of -X importtime output, skipping its header and other lines."""
+
+    output = '\n'.join((
+        'import time: self [us] | cumulative | imported package',
+        'import time:       366 |        366 |     math',
+        'import time:      2914 |       3280 |   kaooa_board',
+        'pygame 2.5.2',
+    ))
+    assert parse_importtime(output) == [
+        ImportTime('math', 366, 366), ImportTime('kaooa_board', 2914, 3280)
+    ]
+
+def test_first_frame_is_lazy():
+    """Tests that the game draws a frame without importing the search or Rich."""
+
+    pytest.importorskip('pygame')
+    elapsed, imports = first_frame()
+    modules = {entry.module for entry in imports}
+    assert elapsed > 0
+    assert 'kaooa_engine' in modules
+    assert 'kaooa_search' not in modules
+    assert 'rich' not in modules
+
+def test_first_frame_with_large_stderr(tmp_path, monkeypatch):
+    """Tests that a game writing more than a pipe buffer to stderr does not stall the run."""
+
+    game = tmp_path / 'noisy.py'
+    game.write_text(
+        'import sys\n'
+        'sys.stderr.write("import time:         1 |          1 | noisy\\n" * 20000)\n'
+        f'print({kaooa_startup.FIRST_FRAME!r}, flush=True)\n',
+        encoding='ascii'
+    )
+    monkeypatch.setattr(kaooa_startup, 'GAME', str(game))
+    elapsed, imports = first_frame()
+    assert elapsed > 0
+    assert sum(entry.module == 'noisy' for entry in imports) == 20000
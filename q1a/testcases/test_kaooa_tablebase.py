@@ -0,0 +1,72 @@
+"""Module for unit tests on kaooa_tablebase."""
+
+import os
+import sys
+sys.path.insert(1, os.path.join(sys.path[0], '../AllLint'))
+
+import pytest
+from kaooa_engine import PlayerClass, GameState, initial_state, apply_move, is_terminal
+from kaooa_tablebase import (
+    HEADER, KEY_SIZE, ENTRY_SIZE, POSITION_COUNT, Outcome, Tablebase, solve, write_tablebase
+)
+
+@pytest.fixture(scope='module', name='tablebase_path')
+def fixture_tablebase_path(tmp_path_factory):
+    """Solves the game once, and writes the table."""
+
+    path = tmp_path_factory.mktemp('tablebase') / 'kaooa.tb'
+    write_tablebase(path, *solve())
+    return path
+
+@pytest.fixture(scope='module', name='tablebase')
+def fixture_tablebase(tablebase_path):
+    """Maps the written table."""
+
+    with Tablebase(tablebase_path) as tablebase:
+        yield tablebase
+
+def test_dense_table(tablebase_path):
+    """Tests that the file holds one key and entry per solved position, and nothing else."""
+
+    size = HEADER.size + POSITION_COUNT * (KEY_SIZE + ENTRY_SIZE)
+    assert tablebase_path.stat().st_size == size
+
+def test_initial_position(tablebase):
+    """Tests the solved value of the initial position."""
+
+    assert tablebase.probe(initial_state()) == (Outcome.WIN, 15)
+
+def test_terminal_positions(tablebase):
+    """Tests the labels of finished games."""
+
+    blocked = GameState(
+        crows=1 << 1 | 1 << 9 | 1 << 3 | 1 << 7, vulture=0, turn=PlayerClass.VULTURE,
+        moves=16, crows_in_hand=0, crows_captured=3, winner=PlayerClass.CROW
+    )
+    assert tablebase.probe(blocked) == (Outcome.LOSS, 0)
+
+def test_best_move_wins(tablebase):
+    """Tests that following the best moves converts the win within its distance."""
+
+    state = initial_state()
+    _, distance = tablebase.probe(state)
+    for _ in range(distance):
+        state = apply_move(state, tablebase.best_move(state))
+    assert is_terminal(state)
+    assert state.winner == PlayerClass.CROW
+
+def test_bad_file(tmp_path):
+    """Tests rejection of a file that is not a tablebase."""
+
+    path = tmp_path / 'bad.tb'
+    path.write_bytes(b'not a tablebase, just some bytes')
+    with pytest.raises(ValueError, match='^File is not a Kaooa tablebase.$'):
+        Tablebase(path)
+
+def test_truncated_file(tablebase_path, tmp_path):
+    """Tests rejection of a tablebase cut short, rather than reading it as UNKNOWN."""
+
+    path = tmp_path / 'cut.tb'
+    path.write_bytes(tablebase_path.read_bytes()[:-ENTRY_SIZE])
+    with pytest.raises(ValueError, match='^File is not a Kaooa tablebase.$'):
+        Tablebase(path)